@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+"""Highest message rate the websocket client of an exchange keeps up with.
+
+The stand-in server of server.py runs in a child process, the exchange
+subscribes to the books (and trades) of --symbols symbols of it over real
+connections, and the rate per symbol doubles every --seconds until the client
+falls behind: the server sheds frames because they are not read fast enough,
+delivers less than --keep of the frames it was asked for, or the exchange
+emits less than --keep events per frame delivered while the rest queue up.
+
+    frames/sec    frames the server delivered per second, all symbols
+    events/sec    ob and trade events the exchange emitted per second
+    cpu           share of one core the client process used
+    frames/cpu-s  frames handled per second of client cpu, i.e. per core
+
+The last sustained step of every exchange is the result.
+
+    python benchmark/bench_load.py
+    python benchmark/bench_load.py bitfinex2 binance --symbols 20 --rate 50
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+import aiohttp
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+from server import StandInServer  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+parser = argparse.ArgumentParser()
+parser.add_argument('exchanges', type=str, nargs='*', help='exchanges to load, all by default: ' + ', '.join(sorted(protocol.exchange_id for protocol in StandInServer.protocols)))
+parser.add_argument('--symbols', type=int, default=10, help='symbols subscribed')
+parser.add_argument('--rate', type=int, default=25, help='book updates per second per symbol of the first step')
+parser.add_argument('--limit', type=int, default=100000, help='book updates per second per symbol the steps stop at')
+parser.add_argument('--seconds', type=float, default=3, help='duration of a step')
+parser.add_argument('--trades', type=float, default=0.1, help='trades per book update')
+parser.add_argument('--keep', type=float, default=0.95, help='share of the frames asked for, and of events per frame, a step must deliver')
+argv = parser.parse_args()
+
+loop = asyncio.get_event_loop()
+
+# ----------------------------------------------------------------------------
+
+
+def serve(pipe, symbols):
+    # the server gets a core of its own, its cost stays out of the results
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = StandInServer(rate=0, trades=0, symbols=symbols)
+    loop.run_until_complete(server.start())
+    pipe.send(server.port)
+    try:
+        loop.run_forever()
+    finally:
+        loop.run_until_complete(server.stop())
+
+
+async def control(session, server, **query):
+    async with session.get(server.url('http', '/stand-in'), params={key: str(value) for key, value in query.items()}) as response:
+        return await response.json()
+
+
+async def load(exchange_id, server):
+    exchange = getattr(ccxt, exchange_id)({'enableRateLimit': False})
+    server.configure(exchange)
+    counters = {'events': 0, 'errors': 0}
+
+    def count(*args):
+        counters['events'] += 1
+
+    def error(*args):
+        counters['errors'] += 1
+
+    exchange.on('ob', count)
+    exchange.on('trade', count)
+    exchange.on('err', error)
+    results = []
+    session = aiohttp.ClientSession()
+    try:
+        for feed in server.feeds[:argv.symbols]:
+            symbol = feed.base + '/' + feed.quote
+            for event in server.exchanges[exchange_id].events:
+                await exchange.websocket_subscribe(event, symbol)
+        rate = argv.rate
+        while rate <= argv.limit:
+            before = await control(session, server, rate=rate, trades=int(rate * argv.trades))
+            events, errors = counters['events'], counters['errors']
+            wall, cpu = time.time(), time.process_time()
+            await asyncio.sleep(argv.seconds)
+            after = await control(session, server)
+            wall, cpu = time.time() - wall, time.process_time() - cpu
+            frames = after['frames'][exchange_id] - before['frames'][exchange_id]
+            emitted = counters['events'] - events
+            asked = argv.symbols * (rate + int(rate * argv.trades)) * wall
+            step = {
+                'rate': rate,
+                'frames/sec': frames / wall,
+                'events/sec': emitted / wall,
+                'cpu': cpu / wall,
+                'frames/cpu-s': frames / cpu if cpu else 0,
+                'errors': counters['errors'] - errors,
+                'sustained': (after['shed'] == before['shed']) and (frames >= argv.keep * asked) and (emitted >= argv.keep * frames),
+            }
+            results.append(step)
+            print('%-10s %8d %12.0f %12.0f %6.0f%% %14.0f %7d  %s' % (exchange_id, rate, step['frames/sec'], step['events/sec'], step['cpu'] * 100, step['frames/cpu-s'], step['errors'], '' if step['sustained'] else 'falls behind'))
+            sys.stdout.flush()
+            if not step['sustained']:
+                break
+            rate *= 2
+    finally:
+        await control(session, server, rate=0, trades=0)
+        await session.close()
+        exchange.websocketCloseAll()
+        await exchange.close()
+    return results
+
+
+def main():
+    names = argv.exchanges or [protocol.exchange_id for protocol in StandInServer.protocols]
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=serve, args=(child, argv.symbols), daemon=True)
+    process.start()
+    try:
+        # configure() only needs the address and the markets of the server
+        server = StandInServer(port=parent.recv(), symbols=argv.symbols)
+        print('%-10s %8s %12s %12s %7s %14s %7s' % ('exchange', 'rate', 'frames/sec', 'events/sec', 'cpu', 'frames/cpu-s', 'errors'))
+        best = {}
+        for exchange_id in names:
+            try:
+                results = loop.run_until_complete(load(exchange_id, server))
+            except Exception as ex:
+                # e.g. theocean without web3
+                print('%-10s skipped: %s' % (exchange_id, str(ex)))
+                continue
+            sustained = [step for step in results if step['sustained']]
+            if sustained:
+                best[exchange_id] = sustained[-1]
+        print('')
+        for exchange_id in best:
+            step = best[exchange_id]
+            print('%-10s sustains %.0f frames/sec, %.0f frames/cpu-s' % (exchange_id, step['frames/sec'], step['frames/cpu-s']))
+    finally:
+        process.terminate()
+        process.join()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
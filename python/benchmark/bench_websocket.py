@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+
+"""Throughput of the websocket handlers of the exchanges, without network.
+
+Every fixture of fixtures.py is written to a FrameRecorder log and replayed
+into a fresh exchange, or a log recorded with websocket_record() is replayed
+with --log. Frames are fed one by one through the decompression and
+_websocket_on_message of the exchange, the first --warmup of them untimed,
+in --repeat runs of which the fastest counts.
+
+    msgs/sec     frames handled per second of handler time
+    p99 us       99th percentile of the time to handle one frame
+    msgs/loop    msgs/sec in frames per run of the calibration loop
+    p99 loops    p99 us in runs of the calibration loop
+    alloc B/msg  peak memory allocated while handling a frame, on average
+    blocks/msg   memory blocks still allocated after a frame, on average
+
+Before every timed run the same process times calibrate(), a fixed loop of
+the json decoding, float parsing and list and dict work the handlers do.
+Dividing by it takes out most of the speed of the machine and of its load
+at the time, so the timings are stored and compared as msgs/loop and
+p99 loops, the ones of msgs/sec and p99 us only differ across machines.
+
+The results are compared with baseline.json, a result worse than the
+baseline is flagged and the exit status is 1: the allocation figures by
+more than --tolerance, the fixtures are seeded and they hardly vary, the
+throughput by more than the wider --timing-tolerance, which still flags a
+handler that got twice as slow, and the p99, noisier still, by more than
+--tail-tolerance.
+
+    python benchmark/bench_websocket.py
+    python benchmark/bench_websocket.py binance-depth kraken-book --messages 50000
+    python benchmark/bench_websocket.py --log session.log --exchange binance --markets markets.json
+    python benchmark/bench_websocket.py --save
+"""
+
+import argparse
+import array
+import asyncio
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+from ccxt.async_support.base.frame_recorder import FrameRecorder  # noqa: E402
+from ccxt.async_support.base.frame_recorder import FrameReplayer  # noqa: E402
+from ccxt.async_support.base.frame_recorder import read_frames  # noqa: E402
+from ccxt.base.json_codec import JsonCodec  # noqa: E402
+from fixtures import FIXTURES  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# the metrics stored in baseline.json and compared with it
+metrics = ('msgs/loop', 'p99 loops', 'alloc B/msg', 'blocks/msg')
+# higher is better for these, lower for the others
+throughputs = ('msgs/loop',)
+timing_metrics = ('msgs/loop', 'p99 loops')
+
+parser = argparse.ArgumentParser()
+parser.add_argument('fixtures', type=str, nargs='*', help='fixtures to run, all by default: ' + ', '.join(sorted(FIXTURES)))
+parser.add_argument('--messages', type=int, default=20000, help='frames per synthetic fixture')
+parser.add_argument('--warmup', type=int, default=100, help='frames fed before measuring')
+parser.add_argument('--repeat', type=int, default=3, help='timed runs per fixture, the fastest counts')
+parser.add_argument('--seed', type=int, default=1, help='seed of the synthetic books')
+parser.add_argument('--log', type=str, help='benchmark a log recorded with websocket_record() instead')
+parser.add_argument('--exchange', type=str, help='exchange id of --log')
+parser.add_argument('--markets', type=str, help='json file with the markets of --log, loaded over the network otherwise')
+parser.add_argument('--tolerance', type=float, default=0.25, help='relative slack before an allocation figure counts as a regression')
+parser.add_argument('--timing-tolerance', type=float, default=0.4, help='relative slack before the calibrated throughput counts as a regression')
+parser.add_argument('--tail-tolerance', type=float, default=0.6, help='relative slack before the calibrated p99 counts as a regression')
+parser.add_argument('--save', action='store_true', help='store the results as the new baseline')
+argv = parser.parse_args()
+
+loop = asyncio.get_event_loop()
+
+# ----------------------------------------------------------------------------
+
+
+async def create_exchange(exchange_id, markets):
+    exchange = getattr(ccxt, exchange_id)({'enableRateLimit': False})
+    if markets is not None:
+        exchange.set_markets(markets)
+    else:
+        await exchange.load_markets()
+    # listeners as an application would have them
+    for event in exchange.symbolEvents:
+        exchange.on(event, lambda symbol, data: None)
+    exchange.on('err', lambda error, conxid=None: None)
+    return exchange
+
+
+def feed(replayer, records, measure, start=None):
+    """Feed records to replayer, measure(kind, conxid, payload) the frames
+    after the warmup, calling start() before the first of them"""
+    frames = 0
+    replayer.attach()
+    try:
+        for timestamp, kind, conxid, payload in records:
+            if (kind > 2) or (frames < argv.warmup):
+                frames += replayer.feed(kind, conxid, payload)
+                continue
+            if (frames == argv.warmup) and (start is not None):
+                start()
+            measure(kind, conxid, payload)
+            frames += 1
+    finally:
+        replayer.detach()
+
+
+calibration = [json.dumps({
+    'stream': 'btcusdt@depth',
+    'data': {
+        'u': 1000,
+        'b': [['%.2f' % (100 - i * 0.01), '%.4f' % (i + 1)] for i in range(20)],
+        'a': [['%.2f' % (100 + i * 0.01), '%.4f' % (i + 1)] for i in range(20)],
+    },
+}) for i in range(20)]
+
+
+def calibrate():
+    """Seconds one run of the calibration loop takes"""
+    clock = time.perf_counter
+    start = clock()
+    book = {}
+    for payload in calibration:
+        data = json.loads(payload)['data']
+        for side in ('b', 'a'):
+            for price, amount in data[side]:
+                book[float(price)] = float(amount)
+        levels = sorted(book.items())
+        book = dict(levels[:50])
+    return clock() - start
+
+
+async def timed_run(exchange_id, markets, records):
+    exchange = await create_exchange(exchange_id, markets)
+    replayer = FrameReplayer(exchange)
+    timings = []
+    clock = time.perf_counter
+
+    def timed(kind, conxid, payload):
+        start = clock()
+        replayer.feed(kind, conxid, payload)
+        timings.append(clock() - start)
+
+    # the collector stays out of the way, allocations are counted apart
+    gc.collect()
+    gc.disable()
+    try:
+        feed(replayer, records, timed)
+    finally:
+        gc.enable()
+    await exchange.close()
+    if not timings:
+        raise ValueError('no frames after the ' + str(argv.warmup) + ' warmup frames')
+    return timings, replayer.errors
+
+
+async def run(exchange_id, markets, records):
+    # the fastest of the repeats is the one least disturbed by the machine,
+    # each comes right after a calibration under the same conditions
+    timings, errors, loop_time, p99_loops = None, 0, None, None
+    for i in range(0, argv.repeat):
+        calibrated = min(calibrate() for j in range(0, 50))
+        result, errors = await timed_run(exchange_id, markets, records)
+        if (timings is None) or (sum(result) < sum(timings)):
+            timings = result
+            loop_time = calibrated
+        # a tail is disturbed more easily than a sum, the best one counts
+        result.sort()
+        p99 = result[int(len(result) * 0.99)] / calibrated
+        p99_loops = p99 if (p99_loops is None) else min(p99_loops, p99)
+
+    # allocations, on a fresh exchange fed the same frames
+    exchange = await create_exchange(exchange_id, markets)
+    replayer = FrameReplayer(exchange)
+    # an array holds the numbers without keeping an int object per frame alive
+    peaks = array.array('q', [0]) * len(timings)
+    counters = {'frame': 0}
+
+    def traced(kind, conxid, payload):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        replayer.feed(kind, conxid, payload)
+        peaks[counters['frame']] = tracemalloc.get_traced_memory()[1] - current
+        counters['frame'] += 1
+
+    def start():
+        gc.collect()
+        counters['blocks'] = sys.getallocatedblocks()
+
+    tracemalloc.start()
+    try:
+        feed(replayer, records, traced, start)
+        gc.collect()
+        retained = sys.getallocatedblocks() - counters['blocks']
+    finally:
+        tracemalloc.stop()
+    await exchange.close()
+
+    timings.sort()
+    return {
+        'frames': len(timings),
+        'errors': errors,
+        'msgs/sec': round(len(timings) / sum(timings)),
+        'p99 us': round(timings[int(len(timings) * 0.99)] * 1e6, 1),
+        'msgs/loop': round(len(timings) / sum(timings) * loop_time, 3),
+        'p99 loops': round(p99_loops, 4),
+        'alloc B/msg': round(sum(peaks) / len(peaks)),
+        'blocks/msg': round(retained / len(peaks), 2),
+    }
+
+
+def synthetic(name, directory):
+    exchange_id, markets, fixture = FIXTURES[name]
+    path = os.path.join(directory, name + '.log')
+    recorder = FrameRecorder(path, JsonCodec(), compress=False)
+    fixture(recorder, argv.messages + argv.warmup, random.Random(argv.seed))
+    recorder.close()
+    return exchange_id, markets, list(read_frames(path))
+
+
+def regressions(name, result, baseline):
+    if name not in baseline:
+        return []
+    flagged = []
+    for metric in metrics:
+        reference = baseline[name].get(metric)
+        if reference is None:
+            continue
+        if metric in timing_metrics:
+            # as many times slower or faster either way
+            ratio = (reference / result[metric]) if (metric in throughputs) else (result[metric] / reference)
+            worse = ratio > 1 / (1 - (argv.timing_tolerance if (metric in throughputs) else argv.tail_tolerance))
+        elif metric == 'blocks/msg':
+            # close to zero unless something leaks, compared in blocks
+            worse = result[metric] > reference + argv.tolerance
+        else:
+            worse = result[metric] > reference * (1 + argv.tolerance)
+        if worse:
+            flagged.append(metric + ' ' + str(result[metric]) + ' vs ' + str(reference))
+    return flagged
+
+
+def main():
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as file:
+            baseline = json.load(file)
+    results = {}
+    if argv.log:
+        if not argv.exchange:
+            parser.error('--log needs --exchange')
+        markets = None
+        if argv.markets:
+            with open(argv.markets) as file:
+                markets = json.load(file)
+        name = os.path.basename(argv.log)
+        results[name] = loop.run_until_complete(run(argv.exchange, markets, list(read_frames(argv.log))))
+    else:
+        names = argv.fixtures or sorted(FIXTURES)
+        for name in names:
+            if name not in FIXTURES:
+                parser.error('unknown fixture ' + name)
+        directory = tempfile.mkdtemp()
+        for name in names:
+            exchange_id, markets, records = synthetic(name, directory)
+            results[name] = loop.run_until_complete(run(exchange_id, markets, records))
+            os.remove(os.path.join(directory, name + '.log'))
+        os.rmdir(directory)
+
+    print('%-16s %8s %10s %10s %10s %10s %12s %11s  %s' % ('fixture', 'frames', 'msgs/sec', 'p99 us', 'msgs/loop', 'p99 loops', 'alloc B/msg', 'blocks/msg', ''))
+    failed = False
+    for name in results:
+        result = results[name]
+        flagged = regressions(name, result, baseline)
+        if result['errors']:
+            flagged.append(str(result['errors']) + ' handler errors')
+        failed = failed or bool(flagged)
+        print('%-16s %8d %10d %10.1f %10.3f %10.4f %12d %11.2f  %s' % (name, result['frames'], result['msgs/sec'], result['p99 us'], result['msgs/loop'], result['p99 loops'], result['alloc B/msg'], result['blocks/msg'], 'REGRESSION ' + ', '.join(flagged) if flagged else ''))
+
+    if argv.save:
+        for name in results:
+            baseline[name] = {metric: results[name][metric] for metric in metrics}
+        with open(baseline_path, 'w') as file:
+            json.dump(baseline, file, indent=4, sort_keys=True)
+            file.write('\n')
+        print('baseline saved to ' + baseline_path)
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+
+"""Synthetic websocket sessions of the exchanges, written as FrameRecorder logs.
+
+Every fixture writes what the exchange would have received from one
+connection: the connection opening, the subscription, the initial book (over
+the websocket or as a REST snapshot) and count updates of one symbol, in the
+wire format of the exchange. Books move around a fixed mid price, a few levels
+per update, with the occasional level removed, so the sides never cross."""
+
+import base64
+import gzip
+import json
+import zlib
+
+__all__ = [
+    'FIXTURES',
+    'SyntheticBook',
+]
+
+
+class SyntheticBook(object):
+
+    def __init__(self, rng, depth=50, mid=10000.0, tick=0.5):
+        self.rng = rng
+        self.depth = depth
+        self.mid = mid
+        self.tick = tick
+        self.sides = {'bids': {}, 'asks': {}}
+        for i in range(1, depth + 1):
+            self.sides['bids'][self.price('bids', i)] = self.amount()
+            self.sides['asks'][self.price('asks', i)] = self.amount()
+
+    def price(self, side, level):
+        return self.mid - level * self.tick if side == 'bids' else self.mid + level * self.tick
+
+    def amount(self):
+        return round(self.rng.uniform(0.01, 5), 4)
+
+    def levels(self, side):
+        return sorted(self.sides[side].items(), reverse=(side == 'bids'))
+
+    def changes(self):
+        """[(side, price, amount)], a zero amount removes the level"""
+        result = []
+        for i in range(0, self.rng.randint(1, 3)):
+            side = 'bids' if self.rng.random() < 0.5 else 'asks'
+            price = self.price(side, self.rng.randint(1, self.depth + 10))
+            if (price in self.sides[side]) and (self.rng.random() < 0.2):
+                del self.sides[side][price]
+                result.append((side, price, 0.0))
+            else:
+                amount = self.amount()
+                self.sides[side][price] = amount
+                result.append((side, price, amount))
+        return result
+
+    def trade(self):
+        side = 'buy' if self.rng.random() < 0.5 else 'sell'
+        return (side, self.price('asks' if side == 'buy' else 'bids', 1), self.amount())
+
+
+def deflate_base64(data):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return base64.b64encode(compressor.compress(json.dumps(data).encode('utf-8')) + compressor.flush()).decode('ascii')
+
+
+def dumps(data):
+    return json.dumps(data).encode('utf-8')
+
+
+def text(value):
+    return '%.8f' % value
+
+
+# ----------------------------------------------------------------------------
+
+
+def binance_depth(recorder, count, rng):
+    book = SyntheticBook(rng)
+    recorder.open('default', 'default', {'type': 'ws-s', 'id': 'default', 'url': 'wss://stream.binance.com:9443/stream?streams=btcusdt@depth'})
+    recorder.subscription('default', True, 'default', 'ob', 'BTC/USDT', {})
+    for i in range(0, count):
+        changes = book.changes()
+        recorder.frame('default', dumps({'stream': 'btcusdt@depth', 'data': {
+            'e': 'depthUpdate',
+            'E': 1550000000000 + i,
+            's': 'BTCUSDT',
+            'U': 1001 + i,
+            'u': 1001 + i,
+            'b': [[text(price), text(amount), []] for (side, price, amount) in changes if side == 'bids'],
+            'a': [[text(price), text(amount), []] for (side, price, amount) in changes if side == 'asks'],
+        }}))
+        if i == 0:
+            # the REST snapshot answers once the first update is buffered
+            recorder.snapshot('default', 'BTC/USDT', None, {
+                'bids': book.levels('bids'),
+                'asks': book.levels('asks'),
+                'timestamp': None,
+                'datetime': None,
+                'nonce': 1000,
+            })
+
+
+def binance_trade(recorder, count, rng):
+    book = SyntheticBook(rng)
+    recorder.open('default', 'default', {'type': 'ws-s', 'id': 'default', 'url': 'wss://stream.binance.com:9443/stream?streams=btcusdt@trade'})
+    recorder.subscription('default', True, 'default', 'trade', 'BTC/USDT', {})
+    for i in range(0, count):
+        side, price, amount = book.trade()
+        recorder.frame('default', dumps({'stream': 'btcusdt@trade', 'data': {
+            'e': 'trade',
+            'E': 1550000000000 + i,
+            's': 'BTCUSDT',
+            't': 100000 + i,
+            'p': text(price),
+            'q': text(amount),
+            'b': 200000 + i,
+            'a': 300000 + i,
+            'T': 1550000000000 + i,
+            'm': side == 'sell',
+            'M': True,
+        }}))
+
+
+def bitfinex2_book(recorder, count, rng):
+    book = SyntheticBook(rng)
+    recorder.open('default', 'default', {'type': 'ws', 'id': 'default', 'url': 'wss://api.bitfinex.com/ws/2'})
+    recorder.subscription('default', True, 'default', 'ob', 'BTC/USD', {})
+    recorder.frame('default', dumps({'event': 'subscribed', 'channel': 'book', 'chanId': 7, 'symbol': 'tBTCUSD', 'prec': 'P0', 'freq': 'F0', 'len': '100', 'pair': 'BTCUSD'}))
+    levels = [[price, 1, amount] for (price, amount) in book.levels('bids')] + [[price, 1, -amount] for (price, amount) in book.levels('asks')]
+    recorder.frame('default', dumps([7, levels]))
+    for i in range(0, count - 2):
+        side, price, amount = book.changes()[0]
+        # a removed level has count 0, the sign of the amount tells the side
+        recorder.frame('default', dumps([7, [price, 0 if amount == 0 else 1, (amount or 1) if side == 'bids' else -(amount or 1)]]))
+
+
+def kraken_book(recorder, count, rng):
+    book = SyntheticBook(rng)
+    recorder.open('default', 'default', {'type': 'ws', 'id': 'default', 'url': 'wss://ws.kraken.com'})
+    recorder.subscription('default', True, 'default', 'ob', 'BTC/USD', {})
+    recorder.frame('default', dumps({'channelID': 3, 'event': 'subscriptionStatus', 'pair': 'BTC/USD', 'status': 'subscribed', 'subscription': {'name': 'book', 'depth': 1000}}))
+    recorder.frame('default', dumps([3, {
+        'as': [[text(price), text(amount), '1550000000.000000'] for (price, amount) in book.levels('asks')],
+        'bs': [[text(price), text(amount), '1550000000.000000'] for (price, amount) in book.levels('bids')],
+    }]))
+    for i in range(0, count - 2):
+        delta = {}
+        for side, price, amount in book.changes():
+            delta.setdefault('b' if side == 'bids' else 'a', []).append([text(price), text(amount), '1550000000.%06d' % i])
+        recorder.frame('default', dumps([3, delta]))
+
+
+def bitmex_l2(recorder, count, rng):
+    book = SyntheticBook(rng)
+    # orderBookL2 ids encode the price, one id per level
+    ids = {}
+
+    def row(side, price, amount=None):
+        key = (side, price)
+        if key not in ids:
+            ids[key] = 8800000000 - int(price * 2)
+        result = {'symbol': 'XBTUSD', 'id': ids[key], 'side': 'Buy' if side == 'bids' else 'Sell'}
+        if amount is not None:
+            result['size'] = int(amount * 1000)
+        return result
+
+    recorder.subscription('default', True, 'default', 'ob', 'BTC/USD', {})
+    recorder.frame('default', dumps({'success': True, 'subscribe': 'orderBookL2:XBTUSD', 'request': {'op': 'subscribe', 'args': ['orderBookL2:XBTUSD']}}))
+    rows = []
+    for side in ('asks', 'bids'):
+        for price, amount in book.levels(side):
+            rows.append(dict(row(side, price, amount), price=price))
+    recorder.frame('default', dumps({'table': 'orderBookL2', 'action': 'partial', 'keys': ['symbol', 'id', 'side'], 'data': rows}))
+    for i in range(0, count - 2):
+        side, price, amount = book.changes()[0]
+        if amount == 0:
+            recorder.frame('default', dumps({'table': 'orderBookL2', 'action': 'delete', 'data': [row(side, price)]}))
+            del ids[(side, price)]
+        elif (side, price) in ids:
+            recorder.frame('default', dumps({'table': 'orderBookL2', 'action': 'update', 'data': [row(side, price, amount)]}))
+        else:
+            recorder.frame('default', dumps({'table': 'orderBookL2', 'action': 'insert', 'data': [dict(row(side, price, amount), price=price)]}))
+
+
+def bittrex_ue(recorder, count, rng):
+    book = SyntheticBook(rng)
+    recorder.subscription('default', True, 'default', 'ob', 'BTC/USDT', {})
+    recorder.frame('default', dumps({'R': True, 'I': 'ob-sub_1_USDT-BTC'}))
+    recorder.frame('default', dumps({'R': deflate_base64({
+        'M': 'USDT-BTC',
+        'N': 1000,
+        'Z': [{'Q': amount, 'R': price} for (price, amount) in book.levels('bids')],
+        'S': [{'Q': amount, 'R': price} for (price, amount) in book.levels('asks')],
+        'f': [],
+    }), 'I': 'snapshot_1_USDT-BTC'}))
+    for i in range(0, count - 2):
+        delta = {'M': 'USDT-BTC', 'N': 1001 + i, 'Z': [], 'S': [], 'f': []}
+        for side, price, amount in book.changes():
+            delta['Z' if side == 'bids' else 'S'].append({'TY': 1 if amount == 0 else 2, 'R': price, 'Q': amount})
+        recorder.frame('default', dumps({'C': 'd-1', 'M': [{'H': 'C2', 'M': 'uE', 'A': [deflate_base64(delta)]}]}))
+
+
+def huobipro_depth(recorder, count, rng):
+    book = SyntheticBook(rng, depth=150)
+    recorder.open('default', 'default', {'type': 'ws', 'id': 'default', 'url': 'wss://api.huobi.pro/ws', 'decompress': 'gunzip'})
+    recorder.subscription('default', True, 'default', 'ob', 'BTC/USDT', {})
+    for i in range(0, count):
+        book.changes()
+        # step0 pushes the whole top of the book every time
+        recorder.frame('default', gzip.compress(dumps({'ch': 'market.btcusdt.depth.step0', 'ts': 1550000000000 + i, 'tick': {
+            'bids': [[price, amount] for (price, amount) in book.levels('bids')],
+            'asks': [[price, amount] for (price, amount) in book.levels('asks')],
+            'ts': 1550000000000 + i,
+            'version': 1000 + i,
+        }}), 1))
+
+
+def poloniex_book(recorder, count, rng):
+    book = SyntheticBook(rng)
+    recorder.open('default', 'default', {'type': 'ws', 'id': 'default', 'url': 'wss://api2.poloniex.com'})
+    recorder.subscription('default', True, 'default', 'ob', 'ETH/BTC', {})
+    recorder.subscription('default', True, 'default', 'trade', 'ETH/BTC', {})
+    recorder.frame('default', dumps([148, 1000, [['i', {'currencyPair': 'BTC_ETH', 'orderBook': [
+        {text(price): text(amount) for (price, amount) in book.levels('asks')},
+        {text(price): text(amount) for (price, amount) in book.levels('bids')},
+    ]}]]]))
+    for i in range(0, count - 1):
+        updates = [['o', 1 if side == 'bids' else 0, text(price), text(amount)] for (side, price, amount) in book.changes()]
+        if not (i % 10):
+            side, price, amount = book.trade()
+            updates.append(['t', str(100000 + i), 1 if side == 'buy' else 0, text(price), text(amount), 1550000000 + i])
+        recorder.frame('default', dumps([148, 1001 + i, updates]))
+
+
+def hitbtc2_book(recorder, count, rng):
+    book = SyntheticBook(rng)
+    recorder.open('default', 'default', {'type': 'ws', 'id': 'default', 'url': 'wss://api.hitbtc.com/api/2/ws'})
+    recorder.subscription('default', True, 'default', 'ob', 'BTC/USD', {})
+    recorder.frame('default', dumps({'jsonrpc': '2.0', 'method': 'snapshotOrderbook', 'params': {
+        'ask': [{'price': text(price), 'size': text(amount)} for (price, amount) in book.levels('asks')],
+        'bid': [{'price': text(price), 'size': text(amount)} for (price, amount) in book.levels('bids')],
+        'symbol': 'BTCUSD',
+        'sequence': 1000,
+    }}))
+    for i in range(0, count - 1):
+        changes = book.changes()
+        recorder.frame('default', dumps({'jsonrpc': '2.0', 'method': 'updateOrderbook', 'params': {
+            'ask': [{'price': text(price), 'size': text(amount)} for (side, price, amount) in changes if side == 'asks'],
+            'bid': [{'price': text(price), 'size': text(amount)} for (side, price, amount) in changes if side == 'bids'],
+            'symbol': 'BTCUSD',
+            'sequence': 1001 + i,
+        }}))
+
+
+def gemini_book(recorder, count, rng):
+    book = SyntheticBook(rng)
+    recorder.open('default', 'default', {'type': 'ws-s', 'id': 'default', 'url': 'wss://api.gemini.com/v1/marketdata/btcusd?heartbeat=true&bids=true&offers=true&trades=true'})
+    recorder.subscription('default', True, 'default', 'ob', 'BTC/USD', {})
+    events = []
+    for side in ('bids', 'asks'):
+        for price, amount in book.levels(side):
+            events.append({'type': 'change', 'reason': 'initial', 'side': 'bid' if side == 'bids' else 'ask', 'price': text(price), 'remaining': text(amount), 'delta': text(amount)})
+    recorder.frame('default', dumps({'type': 'update', 'eventId': 1000, 'socket_sequence': 0, 'events': events}))
+    for i in range(0, count - 1):
+        events = [{'type': 'change', 'reason': 'cancel' if amount == 0 else 'place', 'side': 'bid' if side == 'bids' else 'ask', 'price': text(price), 'remaining': text(amount), 'delta': text(amount)} for (side, price, amount) in book.changes()]
+        recorder.frame('default', dumps({'type': 'update', 'eventId': 1001 + i, 'timestamp': 1550000000 + i, 'timestampms': 1550000000000 + i, 'socket_sequence': 1 + i, 'events': events}))
+
+
+def cex_book(recorder, count, rng):
+    book = SyntheticBook(rng)
+    recorder.open('default', 'default', {'type': 'ws', 'id': 'default', 'url': 'wss://ws.cex.io/ws/', 'wait4readyEvent': 'auth'})
+    recorder.subscription('default', True, 'default', 'ob', 'BTC/USD', {})
+    recorder.frame('default', dumps({'e': 'order-book-subscribe', 'oid': '1', 'ok': 'ok', 'data': {
+        'timestamp': 1550000000,
+        'bids': [[price, amount] for (price, amount) in book.levels('bids')],
+        'asks': [[price, amount] for (price, amount) in book.levels('asks')],
+        'pair': 'BTC:USD',
+        'id': 1000,
+    }}))
+    for i in range(0, count - 1):
+        changes = book.changes()
+        recorder.frame('default', dumps({'e': 'md_update', 'data': {
+            'id': 1001 + i,
+            'pair': 'BTC:USD',
+            'time': 1550000000000 + i,
+            'bids': [[price, amount] for (side, price, amount) in changes if side == 'bids'],
+            'asks': [[price, amount] for (side, price, amount) in changes if side == 'asks'],
+        }}))
+
+
+# name: (exchange id, markets, fixture)
+FIXTURES = {
+    'binance-depth': ('binance', [{'id': 'BTCUSDT', 'symbol': 'BTC/USDT', 'base': 'BTC', 'quote': 'USDT'}], binance_depth),
+    'binance-trade': ('binance', [{'id': 'BTCUSDT', 'symbol': 'BTC/USDT', 'base': 'BTC', 'quote': 'USDT'}], binance_trade),
+    'bitfinex2-book': ('bitfinex2', [{'id': 'tBTCUSD', 'symbol': 'BTC/USD', 'base': 'BTC', 'quote': 'USD'}], bitfinex2_book),
+    'kraken-book': ('kraken', [{'id': 'XXBTZUSD', 'symbol': 'BTC/USD', 'base': 'BTC', 'quote': 'USD'}], kraken_book),
+    'bitmex-l2': ('bitmex', [{'id': 'XBTUSD', 'symbol': 'BTC/USD', 'base': 'BTC', 'quote': 'USD'}], bitmex_l2),
+    'bittrex-ue': ('bittrex', [{'id': 'USDT-BTC', 'symbol': 'BTC/USDT', 'base': 'BTC', 'quote': 'USDT'}], bittrex_ue),
+    'huobipro-depth': ('huobipro', [{'id': 'btcusdt', 'symbol': 'BTC/USDT', 'base': 'BTC', 'quote': 'USDT'}], huobipro_depth),
+    'poloniex-book': ('poloniex', [{'id': 'BTC_ETH', 'id2': '148', 'symbol': 'ETH/BTC', 'base': 'ETH', 'quote': 'BTC'}], poloniex_book),
+    'hitbtc2-book': ('hitbtc2', [{'id': 'BTCUSD', 'symbol': 'BTC/USD', 'base': 'BTC', 'quote': 'USD'}], hitbtc2_book),
+    'gemini-book': ('gemini', [{'id': 'btcusd', 'symbol': 'BTC/USD', 'base': 'BTC', 'quote': 'USD'}], gemini_book),
+    'cex-book': ('cex', [{'id': 'BTC/USD', 'symbol': 'BTC/USD', 'base': 'BTC', 'quote': 'USD'}], cex_book),
+}
@@ -0,0 +1,806 @@
+# -*- coding: utf-8 -*-
+
+"""A local stand-in for the websocket APIs of the exchanges, for load tests.
+
+The server speaks the protocols the library consumes, each on its own route:
+
+    /stream             binance combined streams, live SUBSCRIBE included
+    /api/v1/depth       binance REST snapshots that line up with the streams
+    /ws/2               bitfinex2 channels
+    /app/{key}          Pusher, with the channels of bitstamp
+    /socket.io/         Socket.IO (EIO=3), with the order books of theocean
+    /signalr/...        SignalR negotiate and connect, with the hub of bittrex
+    /stand-in           GET the stats, ?rate= ?trades= ?skip= ?drop= change them
+
+Every symbol is one SyntheticBook shared by all the connections subscribed to
+it, updated rate times and traded trades times a second while anybody listens.
+configure(exchange) points the conx-tpls (and the REST calls the websocket
+handlers make) of an exchange at the server and sets the markets it serves.
+drop() closes connections and skip() leaves gaps in the sequence numbers, to
+exercise reconnect and resync under load.
+
+    python benchmark/server.py --port 8765 --rate 1000 --symbols 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from aiohttp import web
+from aiohttp import WSMsgType
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import SyntheticBook  # noqa: E402
+from fixtures import deflate_base64  # noqa: E402
+from fixtures import text  # noqa: E402
+
+__all__ = [
+    'StandInServer',
+]
+
+
+def dumps(data):
+    return json.dumps(data, separators=(',', ':'))
+
+
+def milliseconds():
+    return int(time.time() * 1000)
+
+
+class Feed(object):
+    """The book and the trades of one symbol"""
+
+    def __init__(self, index, base, quote, rng, depth):
+        self.index = index
+        self.base = base
+        self.quote = quote
+        self.book = SyntheticBook(rng, depth)
+        self.sequence = 1000
+        self.trades = 0
+        # event: {(protocol, channel): {session: True}}
+        self.channels = {'ob': {}, 'trade': {}}
+        # the schedule restarts whenever the feed or the rates come to life
+        self.since = None
+        self.updates = 0
+        self.traded = 0
+
+    def active(self):
+        return bool(self.channels['ob'] or self.channels['trade'])
+
+
+class Session(object):
+    """One websocket connection to the server"""
+
+    def __init__(self, protocol, request, ws):
+        self.protocol = protocol
+        self.request = request
+        self.ws = ws
+        self.transport = request.transport
+        # format of the frames sent to this connection, see Protocol.book
+        self.key = None
+        # channel: (feed, events)
+        self.subscriptions = {}
+        self.closed = False
+
+    async def send(self, data):
+        if self.closed or self.ws.closed:
+            return False
+        try:
+            await self.ws.send_str(data)
+        except (ConnectionError, RuntimeError):
+            self.closed = True
+            return False
+        self.protocol.frames += 1
+        return True
+
+
+class Protocol(object):
+    """The wire format of one exchange, the server routes its connections
+    to the handshake and the requests, the driver to book() and trade()"""
+
+    exchange_id = None
+    # the events the server generates for the exchange
+    events = ('ob', 'trade')
+
+    def __init__(self, server):
+        self.server = server
+        self.frames = 0
+        # market id: feed
+        self.feeds = {}
+        for feed in server.feeds:
+            self.feeds[self.market(feed)['id']] = feed
+
+    def market(self, feed):
+        raise NotImplementedError
+
+    def routes(self):
+        return []
+
+    def baseurl(self):
+        raise NotImplementedError
+
+    def configure(self, exchange):
+        for name in exchange.wsconf['conx-tpls']:
+            exchange.wsconf['conx-tpls'][name]['baseurl'] = self.baseurl()
+
+    async def opened(self, session):
+        pass
+
+    async def received(self, session, data):
+        pass
+
+    def book(self, feed, channel, changes, key):
+        """The frames that carry changes to the subscribers of channel whose
+        session key is key, [] to send nothing"""
+        return []
+
+    def trade(self, feed, channel, trade, key):
+        return []
+
+    async def handle(self, request):
+        return await self.server.serve(self, request)
+
+
+class BinanceStreams(Protocol):
+
+    exchange_id = 'binance'
+
+    def market(self, feed):
+        return {'id': feed.base + feed.quote, 'symbol': feed.base + '/' + feed.quote, 'base': feed.base, 'quote': feed.quote}
+
+    def routes(self):
+        return [
+            web.get('/stream', self.handle),
+            web.get('/api/v1/depth', self.depth),
+            web.get('/api/v3/depth', self.depth),
+        ]
+
+    def baseurl(self):
+        return self.server.url('ws', '/stream?streams=')
+
+    def configure(self, exchange):
+        super(BinanceStreams, self).configure(exchange)
+        for api in ('public', 'v1'):
+            exchange.urls['api'][api] = self.server.url('http', '/api/v1')
+        exchange.urls['api']['v3'] = self.server.url('http', '/api/v3')
+
+    def stream(self, name):
+        """(feed, events) of a stream name, None for an unknown symbol"""
+        parts = name.split('@')
+        feed = self.feeds.get(parts[0].upper())
+        if feed is None:
+            return None
+        kind = parts[1] if len(parts) > 1 else ''
+        if kind == 'depth':
+            return (feed, ('ob',))
+        elif kind in ('trade', 'aggTrade'):
+            return (feed, ('trade',))
+        # accepted, nothing is generated for it
+        return (feed, ())
+
+    async def opened(self, session):
+        streams = session.request.query.get('streams', '')
+        for name in streams.split('/'):
+            subscription = self.stream(name) if name else None
+            if subscription is not None:
+                self.server.subscribe(session, subscription[0], name, *subscription[1])
+
+    async def received(self, session, data):
+        request = json.loads(data)
+        id = request.get('id')
+        method = request.get('method')
+        streams = request.get('params') or []
+        if method == 'LIST_SUBSCRIPTIONS':
+            await session.send(dumps({'result': list(session.subscriptions), 'id': id}))
+            return
+        if method not in ('SUBSCRIBE', 'UNSUBSCRIBE'):
+            await session.send(dumps({'error': {'code': 2, 'msg': 'Invalid request: unknown method'}, 'id': id}))
+            return
+        subscriptions = [self.stream(name) for name in streams]
+        if None in subscriptions:
+            await session.send(dumps({'error': {'code': 2, 'msg': 'Invalid request: unknown symbol'}, 'id': id}))
+            return
+        for name, (feed, events) in zip(streams, subscriptions):
+            if method == 'SUBSCRIBE':
+                self.server.subscribe(session, feed, name, *events)
+            else:
+                self.server.unsubscribe(session, name)
+        await session.send(dumps({'result': None, 'id': id}))
+
+    async def depth(self, request):
+        feed = self.feeds.get(request.query.get('symbol', ''))
+        if feed is None:
+            return web.json_response({'code': -1121, 'msg': 'Invalid symbol.'}, status=400)
+        limit = int(request.query.get('limit', 100))
+        return web.json_response({
+            'lastUpdateId': feed.sequence,
+            'bids': [[text(price), text(amount)] for (price, amount) in feed.book.levels('bids')[:limit]],
+            'asks': [[text(price), text(amount)] for (price, amount) in feed.book.levels('asks')[:limit]],
+        })
+
+    def book(self, feed, channel, changes, key):
+        return [dumps({'stream': channel, 'data': {
+            'e': 'depthUpdate',
+            'E': milliseconds(),
+            's': feed.base + feed.quote,
+            'U': feed.sequence,
+            'u': feed.sequence,
+            'b': [[text(price), text(amount)] for (side, price, amount) in changes if side == 'bids'],
+            'a': [[text(price), text(amount)] for (side, price, amount) in changes if side == 'asks'],
+        }})]
+
+    def trade(self, feed, channel, trade, key):
+        side, price, amount = trade
+        timestamp = milliseconds()
+        if channel.endswith('@aggTrade'):
+            data = {'e': 'aggTrade', 'E': timestamp, 's': feed.base + feed.quote, 'a': feed.trades, 'p': text(price), 'q': text(amount), 'f': feed.trades, 'l': feed.trades, 'T': timestamp, 'm': side == 'sell', 'M': True}
+        else:
+            data = {'e': 'trade', 'E': timestamp, 's': feed.base + feed.quote, 't': feed.trades, 'p': text(price), 'q': text(amount), 'b': 2 * feed.trades, 'a': 2 * feed.trades + 1, 'T': timestamp, 'm': side == 'sell', 'M': True}
+        return [dumps({'stream': channel, 'data': data})]
+
+
+class Bitfinex2Channels(Protocol):
+
+    exchange_id = 'bitfinex2'
+    # conf flags
+    TIMESTAMP = 32768
+
+    def market(self, feed):
+        return {'id': 't' + feed.base + feed.quote, 'symbol': feed.base + '/' + feed.quote, 'base': feed.base, 'quote': feed.quote}
+
+    def routes(self):
+        return [web.get('/ws/2', self.handle)]
+
+    def baseurl(self):
+        return self.server.url('ws', '/ws/2')
+
+    def channel(self, feed, name):
+        # channel ids only have to be unique per connection, these are global
+        return feed.index * 2 + (1 if name == 'book' else 2)
+
+    async def opened(self, session):
+        session.key = 0
+        await session.send(dumps({'event': 'info', 'version': 2, 'serverId': 'stand-in', 'platform': {'status': 1}}))
+
+    async def received(self, session, data):
+        request = json.loads(data)
+        event = request.get('event')
+        if event == 'conf':
+            session.key = int(request.get('flags', 0))
+            await session.send(dumps({'event': 'conf', 'status': 'OK', 'flags': session.key}))
+        elif event == 'ping':
+            await session.send(dumps({'event': 'pong', 'ts': milliseconds(), 'cid': request.get('cid')}))
+        elif event == 'subscribe':
+            await self.subscribe(session, request)
+        elif event == 'unsubscribe':
+            chanId = request.get('chanId')
+            if chanId in session.subscriptions:
+                self.server.unsubscribe(session, chanId)
+                await session.send(dumps({'event': 'unsubscribed', 'status': 'OK', 'chanId': chanId}))
+            else:
+                await session.send(dumps({'event': 'error', 'msg': 'unsubscribe: invalid', 'code': 10400}))
+        else:
+            await session.send(dumps({'event': 'error', 'msg': 'unknown event', 'code': 10000}))
+
+    async def subscribe(self, session, request):
+        name = request.get('channel')
+        id = request.get('symbol')
+        feed = self.feeds.get(id)
+        if (feed is None) or (name not in ('book', 'trades')):
+            await session.send(dumps({'event': 'error', 'msg': 'symbol: invalid', 'code': 10300, 'channel': name, 'symbol': id}))
+            return
+        chanId = self.channel(feed, name)
+        if chanId in session.subscriptions:
+            await session.send(dumps({'event': 'error', 'msg': 'subscribe: dup', 'code': 10301, 'channel': name, 'symbol': id}))
+            return
+        response = {'event': 'subscribed', 'channel': name, 'chanId': chanId, 'symbol': id, 'pair': id[1:]}
+        if name == 'book':
+            length = int(request.get('len', 25))
+            response.update({'prec': request.get('prec', 'P0'), 'freq': request.get('freq', 'F0'), 'len': str(length)})
+            snapshot = [[price, 1, amount] for (price, amount) in feed.book.levels('bids')[:length]]
+            snapshot += [[price, 1, -amount] for (price, amount) in feed.book.levels('asks')[:length]]
+        else:
+            snapshot = []
+        await session.send(dumps(response))
+        await session.send(dumps(self.frame(chanId, [snapshot], session.key)))
+        self.server.subscribe(session, feed, chanId, 'ob' if name == 'book' else 'trade')
+
+    def frame(self, chanId, data, key):
+        frame = [chanId] + data
+        if key & self.TIMESTAMP:
+            frame.append(milliseconds())
+        return frame
+
+    def book(self, feed, channel, changes, key):
+        # a level per frame, a zero count removes it, the sign is the side
+        frames = []
+        for side, price, amount in changes:
+            if side == 'bids':
+                frames.append(dumps(self.frame(channel, [[price, 1 if amount else 0, amount or 1]], key)))
+            else:
+                frames.append(dumps(self.frame(channel, [[price, 1 if amount else 0, -(amount or 1)]], key)))
+        return frames
+
+    def trade(self, feed, channel, trade, key):
+        side, price, amount = trade
+        return [dumps(self.frame(channel, ['te', [feed.trades, milliseconds(), amount if side == 'buy' else -amount, price]], key))]
+
+
+class PusherChannels(Protocol):
+    """Pusher protocol 7, with the order_book and live_trades channels of
+    bitstamp, whose order book events are the top 100 levels each time"""
+
+    exchange_id = 'bitstamp'
+
+    def market(self, feed):
+        return {'id': (feed.base + feed.quote).lower(), 'symbol': feed.base + '/' + feed.quote, 'base': feed.base, 'quote': feed.quote}
+
+    def routes(self):
+        return [web.get('/app/{key}', self.handle)]
+
+    def baseurl(self):
+        return self.server.url('ws', '/app/de504dc5763aeef9ff52')
+
+    def channel(self, name):
+        """(feed, event) of a channel name, None for an unknown channel"""
+        for prefix, event in (('order_book', 'ob'), ('live_trades', 'trade')):
+            if name == prefix:
+                return (self.feeds.get('btcusd'), event)
+            elif name.startswith(prefix + '_'):
+                return (self.feeds.get(name[len(prefix) + 1:]), event)
+        return None
+
+    async def opened(self, session):
+        await session.send(dumps({'event': 'pusher:connection_established', 'data': dumps({'socket_id': '%d.%d' % (id(session) % 100000, self.frames), 'activity_timeout': 120})}))
+
+    async def received(self, session, data):
+        message = json.loads(data)
+        event = message.get('event')
+        if event == 'pusher:ping':
+            await session.send(dumps({'event': 'pusher:pong', 'data': {}}))
+        elif event == 'pusher:subscribe':
+            name = message['data']['channel']
+            await session.send(dumps({'event': 'pusher_internal:subscription_succeeded', 'channel': name, 'data': '{}'}))
+            # pusher accepts any channel, one nobody publishes on stays silent
+            subscription = self.channel(name)
+            if (subscription is not None) and (subscription[0] is not None):
+                feed, event = subscription
+                self.server.subscribe(session, feed, name, event)
+                if event == 'ob':
+                    await session.send(self.book(feed, name, [], None)[0])
+        elif event == 'pusher:unsubscribe':
+            self.server.unsubscribe(session, message['data']['channel'])
+        else:
+            await session.send(dumps({'event': 'pusher:error', 'data': {'code': None, 'message': 'Unsupported event received on socket: ' + str(event)}}))
+
+    def book(self, feed, channel, changes, key):
+        now = time.time()
+        return [dumps({'event': 'data', 'channel': channel, 'data': dumps({
+            'timestamp': str(int(now)),
+            'microtimestamp': str(int(now * 1000000)),
+            'bids': [[text(price), text(amount)] for (price, amount) in feed.book.levels('bids')[:100]],
+            'asks': [[text(price), text(amount)] for (price, amount) in feed.book.levels('asks')[:100]],
+        })})]
+
+    def trade(self, feed, channel, trade, key):
+        side, price, amount = trade
+        now = time.time()
+        return [dumps({'event': 'trade', 'channel': channel, 'data': dumps({
+            'id': feed.trades,
+            'amount': amount,
+            'amount_str': text(amount),
+            'price': price,
+            'price_str': text(price),
+            'type': 0 if side == 'buy' else 1,
+            'timestamp': str(int(now)),
+            'microtimestamp': str(int(now * 1000000)),
+            'buy_order_id': 2 * feed.trades,
+            'sell_order_id': 2 * feed.trades + 1,
+        })})]
+
+
+class SocketIoChannels(Protocol):
+    """Socket.IO over Engine.IO 3, with the order_book channel of theocean,
+    amounts in base units of 18 decimals"""
+
+    exchange_id = 'theocean'
+    events = ('ob',)
+
+    def market(self, feed):
+        baseId = feed.base.lower()
+        quoteId = feed.quote.lower()
+        return {'id': baseId + '/' + quoteId, 'symbol': feed.base + '/' + feed.quote, 'base': feed.base, 'quote': feed.quote, 'baseId': baseId, 'quoteId': quoteId}
+
+    def routes(self):
+        return [web.get('/socket.io/', self.handle)]
+
+    def baseurl(self):
+        return self.server.url('ws', '/socket.io/?EIO=3&transport=websocket')
+
+    async def opened(self, session):
+        await session.send('0' + dumps({'sid': '%x' % id(session), 'upgrades': [], 'pingInterval': 25000, 'pingTimeout': 60000}))
+        await session.send('40')
+
+    async def received(self, session, data):
+        if data == '2':
+            await session.send('3')
+        elif data == '41':
+            await session.ws.close()
+        elif data.startswith('42'):
+            name, request = json.loads(data[2:])[:2]
+            if (request.get('type') == 'subscribe') and (request.get('channel') == 'order_book'):
+                payload = request.get('payload', {})
+                feed = self.feeds.get(payload.get('baseTokenAddress', '') + '/' + payload.get('quoteTokenAddress', ''))
+                if feed is None:
+                    await session.send('42' + dumps(['error', {'type': 'error', 'message': 'unknown token pair'}]))
+                    return
+                channel = 'order_book_' + feed.base.lower() + '_' + feed.quote.lower()
+                depth = int(payload.get('depth', 100))
+                levels = {side: [(price, amount) for (price, amount) in feed.book.levels(side)[:depth]] for side in ('bids', 'asks')}
+                await session.send('42' + dumps(['data', {'type': 'snapshot', 'channel': 'order_book', 'channelId': channel, 'payload': self.levels(levels['bids'], levels['asks'])}]))
+                self.server.subscribe(session, feed, channel, 'ob')
+
+    def levels(self, bids, asks):
+        def level(price, amount):
+            # amounts have 4 decimals, the rest is zeros, no float rounding
+            return {'price': text(price), 'availableAmount': '%d' % round(amount * 10000) + '0' * 14}
+        return {
+            'bids': [level(price, amount) for (price, amount) in bids],
+            'asks': [level(price, amount) for (price, amount) in asks],
+        }
+
+    def book(self, feed, channel, changes, key):
+        bids = [(price, amount) for (side, price, amount) in changes if side == 'bids']
+        asks = [(price, amount) for (side, price, amount) in changes if side == 'asks']
+        return ['42' + dumps(['data', {'type': 'update', 'channel': 'order_book', 'channelId': channel, 'payload': self.levels(bids, asks)}])]
+
+
+class SignalRHub(Protocol):
+    """SignalR 1.5 negotiate and connect, with the c2 hub of bittrex whose
+    payloads are deflated and base64 encoded"""
+
+    exchange_id = 'bittrex'
+
+    def __init__(self, server):
+        super(SignalRHub, self).__init__(server)
+        self.tokens = {}
+        self.messages = 0
+
+    def market(self, feed):
+        return {'id': feed.quote + '-' + feed.base, 'symbol': feed.base + '/' + feed.quote, 'base': feed.base, 'quote': feed.quote}
+
+    def routes(self):
+        return [
+            web.get('/signalr/negotiate', self.negotiate),
+            # bittrex joins the path of its socket api with an extra slash
+            web.get('/signalr//negotiate', self.negotiate),
+            web.get('/signalr/connect', self.connect),
+        ]
+
+    def baseurl(self):
+        return self.server.url('ws', '/signalr/connect?transport=webSockets&clientProtocol=1.5&connectionToken=')
+
+    def configure(self, exchange):
+        super(SignalRHub, self).configure(exchange)
+        for name in exchange.wsconf['conx-tpls']:
+            exchange.wsconf['conx-tpls'][name]['tokenUrl'] = self.server.url('http', '/signalr/negotiate?clientProtocol=1.5&connectionData=[{"name":"c2"}]')
+        exchange.urls['api']['socket'] = self.server.url('http', '/signalr')
+
+    async def negotiate(self, request):
+        token = '%x-%d' % (id(request), len(self.tokens))
+        self.tokens[token] = True
+        return web.json_response({
+            'Url': '/signalr',
+            'ConnectionToken': token,
+            'ConnectionId': token,
+            'KeepAliveTimeout': 20.0,
+            'DisconnectTimeout': 30.0,
+            'ConnectionTimeout': 110.0,
+            'TryWebSockets': True,
+            'ProtocolVersion': '1.5',
+            'TransportConnectTimeout': 5.0,
+            'LongPollDelay': 0.0,
+        })
+
+    async def connect(self, request):
+        if request.query.get('connectionToken') not in self.tokens:
+            return web.Response(status=400, text='The connection id is in the incorrect format.')
+        return await self.handle(request)
+
+    def cursor(self):
+        self.messages += 1
+        return 'd-stand-in,' + str(self.messages)
+
+    async def opened(self, session):
+        await session.send(dumps({'C': self.cursor(), 'S': 1, 'M': []}))
+
+    async def received(self, session, data):
+        request = json.loads(data)
+        method = request.get('M')
+        arguments = request.get('A') or []
+        index = request.get('I')
+        feed = self.feeds.get(arguments[0]) if arguments else None
+        if method == 'SubscribeToExchangeDeltas':
+            if feed is not None:
+                # the deltas of a market carry its fills too
+                self.server.subscribe(session, feed, arguments[0], 'ob', 'trade')
+            await session.send(dumps({'R': feed is not None, 'I': index}))
+        elif (method == 'QueryExchangeState') and (feed is not None):
+            await session.send(dumps({'R': deflate_base64({
+                'M': arguments[0],
+                'N': feed.sequence,
+                'Z': [{'Q': amount, 'R': price} for (price, amount) in feed.book.levels('bids')],
+                'S': [{'Q': amount, 'R': price} for (price, amount) in feed.book.levels('asks')],
+                'f': [],
+            }), 'I': index}))
+        else:
+            await session.send(dumps({'I': index, 'E': "There was an error invoking Hub method '" + str(request.get('H')) + '.' + str(method) + "'."}))
+
+    def delta(self, channel, feed, bids, asks, fills):
+        return [dumps({'C': self.cursor(), 'M': [{'H': 'C2', 'M': 'uE', 'A': [deflate_base64({
+            'M': channel,
+            'N': feed.sequence,
+            'Z': bids,
+            'S': asks,
+            'f': fills,
+        })]}]})]
+
+    def book(self, feed, channel, changes, key):
+        # 0 = ADD, 1 = REMOVE, 2 = UPDATE
+        levels = {'bids': [], 'asks': []}
+        for side, price, amount in changes:
+            levels[side].append({'TY': 2 if amount else 1, 'R': price, 'Q': amount})
+        return self.delta(channel, feed, levels['bids'], levels['asks'], [])
+
+    def trade(self, feed, channel, trade, key):
+        side, price, amount = trade
+        return self.delta(channel, feed, [], [], [{'FI': feed.trades, 'OT': side.upper(), 'R': price, 'Q': amount, 'T': milliseconds()}])
+
+
+class StandInServer(object):
+    """Serves synthetic books of symbols symbols, updated rate times and
+    traded trades times a second per symbol anybody is subscribed to. Both
+    rates can be changed while the server runs, set_rates() restarts the
+    schedule. A feed that falls more than a second behind its schedule, when
+    the connections do not take the frames as fast, sheds the backlog and
+    counts it in stats()['shed']."""
+
+    protocols = (BinanceStreams, Bitfinex2Channels, PusherChannels, SocketIoChannels, SignalRHub)
+
+    def __init__(self, host='127.0.0.1', port=0, rate=100, trades=10, symbols=10, depth=50, seed=1, tick=0.005):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.trades = trades
+        self.tick = tick
+        rng = random.Random(seed)
+        self.feeds = []
+        for i in range(0, symbols):
+            base = ('BTC', 'ETH')[i] if i < 2 else 'S%03d' % i
+            self.feeds.append(Feed(i, base, 'USD', rng, depth))
+        self.exchanges = {}
+        for protocol in self.protocols:
+            self.exchanges[protocol.exchange_id] = protocol(self)
+        self.sessions = {}
+        self.shed = 0
+        self.started = None
+        self.runner = None
+        self.driver = None
+
+    def url(self, scheme, path):
+        return scheme + '://' + self.host + ':' + str(self.port) + path
+
+    def markets(self, exchange_id):
+        protocol = self.exchanges[exchange_id]
+        return [protocol.market(feed) for feed in self.feeds]
+
+    def configure(self, exchange):
+        """Point exchange at the server and set the markets it serves"""
+        if exchange.id not in self.exchanges:
+            raise ValueError('the stand-in server does not speak the protocol of ' + exchange.id)
+        self.exchanges[exchange.id].configure(exchange)
+        exchange.set_markets(self.markets(exchange.id))
+
+    async def start(self):
+        app = web.Application()
+        for protocol in self.exchanges.values():
+            app.add_routes(protocol.routes())
+        app.add_routes([web.get('/stand-in', self.control)])
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+        self.started = time.time()
+        self.driver = asyncio.ensure_future(self.drive())
+        return {exchange_id: protocol.baseurl() for exchange_id, protocol in self.exchanges.items()}
+
+    async def stop(self):
+        if self.driver is not None:
+            self.driver.cancel()
+            try:
+                await self.driver
+            except asyncio.CancelledError:
+                pass
+            self.driver = None
+        for session in list(self.sessions):
+            await session.ws.close()
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def serve(self, protocol, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        session = Session(protocol, request, ws)
+        self.sessions[session] = True
+        try:
+            await protocol.opened(session)
+            async for message in ws:
+                if message.type == WSMsgType.TEXT:
+                    try:
+                        await protocol.received(session, message.data)
+                    except (ValueError, KeyError, TypeError, IndexError, AttributeError):
+                        # a malformed request, exchanges ignore those too
+                        pass
+        finally:
+            session.closed = True
+            for channel in list(session.subscriptions):
+                self.unsubscribe(session, channel)
+            self.sessions.pop(session, None)
+        return ws
+
+    def subscribe(self, session, feed, channel, *events):
+        session.subscriptions[channel] = (feed, events)
+        if events and not feed.active():
+            feed.since = None
+        for event in events:
+            feed.channels[event].setdefault((session.protocol, channel), {})[session] = True
+
+    def unsubscribe(self, session, channel):
+        feed, events = session.subscriptions.pop(channel, (None, ()))
+        key = (session.protocol, channel)
+        for event in events:
+            sessions = feed.channels[event].get(key)
+            if sessions is not None:
+                sessions.pop(session, None)
+                if not sessions:
+                    del feed.channels[event][key]
+
+    async def broadcast(self, feed, event, data):
+        for (protocol, channel), sessions in list(feed.channels[event].items()):
+            frames = {}
+            for session in list(sessions):
+                # formatted once per channel and format, sent to everybody
+                if session.key not in frames:
+                    if event == 'ob':
+                        frames[session.key] = protocol.book(feed, channel, data, session.key)
+                    else:
+                        frames[session.key] = protocol.trade(feed, channel, data, session.key)
+                for frame in frames[session.key]:
+                    if not await session.send(frame):
+                        break
+
+    async def drive(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            now = loop.time()
+            for feed in self.feeds:
+                if not feed.active():
+                    continue
+                if feed.since is None:
+                    feed.since = now
+                    feed.updates = 0
+                    feed.traded = 0
+                elapsed = now - feed.since
+                updates = int(elapsed * self.rate) - feed.updates
+                trades = int(elapsed * self.trades) - feed.traded
+                if updates > self.rate + 1:
+                    self.shed += updates - self.rate
+                    feed.updates += updates - self.rate
+                    updates = self.rate
+                if trades > self.trades + 1:
+                    feed.traded += trades - self.trades
+                    trades = self.trades
+                for i in range(0, updates):
+                    feed.updates += 1
+                    feed.sequence += 1
+                    await self.broadcast(feed, 'ob', feed.book.changes())
+                for i in range(0, trades):
+                    feed.traded += 1
+                    feed.trades += 1
+                    await self.broadcast(feed, 'trade', feed.book.trade())
+            await asyncio.sleep(self.tick)
+
+    def set_rates(self, rate=None, trades=None):
+        if rate is not None:
+            self.rate = rate
+        if trades is not None:
+            self.trades = trades
+        for feed in self.feeds:
+            feed.since = None
+
+    def skip(self, count=1, symbol=None):
+        """Leave a gap of count in the sequence numbers of symbol, or of all"""
+        for feed in self.feeds:
+            if (symbol is None) or (symbol == feed.base + '/' + feed.quote):
+                feed.sequence += count
+
+    async def drop(self, exchange_id=None, clean=True):
+        """Close the connections of exchange_id, or all of them, with a close
+        frame or, if clean is False, by cutting the tcp connection"""
+        dropped = 0
+        for session in list(self.sessions):
+            if (exchange_id is None) or (session.protocol.exchange_id == exchange_id):
+                dropped += 1
+                if clean:
+                    await session.ws.close(code=1001, message=b'stand-in drop')
+                else:
+                    session.closed = True
+                    session.transport.abort()
+        return dropped
+
+    def stats(self):
+        frames = {exchange_id: protocol.frames for exchange_id, protocol in self.exchanges.items()}
+        seconds = time.time() - self.started if self.started is not None else 0
+        return {
+            'connections': len(self.sessions),
+            'subscribed': sum(1 for feed in self.feeds if feed.active()),
+            'frames': frames,
+            'seconds': seconds,
+            'rate': sum(frames.values()) / seconds if seconds else None,
+            'shed': self.shed,
+        }
+
+    async def control(self, request):
+        query = request.query
+        if ('rate' in query) or ('trades' in query):
+            self.set_rates(int(query['rate']) if 'rate' in query else None, int(query['trades']) if 'trades' in query else None)
+        if 'skip' in query:
+            self.skip(int(query['skip']), query.get('symbol'))
+        if 'drop' in query:
+            await self.drop(query['drop'] or None, query.get('clean', '1') != '0')
+        return web.json_response(self.stats())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rate', type=int, default=100, help='book updates per second per subscribed symbol')
+    parser.add_argument('--trades', type=int, default=10, help='trades per second per subscribed symbol')
+    parser.add_argument('--symbols', type=int, default=10, help='symbols served, BTC/USD, ETH/USD, S002/USD, ...')
+    parser.add_argument('--depth', type=int, default=50, help='levels per side of the books')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--stats', type=float, default=5, help='seconds between two stats lines, 0 for none')
+    argv = parser.parse_args()
+
+    server = StandInServer(argv.host, argv.port, argv.rate, argv.trades, argv.symbols, argv.depth, argv.seed)
+    loop = asyncio.get_event_loop()
+    for exchange_id, url in sorted(loop.run_until_complete(server.start()).items()):
+        print('%-10s %s' % (exchange_id, url))
+    sys.stdout.flush()
+
+    async def report():
+        while True:
+            await asyncio.sleep(argv.stats)
+            print(dumps(server.stats()))
+            sys.stdout.flush()
+
+    if argv.stats:
+        asyncio.ensure_future(report())
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(server.stop())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""Futures of the websocket requests waiting for their acknowledgement"""
+
+__all__ = [
+    'CorrelationRegistry',
+]
+
+
+class CorrelationRegistry(object):
+    """Maps the id of every request sent to the future of its answer.
+
+    A request may belong to a connection and to a group, e.g. all the
+    subscriptions of one symbol, so a disconnection rejects everything sent
+    over the connection and an exchange that acknowledges a channel without
+    echoing request ids settles the whole group at once. The deadline of a
+    request runs on the exchange's TimerWheel and is cancelled with it.
+
+    An id is forgotten as soon as its future is done, however that happens.
+    leaks() lists the requests that are pending for longer than expected,
+    i.e. those registered without a deadline that nobody ever settled."""
+
+    def __init__(self, loop, timers=None):
+        self.loop = loop
+        self.timers = timers
+        self.pending = {}
+        self.connections = {}
+        self.groups = {}
+        self.resolved = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def __contains__(self, id):
+        return id in self.pending
+
+    def __len__(self):
+        return len(self.pending)
+
+    def register(self, id, timeout=None, conxid=None, group=None, scope=None):
+        """Return the future of the request id, rejected with a TimeoutError
+        after timeout seconds unless settled before"""
+        if id in self.pending:
+            raise ValueError('request ' + str(id) + ' is already pending')
+        future = self.loop.create_future()
+        entry = {
+            'future': future,
+            'conxid': conxid,
+            'group': group,
+            'scope': scope if scope is not None else str(id),
+            'created': self.loop.time(),
+            'deadline': None,
+        }
+        self.pending[id] = entry
+        if conxid is not None:
+            self.connections.setdefault(conxid, {})[id] = True
+        if group is not None:
+            self.groups.setdefault(group, {})[id] = True
+        if timeout is not None:
+            timers = self.timers if self.timers is not None else self.loop
+            entry['deadline'] = timers.call_later(timeout, self._expire, id)
+        future.add_done_callback(lambda f: self._forget(id, entry))
+        return future
+
+    def _forget(self, id, entry):
+        if self.pending.get(id) is not entry:
+            return
+        del self.pending[id]
+        if entry['deadline'] is not None:
+            entry['deadline'].cancel()
+        for index, key in ((self.connections, entry['conxid']), (self.groups, entry['group'])):
+            if key is not None:
+                ids = index.get(key)
+                if ids is not None:
+                    ids.pop(id, None)
+                    if not ids:
+                        del index[key]
+
+    def _expire(self, id):
+        entry = self.pending.get(id)
+        if (entry is not None) and not entry['future'].done():
+            self.expired += 1
+            entry['future'].set_exception(TimeoutError('timeout in scope: ' + entry['scope']))
+            self._forget(id, entry)
+
+    def scope(self, id):
+        entry = self.pending.get(id)
+        return None if entry is None else entry['scope']
+
+    def resolve(self, id, result=None):
+        """Set the result of request id, return whether it was pending"""
+        entry = self.pending.get(id)
+        if (entry is None) or entry['future'].done():
+            return False
+        self.resolved += 1
+        entry['future'].set_result(result)
+        self._forget(id, entry)
+        return True
+
+    def reject(self, id, error):
+        """Fail request id with error, return whether it was pending"""
+        entry = self.pending.get(id)
+        if (entry is None) or entry['future'].done():
+            return False
+        self.rejected += 1
+        entry['future'].set_exception(error)
+        self._forget(id, entry)
+        return True
+
+    def resolve_group(self, group, result=None):
+        return sum(1 for id in list(self.groups.get(group, ())) if self.resolve(id, result))
+
+    def reject_group(self, group, error):
+        return sum(1 for id in list(self.groups.get(group, ())) if self.reject(id, error))
+
+    def resolve_connection(self, conxid, result=None):
+        return sum(1 for id in list(self.connections.get(conxid, ())) if self.resolve(id, result))
+
+    def reject_connection(self, conxid, error):
+        """Fail every request sent over conxid, e.g. when it disconnects"""
+        return sum(1 for id in list(self.connections.get(conxid, ())) if self.reject(id, error))
+
+    def reject_all(self, error):
+        return sum(1 for id in list(self.pending) if self.reject(id, error))
+
+    def leaks(self, age):
+        """[(id, scope, seconds pending)] of the requests older than age seconds"""
+        now = self.loop.time()
+        return [(id, entry['scope'], now - entry['created']) for id, entry in self.pending.items() if now - entry['created'] > age]
+
+    def stats(self):
+        now = self.loop.time()
+        return {
+            'pending': len(self.pending),
+            'oldest': max([now - entry['created'] for entry in self.pending.values()] or [0]),
+            'resolved': self.resolved,
+            'rejected': self.rejected,
+            'expired': self.expired,
+        }
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""Decompression of compressed websocket frames, off the event loop when large"""
+
+import binascii
+import collections
+import concurrent.futures
+import zlib
+
+__all__ = [
+    'DecompressionStage',
+    'Inflater',
+    'executor',
+]
+
+_executor = None
+
+
+def executor():
+    """The thread pool shared by every exchange to inflate large frames.
+    zlib releases the GIL while it inflates, so the loop keeps running."""
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='ccxt-inflate')
+    return _executor
+
+
+class Inflater(object):
+    """Inflates whole zlib, gzip or raw deflate streams with one wbits setting.
+
+    CPython cannot reset a decompressor once its stream ended, so every
+    stream is inflated by a copy of a pristine decompressor set up once,
+    instead of parsing wbits and allocating the state from scratch.
+    Copies are independent, one Inflater may be used from several threads."""
+
+    def __init__(self, wbits=zlib.MAX_WBITS):
+        self.wbits = wbits
+        self.template = zlib.decompressobj(wbits)
+
+    def inflate(self, data):
+        decompressor = self.template.copy()
+        result = decompressor.decompress(data)
+        if not decompressor.eof:
+            raise zlib.error('incomplete or truncated stream')
+        return result
+
+    def inflate_base64(self, text):
+        # a2b_base64 decodes in one C call, without the regex b64decode validates with
+        return self.inflate(binascii.a2b_base64(text))
+
+
+class DecompressionStage(object):
+    """Runs decompress on the frames of one connection and hands the results
+    to deliver in the order the frames arrived.
+
+    Frames up to threshold bytes are decompressed inline while nothing is
+    waiting. Larger ones are decompressed in the thread pool, and the frames
+    arriving meanwhile queue up behind them whatever their size. A frame that
+    cannot be decompressed is passed to fail in its place."""
+
+    def __init__(self, loop, decompress, deliver, fail, threshold=65536):
+        self.loop = loop
+        self.decompress = decompress
+        self.deliver = deliver
+        self.fail = fail
+        self.threshold = threshold
+        self.queue = collections.deque()
+        self.offloaded = 0
+
+    def feed(self, frame):
+        if not self.queue and len(frame) <= self.threshold:
+            try:
+                result = self.decompress(frame)
+            except Exception as ex:
+                self.fail(ex)
+                return
+            self.deliver(result)
+            return
+        if len(frame) > self.threshold:
+            self.offloaded += 1
+            future = self.loop.run_in_executor(executor(), self.decompress, frame)
+            future.add_done_callback(self._done)
+        else:
+            future = self.loop.create_future()
+            try:
+                future.set_result(self.decompress(frame))
+            except Exception as ex:
+                future.set_exception(ex)
+        self.queue.append(future)
+
+    def _done(self, future):
+        while self.queue and self.queue[0].done():
+            head = self.queue.popleft()
+            if head.cancelled():
+                continue
+            error = head.exception()
+            if error is not None:
+                self.fail(error)
+            else:
+                self.deliver(head.result())
+
+    @property
+    def pending(self):
+        return len(self.queue)
+
+    def close(self):
+        """Drop the frames not delivered yet, e.g. when the connection closes"""
+        for future in self.queue:
+            future.cancel()
+        self.queue.clear()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""Callbacks registered for one (event, symbol) pair"""
+
+__all__ = [
+    'SymbolDispatcher',
+]
+
+
+class SymbolDispatcher(object):
+    """Maps (event, symbol) to the tuple of its callbacks.
+
+    An update reaches only the callbacks of its symbol, and nothing at all
+    happens for a pair nobody listens to. The tuples are replaced instead of
+    modified, so callbacks may add or remove callbacks while being called."""
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def add(self, event, symbol, callback):
+        key = (event, symbol)
+        self.callbacks[key] = self.callbacks.get(key, ()) + (callback,)
+
+    def remove(self, event, symbol, callback):
+        key = (event, symbol)
+        callbacks = self.callbacks.get(key, ())
+        if callback in callbacks:
+            callbacks = list(callbacks)
+            callbacks.remove(callback)
+            if callbacks:
+                self.callbacks[key] = tuple(callbacks)
+            else:
+                del self.callbacks[key]
+
+    def has(self, event, symbol):
+        return (event, symbol) in self.callbacks
+
+    def dispatch(self, event, symbol, args):
+        """Call the callbacks of (event, symbol) with args, return whether there were any"""
+        callbacks = self.callbacks.get((event, symbol))
+        if callbacks is None:
+            return False
+        for callback in callbacks:
+            callback(*args)
+        return True
@@ -14,17 +14,34 @@ import math
 import random
 import certifi
 import aiohttp
-import ssl
 import sys
 import yarl
 import re
 import json
-import base64
 import zlib
 
 # -----------------------------------------------------------------------------
 
 from ccxt.async_support.base.throttle import throttle
+from ccxt.async_support.base.rate_limit_coordinator import AsyncUnixSocketRateLimiter
+from ccxt.async_support.base.latency import LatencyTracker
+from ccxt.async_support.base.stream import EventStream
+from ccxt.async_support.base.dispatcher import SymbolDispatcher
+from ccxt.async_support.base import session_pool
+from ccxt.async_support.base.order_book_sync import OrderBookSynchronizer
+from ccxt.async_support.base.snapshot_scheduler import SnapshotScheduler
+from ccxt.async_support.base.decompress import DecompressionStage
+from ccxt.async_support.base.decompress import Inflater
+from ccxt.async_support.base.timer_wheel import TimerWheel
+from ccxt.async_support.base.correlation import CorrelationRegistry
+from ccxt.async_support.base.frame_recorder import FrameRecorder
+from ccxt.async_support.base.frame_recorder import FrameReplayer
+from ccxt.async_support.base.order_book import OrderBook
+from ccxt.async_support.base.order_book import OrderBookSide
+from ccxt.async_support.base.order_book import OrderBookView
+from ccxt.async_support.base.order_book import IndexedOrderBook
+from ccxt.async_support.base.numpy_order_book import NumpyOrderBook
+from ccxt.async_support.base.numpy_order_book import NumpyOrderBookSide
 
 # -----------------------------------------------------------------------------
 
@@ -56,6 +73,35 @@ __all__ = [
 
 class Exchange(BaseExchange, EventEmitter):
 
+    # 'list' keeps websocket books in OrderBook, 'numpy' in NumpyOrderBook
+    orderBookBackend = 'list'
+    # deltas buffered per book while it waits for a snapshot
+    orderBookSyncSize = 1000
+    # order book snapshots fetched at the same time, see SnapshotScheduler
+    snapshotConcurrency = 2
+    # LatencyTracker while enable_latency_tracking() is in effect
+    latency = None
+    _lastWebsocketNonce = None
+    # queue size and overflow policy of the watch_* streams, see EventStream
+    websocketStreamMaxsize = 100
+    websocketStreamOverflow = 'block'
+    # events that carry the whole state of a symbol, only their latest update matters
+    conflatableEvents = ('ob', 'ticker', 'ohlcv')
+    # events emitted as (symbol, data), dispatched to the listeners of their symbol
+    symbolEvents = ('ob', 'trade', 'ticker', 'ohlcv')
+    # resolution in seconds of the websocket timers, see TimerWheel
+    timerWheelTick = 0.05
+    # frames larger than this many bytes are decompressed in a thread, see DecompressionStage
+    websocketDecompressThreshold = 64 * 1024
+    gzipInflater = Inflater(16 + zlib.MAX_WBITS)
+    rawInflater = Inflater(-zlib.MAX_WBITS)
+    zlibInflater = Inflater(zlib.MAX_WBITS)
+    latencyStages = {
+        'decompress': ['gunzip', 'inflateRaw'],
+        'parse': ['websocketParseJson'],
+        'merge': ['mergeOrderBookDelta', 'mergeOrderBookDeltaDiff', 'updateBidAsk', 'updateBidAskDiff'],
+    }
+
     def __init__(self, config={}):
         if 'asyncio_loop' in config:
             self.asyncio_loop = config['asyncio_loop']
@@ -65,10 +111,29 @@ class Exchange(BaseExchange, EventEmitter):
         self.wsconf = {}
         self.websocketContexts = {}
         self.websocketDelayedConnections = {}
+        # EventStreams by (event, symbol), the streams that paused reading
+        self.websocketStreams = {}
+        self.websocketPausedBy = set()
+        # conflated subscriptions by (event, symbol)
+        self.websocketConflation = {}
+        self.dispatcher = SymbolDispatcher()
+        # OrderBookSynchronizers by symbol
+        self.websocketOrderBookSyncs = {}
+        # FrameRecorder while websocket_record() is in effect
+        self.websocketRecorder = None
         self.wsproxy = None
         self.cafile = config.get('cafile', certifi.where())
+        self.aiohttp_pool = config.get('aiohttp_pool', self.aiohttp_pool)
+        # the session is opened before the config is applied, and trust_env is part of the pool key
+        self.aiohttp_trust_env = config.get('aiohttp_trust_env', self.aiohttp_trust_env)
         self.open()
         super(Exchange, self).__init__(config)
+        # after the config, which may set snapshotConcurrency and timerWheelTick
+        self.snapshotScheduler = SnapshotScheduler(self, self.snapshotConcurrency)
+        # heartbeats, pong deadlines and request timeouts of every connection
+        self.timerWheel = TimerWheel(self.asyncio_loop, self.timerWheelTick)
+        # futures of the subscribe and unsubscribe requests by nonce string
+        self.websocketRequests = CorrelationRegistry(self.asyncio_loop, self.timerWheel)
 
         # snake renaming methods
         if 'methodmap' in self.wsconf:
@@ -77,12 +142,12 @@ class Exchange(BaseExchange, EventEmitter):
             for m in self.wsconf['methodmap']:
                 self.wsconf['methodmap'][m] = camel2snake(self.wsconf['methodmap'][m])
 
-        self.init_rest_rate_limiter()
-
     def init_rest_rate_limiter(self):
-        self.throttle = throttle(self.extend({
-            'loop': self.asyncio_loop,
-        }, self.tokenBucket))
+        super(Exchange, self).init_rest_rate_limiter()
+        if self.rateLimitBackend is not None:
+            # reserve without blocking the event loop
+            self.rateLimiter = AsyncUnixSocketRateLimiter(self.rateLimitBackend, self.rate_limit_key(), self.tokenBucket, self.rateLimitBuckets or {})
+        self.throttle = throttle(self.rateLimiter)
 
     def __del__(self):
         if self.session is not None:
@@ -98,8 +163,12 @@ class Exchange(BaseExchange, EventEmitter):
 
     def open(self):
         if self.own_session and self.session is None:
-            # Create our SSL context object with our CA cert file
-            context = ssl.create_default_context(cafile=self.cafile)
+            if self.aiohttp_pool:
+                settings = self.aiohttp_pool if isinstance(self.aiohttp_pool, dict) else {}
+                self.session = session_pool.acquire(self.asyncio_loop, self.cafile, self.aiohttp_trust_env, settings)
+                return
+            # Share the SSL context made from our CA cert file with the other exchanges
+            context = session_pool.ssl_context(self.cafile)
             # Pass this SSL context to aiohttp and create a TCPConnector
             connector = aiohttp.TCPConnector(ssl=context, loop=self.asyncio_loop)
             self.session = aiohttp.ClientSession(loop=self.asyncio_loop, connector=connector, trust_env=self.aiohttp_trust_env)
@@ -107,8 +176,17 @@ class Exchange(BaseExchange, EventEmitter):
     async def close(self):
         if self.session is not None:
             if self.own_session:
-                await self.session.close()
+                if self.aiohttp_pool:
+                    await session_pool.release(self.session)
+                else:
+                    await self.session.close()
             self.session = None
+        if self.rateLimitBackend is not None:
+            self.rateLimiter.close()
+        self.snapshotScheduler.close()
+        self.websocketRequests.reject_all(ExchangeError(self.id + ' closed'))
+        self.timerWheel.close()
+        self.websocket_stop_recording()
 
     async def wait_for_token(self):
         while self.rateLimitTokens <= 1:
@@ -133,7 +211,7 @@ class Exchange(BaseExchange, EventEmitter):
     async def fetch2(self, path, api='public', method='GET', params={}, headers=None, body=None):
         """A better wrapper over request for deferred signing"""
         if self.enableRateLimit:
-            await self.throttle()
+            await self.throttle(self.rateLimitCosts.get((api, method, path)))
         self.lastRestRequestTimestamp = self.milliseconds()
         request = self.sign(path, api, method, params, headers, body)
         return await self.fetch(request['url'], request['method'], request['headers'], request['body'])
@@ -321,20 +399,35 @@ class Exchange(BaseExchange, EventEmitter):
                 self.raise_error(ExchangeError, details='unrecognized bidask format: ' + str(bidasks[0]))
         return result
 
-    def searchIndexToInsertOrUpdate(self, value, orderedArray, key, descending=False):
-        direction = -1 if descending else 1
+    def order_book(self, snapshot={}):
+        if self.orderBookBackend == 'numpy':
+            try:
+                return NumpyOrderBook(snapshot)
+            except ImportError as e:
+                self.raise_error(NotSupported, details='orderBookBackend numpy requires the numpy package: ' + str(e))
+        return OrderBook(snapshot)
 
-        def compare(a, b):
-            return -direction if (a < b) else direction if (a > b) else 0
+    def indexed_order_book(self, snapshot={}):
+        # levels are [price, amount, id], the list backend keeps the id index
+        return IndexedOrderBook(snapshot)
 
-        i = 0
-        for i in range(len(orderedArray)):
-            if compare(orderedArray[i][key], value) >= 0:
-                return i
-        # return i
-        return len(orderedArray)
+    def searchIndexToInsertOrUpdate(self, value, orderedArray, key, descending=False):
+        # binary search for the first element that is not ahead of value
+        lo = 0
+        hi = len(orderedArray)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = orderedArray[mid][key]
+            if (current > value) if descending else (current < value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
 
     def updateBidAsk(self, bidAsk, currentBidsAsks, bids=False):
+        if isinstance(currentBidsAsks, (OrderBookSide, NumpyOrderBookSide)):
+            currentBidsAsks.store_array(bidAsk)
+            return
         # insert or replace ordered
         index = self.searchIndexToInsertOrUpdate(bidAsk[0], currentBidsAsks, 0, bids)
         if ((index < len(currentBidsAsks)) and (currentBidsAsks[index][0] == bidAsk[0])):
@@ -351,6 +444,9 @@ class Exchange(BaseExchange, EventEmitter):
                 currentBidsAsks.insert(index, bidAsk)
 
     def updateBidAskDiff(self, bidAsk, currentBidsAsks, bids=False):
+        if isinstance(currentBidsAsks, (OrderBookSide, NumpyOrderBookSide)):
+            currentBidsAsks.increment(bidAsk)
+            return
         # insert or replace ordered
         index = self.searchIndexToInsertOrUpdate(bidAsk[0], currentBidsAsks, 0, bids)
         if ((index < len(currentBidsAsks)) and (currentBidsAsks[index][0] == bidAsk[0])):
@@ -370,6 +466,11 @@ class Exchange(BaseExchange, EventEmitter):
     def mergeOrderBookDelta(self, currentOrderBook, orderbook, timestamp=None, bids_key='bids', asks_key='asks', price_key=0, amount_key=1):
         bids = self.parse_bids_asks2(orderbook[bids_key], price_key, amount_key) if (bids_key in orderbook) and isinstance(orderbook[bids_key], list) else []
         asks = self.parse_bids_asks2(orderbook[asks_key], price_key, amount_key) if (asks_key in orderbook) and isinstance(orderbook[asks_key], list) else []
+        if isinstance(currentOrderBook, NumpyOrderBook):
+            # applied as one vectorized batch per side
+            currentOrderBook.merge(bids, asks)
+            bids = []
+            asks = []
         for bid in bids:
             self.updateBidAsk(bid, currentOrderBook['bids'], True)
         for ask in asks:
@@ -391,6 +492,32 @@ class Exchange(BaseExchange, EventEmitter):
         currentOrderBook['datetime'] = self.iso8601(timestamp) if timestamp is not None else None
         return currentOrderBook
 
+    def _websocketOrderBookSync(self, symbol, reorder=0):
+        # kept apart from the symbol context, its counts outlive reconnections
+        if symbol not in self.websocketOrderBookSyncs:
+            self.websocketOrderBookSyncs[symbol] = OrderBookSynchronizer(self.orderBookSyncSize, reorder)
+        return self.websocketOrderBookSyncs[symbol]
+
+    def websocket_order_book_sync_stats(self):
+        return {symbol: self.websocketOrderBookSyncs[symbol].stats() for symbol in self.websocketOrderBookSyncs}
+
+    def _websocketFetchSnapshot(self, contextId, symbol, limit, resync, callback, context={}):
+        # queued with the other snapshots instead of fetched right away
+        eself = self
+
+        def done(error, response):
+            if eself.websocketRecorder is not None:
+                eself.websocketRecorder.snapshot(contextId, symbol, error, response)
+            try:
+                getattr(eself, callback)(context, error, response)
+            except Exception as ex:
+                eself.emit('err', ExchangeError(eself.id + ': error invoking method ' + callback + ' in _websocketFetchSnapshot: ' + str(ex)), contextId)
+
+        self.snapshotScheduler.request(symbol, limit, done, resync)
+
+    def websocket_snapshot_queue_stats(self):
+        return self.snapshotScheduler.stats()
+
     def _websocketContextGetSubscribedEventSymbols(self, conxid):
         ret = []
         events = self._contextGetEvents(conxid)
@@ -425,6 +552,8 @@ class Exchange(BaseExchange, EventEmitter):
                     symbol_context['subscribed'] = False
                     symbol_context['subscribing'] = False
                     symbol_context['data'] = {}
+                    if (key == 'ob') and (symbol in self.websocketOrderBookSyncs):
+                        self.websocketOrderBookSyncs[symbol].reset()
 
     def _contextGetConxTpl(self, conxid):
         return self.websocketContexts[conxid]['conx-tpl']
@@ -477,6 +606,8 @@ class Exchange(BaseExchange, EventEmitter):
             'subscribing': False,
             'data': {},
         }
+        if (event == 'ob') and (symbol in self.websocketOrderBookSyncs):
+            self.websocketOrderBookSyncs[symbol].reset()
 
     def _contextGetSymbolData(self, conxid, event, symbol):
         return self.websocketContexts[conxid]['events'][event][symbol]['data']
@@ -506,15 +637,68 @@ class Exchange(BaseExchange, EventEmitter):
         conxParam = self.safe_value(eventConf, 'conx-param', {
             'id': '{id}'
         })
+        conxid = self.implode_params(conxParam['id'], {
+            'event': event,
+            'symbol': symbol,
+            'id': eventConf['conx-tpl']
+        })
+        if conxid == eventConf['conx-tpl']:
+            # shared connections are sharded, per symbol connections never fill up
+            conxid = self._websocketGetShard4Event(conxid, eventConf, event, symbol)
         return {
-            'conxid': self.implode_params(conxParam['id'], {
-                'event': event,
-                'symbol': symbol,
-                'id': eventConf['conx-tpl']
-            }),
+            'conxid': conxid,
             'conxtpl': eventConf['conx-tpl']
         }
 
+    def _websocketGetShards(self, conxid):
+        shards = [conxid]
+        while (conxid + '-' + str(len(shards))) in self.websocketContexts:
+            shards.append(conxid + '-' + str(len(shards)))
+        return shards
+
+    def _websocketGetShard4Event(self, conxid, eventConf, event, symbol):
+        # conx-tpl limits per connection:
+        # maxStreams/maxChannels: subscriptions, maxUrlLength: length of the ws-s stream url
+        conx_tpl = self.wsconf['conx-tpls'][eventConf['conx-tpl']]
+        max_streams = self.safe_integer_2(conx_tpl, 'maxStreams', 'maxChannels')
+        max_url_length = self.safe_integer(conx_tpl, 'maxUrlLength')
+        if (max_streams is None) and (max_url_length is None):
+            return conxid
+        shards = self._websocketGetShards(conxid)
+        # a symbol stays on the shard that already has it
+        for shard in shards:
+            if (shard in self.websocketContexts) and (self._contextIsSubscribed(shard, event, symbol) or self._contextIsSubscribing(shard, event, symbol)):
+                return shard
+        # otherwise it goes to the least loaded shard with room left
+        url = None
+        if max_url_length is not None:
+            conxParam = self.safe_value(eventConf, 'conx-param', {'url': '{baseurl}'})
+            url = self.implode_params(conxParam['url'], self.extend({}, conx_tpl, {
+                'event': event,
+                'symbol': symbol,
+                'id': eventConf['conx-tpl'],
+            }))
+        best = None
+        best_load = None
+        for shard in shards:
+            subscribed = self._websocketContextGetSubscribedEventSymbols(shard) if (shard in self.websocketContexts) else []
+            load = len(subscribed)
+            if (max_streams is not None) and (load >= max_streams):
+                continue
+            if (load > 0) and (max_url_length is not None):
+                subscribed.append({
+                    'event': event,
+                    'symbol': symbol,
+                })
+                if len(self._websocket_generate_url_stream(subscribed, {'url': url}, {})) > max_url_length:
+                    continue
+            if (best is None) or (load < best_load):
+                best = shard
+                best_load = load
+        if best is None:
+            best = conxid + '-' + str(len(shards))
+        return best
+
     def _websocket_get_action_for_event(self, conxid, event, symbol, subscription=True, subscription_params={}):
         # if subscription and still subscribed no action returned
         isSubscribed = self._contextIsSubscribed(conxid, event, symbol)
@@ -576,15 +760,28 @@ class Exchange(BaseExchange, EventEmitter):
                 'conx-tpl': conx_tpl_name,
             }
         elif (config['type'] == 'ws-s'):
-            subscribed = self._websocketContextGetSubscribedEventSymbols(config['id'])
+            # 'reconnect' (default) closes the connection and opens it again with the new streams,
+            # 'live' keeps it and lets the exchange (un)subscribe over it,
+            # 'swap' opens the new connection first and switches over on its first message
+            stream_update = self.safe_string(conx_tpl, 'streamUpdate', 'reconnect')
+            conx = self._contextGetConnection(conxid) if (conxid in self.websocketContexts) else None
+            active = (conx is not None) and conx.isActive()
+            subscribed = self._websocketContextGetSubscribedEventSymbols(conxid)
             if subscription:
                 subscribed.append({
                     'event': event,
                     'symbol': symbol,
                 })
                 config['url'] = self._websocket_generate_url_stream(subscribed, config, subscription_params)
+                if active and ((stream_update == 'live') or (conx.options['url'] == config['url'])):
+                    return {
+                        'action': 'keep',
+                        'conx-config': config,
+                        'reset-context': 'never',
+                        'conx-tpl': conx_tpl_name,
+                    }
                 return {
-                    'action': 'reconnect',
+                    'action': 'swap' if (active and (stream_update == 'swap')) else 'reconnect',
                     'conx-config': config,
                     'reset-context': 'onreconnect',
                     'conx-tpl': conx_tpl_name,
@@ -604,8 +801,15 @@ class Exchange(BaseExchange, EventEmitter):
                     }
                 else:
                     config['url'] = self._websocket_generate_url_stream(subscribed, config, subscription_params)
+                    if active and ((stream_update == 'live') or (conx.options['url'] == config['url'])):
+                        return {
+                            'action': 'keep',
+                            'conx-config': config,
+                            'reset-context': 'never',
+                            'conx-tpl': conx_tpl_name,
+                        }
                     return {
-                        'action': 'reconnect',
+                        'action': 'swap' if (active and (stream_update == 'swap')) else 'reconnect',
                         'conx-config': config,
                         'reset-context': 'onreconnect',
                         'conx-tpl': conx_tpl_name,
@@ -629,7 +833,19 @@ class Exchange(BaseExchange, EventEmitter):
                 self._contextResetEvent(conxid, event)
             if (not(symbol in self._contextGetSymbols(conxid, event))):
                 self._contextResetSymbol(conxid, event, symbol)
-            if (action['action'] == 'reconnect'):
+            if (action['action'] == 'keep'):
+                if subscribe:
+                    self._contextResetSymbol(conxid, event, symbol)
+                return conxid
+            elif (action['action'] == 'swap'):
+                if subscribe:
+                    self._contextResetSymbol(conxid, event, symbol)
+                # the current connection keeps serving until the new one delivers its first message
+                standby = await self._websocket_initialize(conx_config, conxid)
+                standby['standby'] = True
+                await standby['conx'].connect()
+                return conxid
+            elif (action['action'] == 'reconnect'):
                 conx = self._contextGetConnection(conxid)
                 if (conx is not None):
                     conx.close()
@@ -706,8 +922,39 @@ class Exchange(BaseExchange, EventEmitter):
             else:
                 await websocket_connection.connect()
 
+    def enable_latency_tracking(self):
+        # the timed methods are bound on the instance only while tracking,
+        # the class methods run untouched otherwise
+        if self.latency is None:
+            events = list(self.wsconf['events'].keys()) if 'events' in self.wsconf else None
+            self.latency = LatencyTracker(self.id, events)
+            for stage in self.latencyStages:
+                for method in self.latencyStages[stage]:
+                    setattr(self, method, self.latency.wrap(stage, getattr(self, method)))
+            self.emit = self.latency.wrap_emit(self.emit)
+            for conxid in self.websocketContexts:
+                conx = self._contextGetConnection(conxid)
+                if conx is not None:
+                    conx.monitor = self.latency
+        return self.latency
+
+    def disable_latency_tracking(self):
+        if self.latency is not None:
+            for stage in self.latencyStages:
+                for method in self.latencyStages[stage]:
+                    del self.__dict__[method]
+            del self.__dict__['emit']
+            for conxid in self.websocketContexts:
+                conx = self._contextGetConnection(conxid)
+                if conx is not None:
+                    conx.monitor = None
+            self.latency = None
+
     def websocketParseJson(self, raw_data):
-        return json.loads(raw_data)
+        if isinstance(raw_data, (dict, list)):
+            # already parsed by the transport
+            return raw_data
+        return self.codec.loads(raw_data)
 
     def websocketClose(self, conxid='default'):
         websocket_conx_info = self._contextGetConnectionInfo(conxid)
@@ -768,40 +1015,125 @@ class Exchange(BaseExchange, EventEmitter):
             raise NotSupported("invalid async connection: " + websocket_config['type'] + " for exchange " + self.id)
 
         conx = websocket_connection_info['conx']
+        conx.monitor = self.latency
+        conx.timers = self.timerWheel
+        # text frames are handed over undecoded, the codec parses the bytes
+        conx.codec = self.codec
+        conx.raw_text = True
 
         @conx.on('open')
         def websocket_connection_open():
             websocket_connection_info['auth'] = False
+            if self.websocketPausedBy:
+                # a blocking stream is full
+                conx.pauseReading()
+            if websocket_connection_info.get('standby'):
+                return
+            if self.websocketRecorder is not None:
+                self.websocketRecorder.open(conxid, self._contextGetConxTpl(conxid), websocket_connection_info['conx'].options)
             self._websocket_on_open(conxid, websocket_connection_info['conx'].options)
 
         @conx.on('err')
         def websocket_connection_error(error):
             websocket_connection_info['auth'] = False
+            if websocket_connection_info.get('standby'):
+                # the swap is abandoned, the current connection stays
+                websocket_connection_info['standby'] = False
+                websocket_connection_info['conx'].close()
+                self.emit('err', NetworkError(error), conxid)
+                return
+            self.websocketRequests.reject_connection(conxid, NetworkError(error))
             self._websocket_on_error(conxid)
             # self._websocket_reset_context(conxid)
             self.emit('err', NetworkError(error), conxid)
 
-        @conx.on('message')
-        def websocket_connection_message(msg):
+        def websocket_connection_deliver(msg):
             if self.verbose:
-                print((conxid + '<-' + msg).encode('utf-8'))
+                text = msg.decode('utf-8', 'replace') if isinstance(msg, bytes) else str(msg)
+                print((conxid + '<-' + text).encode('utf-8'))
                 sys.stdout.flush()
+            latency = self.latency
+            if latency is not None:
+                latency.begin()
             try:
                 self._websocket_on_message(conxid, msg)
             except Exception as ex:
                 self.emit('err', ex, conxid)
+            if latency is not None:
+                latency.end()
+
+        stage = None
+        decompress = self._websocketDecompressor(websocket_config)
+        if decompress is not None:
+            stage = DecompressionStage(self.asyncio_loop, decompress, websocket_connection_deliver, lambda ex: self.emit('err', ex, conxid), self.websocketDecompressThreshold)
+
+        @conx.on('message')
+        def websocket_connection_message(msg):
+            if self.websocketRecorder is not None:
+                self.websocketRecorder.frame(conxid, msg)
+            if websocket_connection_info.get('standby'):
+                self._websocketCompleteSwap(conxid, websocket_connection_info)
+            if stage is not None:
+                stage.feed(msg)
+            else:
+                websocket_connection_deliver(msg)
 
         @conx.on('close')
         def websocket_connection_close():
             websocket_connection_info['auth'] = False
+            if stage is not None:
+                stage.close()
+            if websocket_connection_info.get('standby'):
+                websocket_connection_info['standby'] = False
+                return
+            # no ack can arrive over a closed connection
+            self.websocketRequests.reject_connection(conxid, NetworkError(self.id + ': connection ' + conxid + ' closed'))
             self._websocket_on_close(conxid)
             # self._websocket_reset_context(conxid)
             self.emit('close', conxid)
 
         return websocket_connection_info
 
+    def _websocketDecompressor(self, websocket_config):
+        decompress = self.safe_string(websocket_config, 'decompress')
+        if decompress is None:
+            return None
+        # the conx-tpl names the method that turns a compressed frame into
+        # the message _websocket_on_message gets, it must not touch any state
+        if ('methodmap' in self.wsconf) and (decompress in self.wsconf['methodmap']):
+            decompress = self.wsconf['methodmap'][decompress]
+        return getattr(self, decompress)
+
+    def websocket_record(self, path, compress=True):
+        """Append every frame received from now on to the log at path, see FrameRecorder"""
+        self.websocket_stop_recording()
+        self.websocketRecorder = FrameRecorder(path, self.codec, compress)
+        return self.websocketRecorder
+
+    def websocket_stop_recording(self):
+        if self.websocketRecorder is not None:
+            self.websocketRecorder.close()
+            self.websocketRecorder = None
+
+    async def websocket_replay(self, path, speed=None):
+        """Feed the frames recorded at path to the websocket handlers, as fast as
+        possible or at speed times the recorded pace, and return the replay stats"""
+        return await FrameReplayer(self, path, speed).replay()
+
+    def _websocketCompleteSwap(self, conxid, websocket_connection_info):
+        websocket_connection_info['standby'] = False
+        current = self.websocketContexts[conxid]['conx']
+        self._contextSetConnectionInfo(conxid, websocket_connection_info)
+        if current is not None:
+            current['conx'].close()
+        # the open event of the new connection was held back until now
+        if self.websocketRecorder is not None:
+            self.websocketRecorder.open(conxid, self._contextGetConxTpl(conxid), websocket_connection_info['conx'].options)
+        self._websocket_on_open(conxid, websocket_connection_info['conx'].options)
+
     def timeout_future(self, future, scope):
-        self.asyncio_loop.call_later(self.timeout / 1000, lambda: future.done() or future.set_exception(TimeoutError("timeout in scope: " + scope)))
+        handle = self.timerWheel.call_later(self.timeout / 1000, lambda: future.done() or future.set_exception(TimeoutError("timeout in scope: " + scope)))
+        future.add_done_callback(lambda f: handle.cancel())
 
     def _cloneOrderBook(self, ob, limit=None):
         ret = {
@@ -817,6 +1149,12 @@ class Exchange(BaseExchange, EventEmitter):
             ret['asks'] = ob['asks'][:limit]
         return ret
 
+    def _viewOrderBook(self, ob, limit=None):
+        # books kept in an OrderBook are shared with a lazily copied view
+        if isinstance(ob, OrderBook):
+            return OrderBookView(ob, limit)
+        return self._cloneOrderBook(ob, limit)
+
     def _executeAndCallback(self, contextId, method, params, callback, context={}, this_param=None):
         this_param = this_param if (this_param is not None) else self
         eself = self
@@ -852,13 +1190,140 @@ class Exchange(BaseExchange, EventEmitter):
         future = asyncio.Future()
 
         def wait4orderbook(symbol_r, ob):
-            if symbol_r == symbol:
-                self.remove_listener('ob', wait4orderbook)
-                future.done() or future.set_result(self._get_current_websocket_orderbook(conxid, symbol, limit))
+            future.done() or future.set_result(self._get_current_websocket_orderbook(conxid, symbol, limit))
 
-        self.on('ob', wait4orderbook)
+        self.on_symbol('ob', symbol, wait4orderbook)
         self.timeout_future(future, 'websocket_fetch_order_book')
-        return await future
+        try:
+            return await future
+        finally:
+            self.remove_symbol_listener('ob', symbol, wait4orderbook)
+
+    def emit(self, event, *args, **kwargs):
+        if event in self.websocketRequests.pending:
+            # exchanges acknowledge a request by emitting its nonce string
+            self._websocketAcknowledge(event, *args)
+            return True
+        if self.websocketConflation and (event in self.conflatableEvents) and args:
+            conflation = self.websocketConflation.get((event, args[0]))
+            if conflation is not None:
+                self._websocketConflate(conflation, args)
+                return True
+        return self._websocketDispatch(event, args, kwargs)
+
+    def _websocketDispatch(self, event, args, kwargs={}):
+        if (event in self.symbolEvents) and args:
+            handled = self.dispatcher.dispatch(event, args[0], args)
+            # pyee listeners of every symbol, if any
+            if self._events.get(event):
+                handled = super(Exchange, self).emit(event, *args, **kwargs) or handled
+            return handled
+        return super(Exchange, self).emit(event, *args, **kwargs)
+
+    def on_symbol(self, event, symbol, callback=None):
+        """Call callback(symbol, data) for the event updates of symbol only,
+        can be used as a decorator like on()"""
+        if callback is None:
+            def decorator(callback):
+                self.dispatcher.add(event, symbol, callback)
+                return callback
+            return decorator
+        self.dispatcher.add(event, symbol, callback)
+        return callback
+
+    def remove_symbol_listener(self, event, symbol, callback):
+        self.dispatcher.remove(event, symbol, callback)
+
+    def _websocketSetConflation(self, event, symbol, params):
+        # params['conflate']: milliseconds between two updates, or 'tick' for
+        # one update per event loop turn
+        interval = self.safe_value(params, 'conflate')
+        if interval is None:
+            return
+        if event not in self.conflatableEvents:
+            raise NotSupported(self.id + ' cannot conflate ' + event + ' events, only ' + ', '.join(self.conflatableEvents))
+        if (interval != 'tick') and not (isinstance(interval, (int, float)) and (interval >= 0)):
+            raise ExchangeError(self.id + ' invalid conflate interval: ' + str(interval))
+        self.websocketConflation[(event, symbol)] = {
+            'event': event,
+            'symbol': symbol,
+            'interval': interval,
+            'pending': None,
+            'published': None,
+            'conflated': 0,
+        }
+
+    def _websocketConflate(self, conflation, args):
+        data = args[1] if (len(args) > 1) else None
+        if isinstance(data, OrderBookView):
+            # a pending view would be copied by every delta merged before it is published,
+            # a new view is taken when it is published instead
+            data.release()
+        if conflation['pending'] is not None:
+            conflation['conflated'] += 1
+            conflation['pending'] = args
+            return
+        conflation['pending'] = args
+        if conflation['interval'] == 'tick':
+            self.asyncio_loop.call_soon(self._websocketPublishConflated, conflation)
+            return
+        delay = 0 if (conflation['published'] is None) else conflation['published'] + conflation['interval'] / 1000 - time.monotonic()
+        if delay > 0:
+            self.asyncio_loop.call_later(delay, self._websocketPublishConflated, conflation)
+        else:
+            self._websocketPublishConflated(conflation)
+
+    def _websocketPublishConflated(self, conflation):
+        args = conflation['pending']
+        conflation['pending'] = None
+        if (args is None) or (self.websocketConflation.get((conflation['event'], conflation['symbol'])) is not conflation):
+            # unsubscribed meanwhile
+            return
+        conflation['published'] = time.monotonic()
+        if isinstance(args[1], OrderBookView):
+            view = args[1].latest()
+            if view is None:
+                return
+            args = (args[0], view) + args[2:]
+        self._websocketDispatch(conflation['event'], args)
+
+    def watch_order_book(self, symbol, limit=None, maxsize=None, overflow=None, params={}):
+        if limit is not None:
+            params = self.extend(params, {'limit': limit})
+        return self._websocketWatch('ob', symbol, params, maxsize, overflow)
+
+    def watch_trades(self, symbol, maxsize=None, overflow=None, params={}):
+        return self._websocketWatch('trade', symbol, params, maxsize, overflow)
+
+    def watch_ticker(self, symbol, maxsize=None, overflow=None, params={}):
+        return self._websocketWatch('ticker', symbol, params, maxsize, overflow)
+
+    def _websocketWatch(self, event, symbol, params, maxsize, overflow):
+        if not self._websocketValidEvent(event):
+            raise ExchangeError('Not valid event ' + event + ' for exchange ' + self.id)
+        maxsize = maxsize if (maxsize is not None) else self.websocketStreamMaxsize
+        overflow = overflow if (overflow is not None) else self.websocketStreamOverflow
+        return EventStream(self, event, symbol, params, maxsize, overflow)
+
+    def websocket_streams_stats(self):
+        return [stream.stats() for key in self.websocketStreams for stream in self.websocketStreams[key]]
+
+    def _websocketPauseReading(self, stream):
+        # every connection is paused while any blocking stream is full
+        if not self.websocketPausedBy:
+            for conxid in self.websocketContexts:
+                conx = self._contextGetConnection(conxid)
+                if conx is not None:
+                    conx.pauseReading()
+        self.websocketPausedBy.add(stream)
+
+    def _websocketResumeReading(self, stream):
+        self.websocketPausedBy.discard(stream)
+        if not self.websocketPausedBy:
+            for conxid in self.websocketContexts:
+                conx = self._contextGetConnection(conxid)
+                if conx is not None:
+                    conx.resumeReading()
 
     async def websocket_subscribe(self, event, symbol, params={}):
         await self.websocket_subscribe_all([{
@@ -867,11 +1332,18 @@ class Exchange(BaseExchange, EventEmitter):
             'params': params
         }])
 
-    async def websocket_subscribe_all(self, eventSymbols):
+    async def websocket_subscribe_all(self, eventSymbols, return_exceptions=False):
+        """Send the subscriptions all at once and wait for their acks together.
+
+        With return_exceptions the conxid or the exception of every entry is
+        returned in order, otherwise the error of a failed entry is raised,
+        or an ExchangeError naming each failed entry if there were several."""
         # check all
         for eventSymbol in eventSymbols:
             if not self._websocketValidEvent(eventSymbol['event']):
                 raise ExchangeError('Not valid event ' + eventSymbol['event'] + ' for exchange ' + self.id)
+        for eventSymbol in eventSymbols:
+            self._websocketSetConflation(eventSymbol['event'], eventSymbol['symbol'], eventSymbol['params'])
         conxIds = []
         # prepare all conxid
         for eventSymbol in eventSymbols:
@@ -883,29 +1355,101 @@ class Exchange(BaseExchange, EventEmitter):
             self._contextSetSubscribing(conxid, event, symbol, True)
         # connect all delayed
         await self._websocket_connect_delayed()
+        acks = []
         for i in range(0, len(eventSymbols)):
-            conxid = conxIds[i]
-            event = eventSymbols[i]['event']
-            symbol = eventSymbols[i]['symbol']
-            params = eventSymbols[i]['params']
-            oid = self.nonce()  # str(self.nonce()) + '-' + symbol + '-ob-subscribe'
-            future = asyncio.Future()
-            oidstr = str(oid)
-
-            @self.once(oidstr)
-            def wait4obsubscribe(success, ex=None):
-                if success:
-                    self._contextSetSubscribed(conxid, event, symbol, True, params)
-                    self._contextSetSubscribing(conxid, event, symbol, False)
-                    future.done() or future.set_result(conxid)
-                else:
-                    self._contextSetSubscribed(conxid, event, symbol, False)
-                    self._contextSetSubscribing(conxid, event, symbol, False)
-                    ex = ex if ex is not None else ExchangeError('error subscribing to ' + event + '(' + symbol + ') in ' + self.id)
-                    future.done() or future.set_exception(ex)
-            self.timeout_future(future, 'websocket_subscribe')
-            self._websocket_subscribe(conxid, event, symbol, oid, params)
-            await future
+            acks.append(self._websocketSendSubscription(True, conxIds[i], eventSymbols[i]))
+        results = await self._websocketWaitAcks(acks, 'websocket_subscribe')
+        return self._websocketAckResults(results, eventSymbols, 'subscribe', return_exceptions)
+
+    def _websocketNonce(self):
+        # the subscriptions of a batch are sent within the same (milli)second
+        # but every one of them needs its own nonce
+        nonce = self.nonce()
+        if self._lastWebsocketNonce is not None and nonce <= self._lastWebsocketNonce:
+            nonce = self._lastWebsocketNonce + 1
+        self._lastWebsocketNonce = nonce
+        return nonce
+
+    def _websocketSendSubscription(self, subscribe, conxid, eventSymbol):
+        event = eventSymbol['event']
+        symbol = eventSymbol['symbol']
+        params = eventSymbol['params']
+        oid = self._websocketNonce()
+        oidstr = str(oid)
+        action = 'subscribe' if subscribe else 'unsubscribe'
+        future = self.websocketRequests.register(oidstr, self.timeout / 1000, conxid, (conxid, action, event, symbol), 'websocket_' + action + ' ' + event + '(' + symbol + ')')
+
+        def settled(future):
+            # runs before the waiting coroutine resumes
+            if future.cancelled():
+                return
+            if future.exception() is None:
+                self._contextSetSubscribed(conxid, event, symbol, subscribe, params if subscribe else {})
+                self._contextSetSubscribing(conxid, event, symbol, False)
+            elif subscribe:
+                self._contextSetSubscribed(conxid, event, symbol, False)
+                self._contextSetSubscribing(conxid, event, symbol, False)
+
+        future.add_done_callback(settled)
+        if self.websocketRecorder is not None:
+            self.websocketRecorder.subscription(conxid, subscribe, self._contextGetConxTpl(conxid), event, symbol, params)
+        try:
+            if subscribe:
+                self._websocket_subscribe(conxid, event, symbol, oid, params)
+            else:
+                self._websocket_unsubscribe(conxid, event, symbol, oid, params)
+        except Exception as ex:
+            self.websocketRequests.reject(oidstr, ex)
+        return (future, conxid if subscribe else True)
+
+    def _websocketAcknowledge(self, oidstr, success=True, error=None):
+        if success:
+            return self.websocketRequests.resolve(oidstr, True)
+        if not isinstance(error, Exception):
+            error = ExchangeError(self.id + ': ' + self.websocketRequests.scope(oidstr) + ' failed')
+        return self.websocketRequests.reject(oidstr, error)
+
+    def _websocketAcknowledgeAll(self, conxid, action, event, symbol, success=True, error=None):
+        """Settle every pending action ('subscribe' or 'unsubscribe') of event and
+        symbol on conxid, for exchanges whose acks do not carry the request id"""
+        group = (conxid, action, event, symbol)
+        if success:
+            return self.websocketRequests.resolve_group(group, True)
+        if not isinstance(error, Exception):
+            error = ExchangeError(self.id + ': ' + action + ' ' + event + '(' + symbol + ') failed')
+        return self.websocketRequests.reject_group(group, error)
+
+    def websocket_pending_requests(self, age=None):
+        """Stats of the requests waiting for an ack, with age (seconds) also
+        the ones pending for longer than that, which should not exist"""
+        result = self.websocketRequests.stats()
+        if age is not None:
+            result['leaks'] = self.websocketRequests.leaks(age)
+        return result
+
+    async def _websocketWaitAcks(self, acks, scope):
+        # every request has its own deadline in websocketRequests
+        futures = [future for (future, value) in acks]
+        if len(futures):
+            await asyncio.wait(futures)
+        results = []
+        for (future, value) in acks:
+            results.append(future.exception() or value)
+        return results
+
+    def _websocketAckResults(self, results, eventSymbols, action, return_exceptions):
+        if return_exceptions:
+            return results
+        failures = []
+        for i in range(0, len(results)):
+            if isinstance(results[i], BaseException):
+                failures.append(i)
+        if len(failures) == 1:
+            raise results[failures[0]]
+        if len(failures) > 1:
+            details = [eventSymbols[i]['event'] + '(' + eventSymbols[i]['symbol'] + '): ' + str(results[i]) for i in failures]
+            raise ExchangeError(self.id + ' failed to ' + action + ' ' + str(len(failures)) + ' of ' + str(len(results)) + ': ' + ', '.join(details))
+        return results
 
     async def websocket_unsubscribe(self, event, symbol, params={}):
         await self.websocket_unsubscribe_all([{
@@ -914,37 +1458,21 @@ class Exchange(BaseExchange, EventEmitter):
             'params': params
         }])
 
-    async def websocket_unsubscribe_all(self, eventSymbols):
+    async def websocket_unsubscribe_all(self, eventSymbols, return_exceptions=False):
         # check all
         for eventSymbol in eventSymbols:
             if not self._websocketValidEvent(eventSymbol['event']):
                 raise ExchangeError('Not valid event ' + eventSymbol['event'] + ' for exchange ' + self.id)
 
+        for eventSymbol in eventSymbols:
+            self.websocketConflation.pop((eventSymbol['event'], eventSymbol['symbol']), None)
         try:
+            acks = []
             for eventSymbol in eventSymbols:
-                event = eventSymbol['event']
-                symbol = eventSymbol['symbol']
-                params = eventSymbol['params']
-                conxid = await self._websocket_ensure_conx_active(event, symbol, False, params, True)
-                # ret = self._websocketGetConxid4Event(event, symbol)
-                # conxid = ret['conxid']
-                oid = self.nonce()  # str(self.nonce()) + '-' + symbol + '-ob-subscribe'
-                future = asyncio.Future()
-                oidstr = str(oid)
-
-                @self.once(oidstr)
-                def wait4obunsubscribe(success, ex=None):
-                    if success:
-                        self._contextSetSubscribed(conxid, event, symbol, False)
-                        self._contextSetSubscribing(conxid, event, symbol, False)
-                        future.done() or future.set_result(True)
-                    else:
-                        ex = ex if ex is not None else ExchangeError('error unsubscribing to ' + event + '(' + symbol + ') in ' + self.id)
-                        future.done() or future.set_exception(ex)
-                self.timeout_future(future, 'websocket_unsubscribe')
-                self._websocket_unsubscribe(conxid, event, symbol, oid, params)
-                await future
-
+                conxid = await self._websocket_ensure_conx_active(eventSymbol['event'], eventSymbol['symbol'], False, eventSymbol['params'], True)
+                acks.append(self._websocketSendSubscription(False, conxid, eventSymbol))
+            results = await self._websocketWaitAcks(acks, 'websocket_unsubscribe')
+            return self._websocketAckResults(results, eventSymbols, 'unsubscribe', return_exceptions)
         finally:
             await self._websocket_connect_delayed()
 
@@ -988,7 +1516,7 @@ class Exchange(BaseExchange, EventEmitter):
                 getattr(this_param, method)(*params)
             except Exception as ex:
                 self.emit('err', ExchangeError(self.id + ': error invoking method ' + method + ' ' + str(ex)), contextId)
-        return self.asyncio_loop.call_later(mseconds / 1000, f)
+        return self.timerWheel.call_later(mseconds / 1000, f)
 
     def _cancelTimeout(self, handle):
         handle.cancel()
@@ -1001,7 +1529,7 @@ class Exchange(BaseExchange, EventEmitter):
                 getattr(this_param, method)(*params)
             except Exception as ex:
                 self.emit('err', ExchangeError(self.id + ': error invoking method ' + method + ' ' + str(ex)), contextId)
-        return self.call_periodic(mseconds / 1000, f)
+        return self.timerWheel.call_periodic(mseconds / 1000, f)
 
     def _cancelTimer(self, handle):
         handle.cancel()
@@ -1035,21 +1563,16 @@ class Exchange(BaseExchange, EventEmitter):
         return periodic
 
     def gunzip(self, data):
-        # return data.decode('zlib_codec').decode('utf8')
-        return zlib.decompress(data, 16 + zlib.MAX_WBITS)
-        # return "{}"
-        # return gzip.GzipFile(fileobj=StringIO(data)).read()
-        # in_ = io.BytesIO()
-        # in_.write(data)
-        # in_.seek(0)
-        # with gzip.GzipFile(fileobj=in_, mode='rb') as fo:
-        #    gunzipped_bytes_obj = fo.read()
-        # return gunzipped_bytes_obj.decode()
+        return self.gzipInflater.inflate(data)
 
     def inflateRaw(self, data, informat=None):
+        inflater = self.rawInflater
         if informat == 'base64':
-            data = base64.b64decode(data, validate=True)
+            try:
+                return inflater.inflate_base64(data)
+            except zlib.error:
+                return self.zlibInflater.inflate_base64(data)
         try:
-            return zlib.decompress(data, -zlib.MAX_WBITS)
-        except SyntaxError:
-            return zlib.decompress(data)
+            return inflater.inflate(data)
+        except zlib.error:
+            return self.zlibInflater.inflate(data)
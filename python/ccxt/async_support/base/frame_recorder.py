@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+
+"""Recording of the websocket frames an exchange receives, and their replay"""
+
+import asyncio
+import gzip
+import struct
+import time
+
+from ccxt.base.errors import ExchangeError
+
+__all__ = [
+    'FrameRecorder',
+    'FrameReplayer',
+    'read_frames',
+]
+
+# receive time, kind, length of the conxid, length of the payload
+_header = struct.Struct('<dBBI')
+
+# frames, in the type the transport handed them over
+FRAME_BYTES = 0
+FRAME_TEXT = 1
+FRAME_JSON = 2
+# what the exchange did besides receiving, json payloads
+SUBSCRIBE = 3
+UNSUBSCRIBE = 4
+SNAPSHOT = 5
+OPEN = 6
+
+
+class FrameRecorder(object):
+    """Appends records to a log file, gzip compressed unless compress is False.
+
+    A record is a fixed header with the receive time, the kind of record and
+    the lengths of the conxid and the payload, followed by both. Frames are
+    stored as the transport handed them to the exchange, still compressed if
+    the exchange compresses them: pusher messages as json, Socket.IO and
+    SignalR messages without the protocol framing. Connections opening,
+    subscriptions and the REST snapshots that complete websocket books are
+    recorded along, so a replay rebuilds the same state without any network."""
+
+    def __init__(self, path, codec, compress=True, compresslevel=1):
+        self.path = path
+        self.codec = codec
+        if compress:
+            self.file = gzip.open(path, 'ab', compresslevel)
+        else:
+            self.file = open(path, 'ab')
+        self.records = 0
+
+    def _write(self, kind, conxid, payload, timestamp=None):
+        conxid = conxid.encode('utf-8')
+        self.file.write(_header.pack(time.time() if timestamp is None else timestamp, kind, len(conxid), len(payload)))
+        self.file.write(conxid)
+        self.file.write(payload)
+        self.records += 1
+
+    def frame(self, conxid, msg, timestamp=None):
+        if isinstance(msg, bytes):
+            self._write(FRAME_BYTES, conxid, msg, timestamp)
+        elif isinstance(msg, str):
+            self._write(FRAME_TEXT, conxid, msg.encode('utf-8'), timestamp)
+        else:
+            self._write(FRAME_JSON, conxid, self.codec.dumps(msg).encode('utf-8'), timestamp)
+
+    def open(self, conxid, conxtpl, options):
+        self._write(OPEN, conxid, self.codec.dumps({
+            'conx-tpl': conxtpl,
+            'options': options,
+        }).encode('utf-8'))
+
+    def subscription(self, conxid, subscribe, conxtpl, event, symbol, params):
+        self._write(SUBSCRIBE if subscribe else UNSUBSCRIBE, conxid, self.codec.dumps({
+            'conx-tpl': conxtpl,
+            'event': event,
+            'symbol': symbol,
+            'params': params,
+        }).encode('utf-8'))
+
+    def snapshot(self, conxid, symbol, error, response):
+        self._write(SNAPSHOT, conxid, self.codec.dumps({
+            'symbol': symbol,
+            'error': None if error is None else str(error),
+            'response': response,
+        }).encode('utf-8'))
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def read_frames(path):
+    """Yield (timestamp, kind, conxid, payload) for every record of the log"""
+    with open(path, 'rb') as probe:
+        compressed = probe.read(2) == b'\x1f\x8b'
+    with (gzip.open(path, 'rb') if compressed else open(path, 'rb')) as file:
+        while True:
+            header = file.read(_header.size)
+            if len(header) < _header.size:
+                # the end, or a record cut short by a crash
+                return
+            timestamp, kind, conxid_length, payload_length = _header.unpack(header)
+            conxid = file.read(conxid_length).decode('utf-8')
+            payload = file.read(payload_length)
+            if len(payload) < payload_length:
+                return
+            yield (timestamp, kind, conxid, payload)
+
+
+class NullConnection(object):
+    """Stands in for the transport of a replayed connection, sends go nowhere"""
+
+    def send(self, data):
+        pass
+
+    def sendJson(self, data):
+        pass
+
+    def close(self):
+        pass
+
+    def isActive(self):
+        return True
+
+
+class FrameReplayer(object):
+    """Feeds a recorded log back into _websocket_on_message of an exchange.
+
+    With speed None frames are replayed as fast as the handlers take them,
+    otherwise at speed times the recorded pace. The markets of the exchange
+    must be loaded, or set with set_markets() to replay offline. Snapshot
+    requests are answered with the recorded snapshot of the symbol when the
+    replay gets to it, the same point of the stream it arrived live."""
+
+    def __init__(self, exchange, path=None, speed=None):
+        self.exchange = exchange
+        self.path = path
+        self.speed = speed
+        self.codec = exchange.codec
+        self.decompressors = {}
+        # pending snapshot callbacks by symbol
+        self.snapshots = {}
+        self.frames = 0
+        self.errors = 0
+        self.elapsed = 0
+
+    def _context(self, conxid, conxtpl=None):
+        exchange = self.exchange
+        if conxid not in exchange.websocketContexts:
+            exchange._websocket_reset_context(conxid, conxtpl)
+            exchange._contextSetConnectionInfo(conxid, {
+                'auth': True,
+                'ready': True,
+                'conx': NullConnection(),
+            })
+        if conxtpl is not None:
+            exchange.websocketContexts[conxid]['conx-tpl'] = conxtpl
+            self.decompressors[conxid] = exchange._websocketDecompressor(exchange.wsconf['conx-tpls'][conxtpl])
+
+    def _open(self, conxid, data):
+        self._context(conxid, data['conx-tpl'])
+        try:
+            self.exchange._websocket_on_open(conxid, data['options'])
+        except Exception as ex:
+            self.errors += 1
+            self.exchange.emit('err', ex, conxid)
+
+    def _subscription(self, conxid, subscribe, data):
+        exchange = self.exchange
+        self._context(conxid, data['conx-tpl'])
+        event = data['event']
+        symbol = data['symbol']
+        params = data['params'] or {}
+        if event not in exchange._contextGetEvents(conxid):
+            exchange._contextResetEvent(conxid, event)
+        try:
+            if subscribe:
+                exchange._contextResetSymbol(conxid, event, symbol)
+                exchange._websocket_subscribe(conxid, event, symbol, exchange._websocketNonce(), params)
+                exchange._contextSetSubscribed(conxid, event, symbol, True, params)
+            elif symbol in exchange._contextGetSymbols(conxid, event):
+                exchange._websocket_unsubscribe(conxid, event, symbol, exchange._websocketNonce(), params)
+                exchange._contextSetSubscribed(conxid, event, symbol, False)
+        except Exception as ex:
+            self.errors += 1
+            exchange.emit('err', ex, conxid)
+
+    def _fetch_snapshot(self, contextId, symbol, limit, resync, callback, context={}):
+        self.snapshots.setdefault(symbol, []).append((callback, context))
+
+    def _snapshot(self, data):
+        pending = self.snapshots.pop(data['symbol'], [])
+        error = None if data['error'] is None else ExchangeError(data['error'])
+        for callback, context in pending:
+            getattr(self.exchange, callback)(context, error, data['response'])
+
+    def _deliver(self, conxid, kind, payload):
+        if kind == FRAME_TEXT:
+            msg = payload.decode('utf-8')
+        elif kind == FRAME_JSON:
+            msg = self.codec.loads(payload)
+        else:
+            msg = payload
+        if conxid not in self.exchange.websocketContexts:
+            self._context(conxid)
+        decompress = self.decompressors.get(conxid)
+        try:
+            if decompress is not None:
+                msg = decompress(msg)
+            self.exchange._websocket_on_message(conxid, msg)
+        except Exception as ex:
+            self.errors += 1
+            self.exchange.emit('err', ex, conxid)
+
+    def attach(self):
+        # snapshots come out of the log instead of the REST API
+        self.exchange._websocketFetchSnapshot = self._fetch_snapshot
+
+    def detach(self):
+        del self.exchange._websocketFetchSnapshot
+
+    def feed(self, kind, conxid, payload):
+        """Apply one record of the log, return whether it was a frame"""
+        if kind <= FRAME_JSON:
+            self._deliver(conxid, kind, payload)
+            self.frames += 1
+            return True
+        if kind == SNAPSHOT:
+            self._snapshot(self.codec.loads(payload))
+        elif kind == OPEN:
+            self._open(conxid, self.codec.loads(payload))
+        else:
+            self._subscription(conxid, kind == SUBSCRIBE, self.codec.loads(payload))
+        return False
+
+    async def replay(self):
+        loop = self.exchange.asyncio_loop
+        self.attach()
+        start = loop.time()
+        first = None
+        try:
+            for timestamp, kind, conxid, payload in read_frames(self.path):
+                if (self.speed is not None) and (kind <= FRAME_JSON):
+                    if first is None:
+                        first = timestamp
+                    delay = start + (timestamp - first) / self.speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                if self.feed(kind, conxid, payload) and (self.speed is None) and not (self.frames % 1000):
+                    # let the listeners of the emitted events run
+                    await asyncio.sleep(0)
+        finally:
+            self.detach()
+            self.elapsed = loop.time() - start
+        return self.stats()
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'errors': self.errors,
+            'seconds': self.elapsed,
+            'rate': self.frames / self.elapsed if self.elapsed else None,
+        }
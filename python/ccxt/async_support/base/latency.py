@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""Per-stage latency histograms for the websocket message pipeline"""
+
+import math
+import threading
+import time
+
+__all__ = [
+    'Histogram',
+    'LatencyTracker',
+]
+
+
+class Histogram(object):
+    """A log-bucketed histogram of durations in seconds.
+
+    Buckets grow by 5% from one microsecond, so any percentile is reported
+    within 5% of the real value with a fixed, small amount of memory."""
+
+    growth = math.log(1.05)
+    resolution = 1e-6
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        index = int(math.log(seconds / self.resolution) / self.growth) if seconds > self.resolution else 0
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.max, self.resolution * math.exp((index + 1) * self.growth))
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+        }
+
+
+class LatencyTracker(object):
+    """Times the stages of every websocket message of one exchange.
+
+    A message starts when its frame is received by the transport and ends when
+    _websocket_on_message returns. Time spent in the instrumented stages
+    (decompress, parse, merge, emit) is accumulated while the handler runs and
+    what is left is reported as handler. The durations are recorded once per
+    event emitted for the message, or under '_' for messages that emit none.
+    Frames decompressed by a DecompressionStage are decompressed before their
+    message starts, that time is part of frame. Calls made from other threads
+    are never timed."""
+
+    stages = ('frame', 'decompress', 'parse', 'handler', 'merge', 'emit', 'total')
+
+    def __init__(self, exchange_id, events=None, clock=time.perf_counter):
+        self.exchange_id = exchange_id
+        self.events = events
+        self.clock = clock
+        self.histograms = {}
+        self._received = None
+        self._started = None
+        self._timing = False
+        self._durations = {}
+        self._emitted = []
+        self._thread = threading.get_ident()
+
+    def frame_received(self):
+        self._received = self.clock()
+
+    def begin(self):
+        self._started = self.clock()
+        self._durations = {}
+        self._emitted = []
+
+    def end(self):
+        finished = self.clock()
+        received = self._received if self._received is not None else self._started
+        durations = self._durations
+        durations['frame'] = self._started - received
+        durations['total'] = finished - received
+        durations['handler'] = (finished - self._started) - sum(durations[stage] for stage in ('decompress', 'parse', 'merge', 'emit') if stage in durations)
+        for event in (self._emitted or ['_']):
+            for stage in durations:
+                key = (event, stage)
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram()
+                histogram.record(durations[stage])
+        self._received = None
+        self._started = None
+
+    def wrap(self, stage, method):
+        """Return method timed as stage, nested instrumented calls count towards the outer stage"""
+        tracker = self
+
+        def timed(*args, **kwargs):
+            if tracker._timing or tracker._started is None or threading.get_ident() != tracker._thread:
+                return method(*args, **kwargs)
+            tracker._timing = True
+            start = tracker.clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                tracker._durations[stage] = tracker._durations.get(stage, 0.0) + tracker.clock() - start
+                tracker._timing = False
+        return timed
+
+    def wrap_emit(self, emit):
+        timed = self.wrap('emit', emit)
+        tracker = self
+
+        def emit_event(event, *args, **kwargs):
+            if tracker._started is not None and (tracker.events is None or event in tracker.events) and event not in tracker._emitted:
+                tracker._emitted.append(event)
+            return timed(event, *args, **kwargs)
+        return emit_event
+
+    def reset(self):
+        self.histograms = {}
+
+    def snapshot(self):
+        """{event: {stage: {count, mean, p50, p99, max}}} with durations in seconds"""
+        result = {}
+        for (event, stage), histogram in self.histograms.items():
+            result.setdefault(event, {})[stage] = histogram.summary()
+        return result
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+"""Order book backed by preallocated NumPy price/amount arrays"""
+
+from ccxt.async_support.base.order_book import OrderBook
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # the numpy backend is optional
+
+__all__ = [
+    'NumpyOrderBook',
+    'NumpyOrderBookSide',
+]
+
+
+class NumpyOrderBookSide(object):
+    """One side of a NumpyOrderBook.
+
+    Prices and amounts live in two float64 arrays of which only the first
+    length entries are in use. Prices are stored as sort keys (negated for
+    bids) so both sides are ascending and can be searched with searchsorted.
+    Reading the side by index or slice returns [price, amount] lists, the same
+    shape as the plain order book lists."""
+
+    descending = False
+
+    def __init__(self, deltas=[], capacity=256):
+        self._keys = numpy.empty(capacity, dtype=numpy.float64)
+        self._amounts = numpy.empty(capacity, dtype=numpy.float64)
+        self.length = 0
+        self._views = {}
+        self.version = 0
+        self.reset(deltas)
+
+    def _changing(self):
+        self.version += 1
+        if self._views:
+            for reference in list(self._views.values()):
+                view = reference()
+                if view is not None:
+                    view._detach(self)
+
+    def _reserve(self, capacity):
+        if capacity > len(self._keys):
+            size = max(capacity, 2 * len(self._keys))
+            keys = numpy.empty(size, dtype=numpy.float64)
+            amounts = numpy.empty(size, dtype=numpy.float64)
+            keys[:self.length] = self._keys[:self.length]
+            amounts[:self.length] = self._amounts[:self.length]
+            self._keys = keys
+            self._amounts = amounts
+
+    def _sign(self):
+        return -1.0 if self.descending else 1.0
+
+    def reset(self, deltas=[]):
+        self._changing()
+        self.length = 0
+        self.update(deltas)
+
+    @property
+    def prices(self):
+        return self._keys[:self.length] * self._sign()
+
+    @property
+    def amounts(self):
+        return self._amounts[:self.length]
+
+    def update(self, deltas):
+        """Apply a batch of [price, amount] deltas, an amount of zero removes the level"""
+        deltas = numpy.asarray(deltas, dtype=numpy.float64)
+        if not len(deltas):
+            return
+        self._changing()
+        deltas = deltas.reshape(-1, deltas.shape[-1])
+        keys = deltas[:, 0] * self._sign()
+        amounts = deltas[:, 1]
+        # sort the batch and keep only the last delta for each price
+        order = numpy.argsort(keys, kind='stable')
+        keys = keys[order]
+        amounts = amounts[order]
+        last = numpy.append(keys[1:] != keys[:-1], True)
+        keys = keys[last]
+        amounts = amounts[last]
+        n = self.length
+        current = self._keys[:n]
+        positions = numpy.searchsorted(current, keys)
+        found = positions < n
+        found[found] = current[positions[found]] == keys[found]
+        nonzero = amounts != 0
+        # amount changes of existing levels are written in place
+        replace = found & nonzero
+        self._amounts[positions[replace]] = amounts[replace]
+        remove = found & ~nonzero
+        insert = ~found & nonzero
+        if not remove.any() and not insert.any():
+            return
+        keep = numpy.ones(n, dtype=bool)
+        keep[positions[remove]] = False
+        keptKeys = current[keep]
+        keptAmounts = self._amounts[:n][keep]
+        at = numpy.searchsorted(keptKeys, keys[insert])
+        mergedKeys = numpy.insert(keptKeys, at, keys[insert])
+        mergedAmounts = numpy.insert(keptAmounts, at, amounts[insert])
+        length = len(mergedKeys)
+        self._reserve(length)
+        self._keys[:length] = mergedKeys
+        self._amounts[:length] = mergedAmounts
+        self.length = length
+
+    def store(self, price, amount):
+        self.update([[price, amount]])
+
+    def store_array(self, delta):
+        self.update([delta[0:2]])
+
+    def increment(self, delta):
+        price = delta[0]
+        key = price * self._sign()
+        i = numpy.searchsorted(self._keys[:self.length], key)
+        if i < self.length and self._keys[i] == key:
+            self.update([[price, self._amounts[i] + delta[1]]])
+        else:
+            self.update([delta[0:2]])
+
+    def get(self, price):
+        key = price * self._sign()
+        i = numpy.searchsorted(self._keys[:self.length], key)
+        if i < self.length and self._keys[i] == key:
+            return [price, float(self._amounts[i])]
+        return None
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            return numpy.column_stack((self.prices[start:stop:step], self.amounts[start:stop:step])).tolist()
+        if index < 0:
+            index += self.length
+        if index < 0 or index >= self.length:
+            raise IndexError('order book side index out of range')
+        return [float(self._keys[index] * self._sign()), float(self._amounts[index])]
+
+    def __eq__(self, other):
+        return self[:] == list(other)
+
+    def cumulative(self, levels=None):
+        """Cumulative amount from the top of the side down to each level"""
+        return numpy.cumsum(self.amounts[:levels])
+
+    def volume(self, levels=None):
+        return float(self.amounts[:levels].sum())
+
+    def vwap(self, amount):
+        """Average price to fill amount against this side, None if it is not deep
+        enough or amount is not positive"""
+        if not amount > 0:
+            return None
+        cumulative = self.cumulative()
+        i = int(numpy.searchsorted(cumulative, amount))
+        if i >= self.length:
+            return None
+        prices = self.prices
+        cost = float(numpy.dot(prices[:i], self.amounts[:i]))
+        filled = float(cumulative[i - 1]) if i > 0 else 0.0
+        cost += (amount - filled) * float(prices[i])
+        return cost / amount
+
+
+class NumpyAsks(NumpyOrderBookSide):
+    descending = False
+
+
+class NumpyBids(NumpyOrderBookSide):
+    descending = True
+
+
+class NumpyOrderBook(OrderBook):
+    """An OrderBook whose sides are NumPy arrays, with vectorized depth helpers"""
+
+    def __init__(self, snapshot={}):
+        if numpy is None:
+            raise ImportError('NumpyOrderBook requires numpy')
+        super(NumpyOrderBook, self).__init__(snapshot)
+
+    def reset(self, snapshot={}):
+        self.update({
+            'timestamp': snapshot.get('timestamp'),
+            'datetime': snapshot.get('datetime'),
+            'nonce': snapshot.get('nonce'),
+        })
+        self['bids'] = NumpyBids(snapshot.get('bids', []))
+        self['asks'] = NumpyAsks(snapshot.get('asks', []))
+        return self
+
+    def merge(self, bids=[], asks=[]):
+        """Apply a batch of bid and ask deltas"""
+        self['bids'].update(bids)
+        self['asks'].update(asks)
+        return self
+
+    def mid(self):
+        if not len(self['bids']) or not len(self['asks']):
+            return None
+        return (self['bids'][0][0] + self['asks'][0][0]) / 2
+
+    def spread(self):
+        if not len(self['bids']) or not len(self['asks']):
+            return None
+        return self['asks'][0][0] - self['bids'][0][0]
+
+    def imbalance(self, levels=None):
+        """(bid volume - ask volume) / (bid volume + ask volume) over the top levels"""
+        bids = self['bids'].volume(levels)
+        asks = self['asks'].volume(levels)
+        total = bids + asks
+        if not total:
+            return None
+        return (bids - asks) / total
+
+    def vwap(self, side, amount):
+        """Average fill price for amount, 'buy' takes the asks and 'sell' takes the bids"""
+        return self['asks' if side == 'buy' else 'bids'].vwap(amount)
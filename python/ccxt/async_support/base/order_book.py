@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+
+"""Price-sorted order book structures for incremental websocket depth streams"""
+
+from bisect import bisect_left
+from collections.abc import ItemsView, ValuesView
+from weakref import ref
+
+__all__ = [
+    'OrderBook',
+    'OrderBookView',
+    'OrderBookSide',
+    'Asks',
+    'Bids',
+    'IndexedOrderBook',
+    'IndexedOrderBookSide',
+]
+
+
+class OrderBookSide(list):
+    """A list of [price, amount] levels kept sorted by price.
+
+    The levels are stored in the list itself, so a side can be indexed, sliced
+    and serialized exactly like the plain lists returned by parse_order_book.
+    A parallel list of sort keys is searched with bisect to find the position
+    of a price, and a dict maps every price to its level so that lookups of
+    existing prices never touch the list at all.
+
+    Every change bumps version and first lets the OrderBookView objects that
+    still share this side take their copy of it."""
+
+    descending = False
+
+    def __init__(self, deltas=[]):
+        super(OrderBookSide, self).__init__()
+        self._index = {}
+        self._keys = []
+        self._views = {}
+        self.version = 0
+        self.reset(deltas)
+
+    def _changing(self):
+        self.version += 1
+        if self._views:
+            for reference in list(self._views.values()):
+                view = reference()
+                if view is not None:
+                    view._detach(self)
+
+    def _key(self, price):
+        return -price if self.descending else price
+
+    def reset(self, deltas=[]):
+        self._changing()
+        levels = {}
+        for delta in deltas:
+            if delta[1]:
+                levels[delta[0]] = delta
+            else:
+                levels.pop(delta[0], None)
+        ordered = sorted(levels.values(), key=lambda level: level[0], reverse=self.descending)
+        self[:] = ordered
+        self._index = levels
+        self._keys = [self._key(level[0]) for level in ordered]
+
+    def _position(self, price):
+        return bisect_left(self._keys, self._key(price))
+
+    def store_array(self, delta):
+        """Insert, replace or (when the amount is zero) remove the level at delta[0]"""
+        price = delta[0]
+        if self._views:
+            self._changing()
+        else:
+            self.version += 1
+        if price in self._index:
+            i = self._position(price)
+            if delta[1]:
+                self[i] = delta
+                self._index[price] = delta
+            else:
+                del self[i]
+                del self._keys[i]
+                del self._index[price]
+        elif delta[1]:
+            i = self._position(price)
+            self.insert(i, delta)
+            self._keys.insert(i, self._key(price))
+            self._index[price] = delta
+
+    def store(self, price, amount):
+        self.store_array([price, amount])
+
+    def increment(self, delta):
+        """Add delta[1] to the amount at delta[0], removing the level when it reaches zero"""
+        level = self._index.get(delta[0])
+        if level is None:
+            self.store_array(delta)
+        else:
+            self.store_array([delta[0], level[1] + delta[1]])
+
+    def get(self, price):
+        """Return the [price, amount] level at price or None"""
+        return self._index.get(price)
+
+
+class Asks(OrderBookSide):
+    descending = False
+
+
+class Bids(OrderBookSide):
+    descending = True
+
+
+class OrderBook(dict):
+    """A dict with the unified order book structure whose bids and asks are
+    kept sorted as deltas are stored into them"""
+
+    def __init__(self, snapshot={}):
+        super(OrderBook, self).__init__()
+        self.reset(snapshot)
+
+    @property
+    def version(self):
+        return self['bids'].version + self['asks'].version
+
+    def reset(self, snapshot={}):
+        self.update({
+            'timestamp': snapshot.get('timestamp'),
+            'datetime': snapshot.get('datetime'),
+            'nonce': snapshot.get('nonce'),
+        })
+        self['bids'] = Bids(snapshot.get('bids', []))
+        self['asks'] = Asks(snapshot.get('asks', []))
+        return self
+
+
+class IndexedOrderBookSide(OrderBookSide):
+    """An OrderBookSide whose levels are also known by the id the exchange
+    gives them, for feeds that send a price only when a level is created.
+
+    The snapshot deltas are [price, amount, id]. The id of a removed level is
+    dropped with it, so the index only ever holds the levels of the book."""
+
+    def reset(self, deltas=[]):
+        self._ids = {}
+        levels = []
+        for delta in deltas:
+            if delta[1]:
+                self._ids[delta[2]] = delta[0]
+            levels.append([delta[0], delta[1]])
+        super(IndexedOrderBookSide, self).reset(levels)
+
+    def store_id(self, id, amount, price=None):
+        """Set the amount of the level id, at price when it is a new level.
+        Return False for an update of an unknown id."""
+        known = self._ids.get(id)
+        if price is None:
+            if known is None:
+                return False
+            price = known
+        elif (known is not None) and (known != price):
+            self.store_array([known, 0])
+        if amount:
+            self._ids[id] = price
+        else:
+            self._ids.pop(id, None)
+        self.store_array([price, amount])
+        return True
+
+    def remove_id(self, id):
+        """Remove the level id, return False if it is not in the book"""
+        price = self._ids.pop(id, None)
+        if price is None:
+            return False
+        self.store_array([price, 0])
+        return True
+
+    def price_of(self, id):
+        return self._ids.get(id)
+
+
+class IndexedAsks(IndexedOrderBookSide):
+    descending = False
+
+
+class IndexedBids(IndexedOrderBookSide):
+    descending = True
+
+
+class IndexedOrderBook(OrderBook):
+    """An OrderBook whose bids and asks are IndexedOrderBookSides"""
+
+    def reset(self, snapshot={}):
+        self.update({
+            'timestamp': snapshot.get('timestamp'),
+            'datetime': snapshot.get('datetime'),
+            'nonce': snapshot.get('nonce'),
+        })
+        self['bids'] = IndexedBids(snapshot.get('bids', []))
+        self['asks'] = IndexedAsks(snapshot.get('asks', []))
+        return self
+
+
+class OrderBookView(dict):
+    """An order book snapshot, a dict that shares the sides of an OrderBook.
+
+    Nothing is copied when the view is created. The top limit levels of a side
+    are copied when that side is first read, or just before the book changes
+    the side while the view is still alive, whichever comes first, so the
+    view always shows the book as it was at the version it was taken at.
+    Views that are dropped without being read cost no copying at all.
+
+    Listeners still get a dict, json.dumps() and dict() read the view through
+    the overridden methods. It is not meant to be changed in place, copy()
+    returns a plain dict that is."""
+
+    fields = ('bids', 'asks', 'timestamp', 'datetime', 'nonce')
+    # one is taken per emitted book, the instance dict would double its size
+    __slots__ = ('version', 'limit', '_book', '_sides', '__weakref__')
+
+    def __init__(self, book, limit=None):
+        super(OrderBookView, self).__init__(
+            bids=book['bids'],
+            asks=book['asks'],
+            timestamp=book['timestamp'],
+            datetime=book['datetime'],
+            nonce=book['nonce'],
+        )
+        self.version = book.version
+        self.limit = limit
+        self._book = ref(book)
+        self._sides = {
+            'bids': book['bids'],
+            'asks': book['asks'],
+        }
+        for side in self._sides.values():
+            key = id(self)
+            side._views[key] = ref(self, lambda _, views=side._views, key=key: views.pop(key, None))
+
+    def latest(self):
+        """A view of the book as it is now, None once the book is gone"""
+        book = self._book()
+        return None if book is None else OrderBookView(book, self.limit)
+
+    def release(self):
+        """Stop sharing the sides without copying them. Only latest() may be
+        called on a released view."""
+        for side in self._sides.values():
+            side._views.pop(id(self), None)
+        self._sides = {}
+
+    def _detach(self, side):
+        for key in ('bids', 'asks'):
+            if self._sides.get(key) is side:
+                self._copy(key)
+
+    def _copy(self, key):
+        side = self._sides.pop(key)
+        side._views.pop(id(self), None)
+        levels = side[:] if self.limit is None else side[:self.limit]
+        dict.__setitem__(self, key, levels)
+        return levels
+
+    def _read(self):
+        # the dict methods implemented in C read the stored values directly
+        for key in list(self._sides):
+            self._copy(key)
+
+    def __getitem__(self, key):
+        if key in self._sides:
+            return self._copy(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key in self._sides:
+            return self._copy(key)
+        return dict.get(self, key, default)
+
+    def __iter__(self):
+        # overridden so that dict() and update() go through __getitem__
+        return dict.__iter__(self)
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def __eq__(self, other):
+        self._read()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        self._read()
+        return dict.__ne__(self, other)
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return (dict, (self.copy(),))
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def copy(self):
+        """Return a plain dict with its own copy of the levels"""
+        return {key: (self[key][:] if key in ('bids', 'asks') else self[key]) for key in self.fields}
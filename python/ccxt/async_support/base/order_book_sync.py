@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""Sequencing of order book deltas against snapshots"""
+
+from heapq import heappop
+from heapq import heappush
+
+__all__ = [
+    'OrderBookSynchronizer',
+]
+
+
+class OrderBookSynchronizer(object):
+    """Puts the deltas of one order book in sequence and aligns them with its
+    snapshots.
+
+    A delta covers the sequence numbers first..last, exchanges that number
+    every message pass the same number twice. Until a snapshot is aligned
+    the deltas are buffered, at most size of them, dropping the oldest ones
+    as a later snapshot makes them useless anyway. Once in sync a delta is
+    released as soon as its predecessors are; with reorder it may wait for
+    up to that many later deltas to arrive before the missing sequence is
+    taken as a gap.
+
+    On a gap the book is out of sync, the deltas keep being buffered and the
+    caller has to align a new snapshot of that book."""
+
+    def __init__(self, size=1000, reorder=0):
+        self.size = size
+        self.reorder = reorder
+        # last sequence number applied to the book, None while out of sync
+        self.sequence = None
+        self.buffer = []
+        self.count = 0
+        self.resyncs = 0
+        self.dropped = 0
+        self.stale = 0
+
+    @property
+    def synced(self):
+        return self.sequence is not None
+
+    def push(self, first, last, delta):
+        """Return the deltas to apply now in order, [] when there are none,
+        or None when a gap was found"""
+        if (self.sequence is not None) and (last <= self.sequence):
+            self.stale += 1
+            return []
+        self.count += 1
+        heappush(self.buffer, (first, last, self.count, delta))
+        if self.sequence is None:
+            if len(self.buffer) > self.size:
+                heappop(self.buffer)
+                self.dropped += 1
+            return []
+        ready = self._release()
+        if len(self.buffer) > self.reorder:
+            self._gap()
+            return None
+        return ready
+
+    def align(self, sequence):
+        """Sync with a snapshot taken at sequence, return the buffered deltas
+        to apply on top of it, or None when the snapshot is too old for them"""
+        while self.buffer and (self.buffer[0][1] <= sequence):
+            heappop(self.buffer)
+        if self.buffer and (self.buffer[0][0] > sequence + 1):
+            # the deltas between the snapshot and the buffered ones are gone,
+            # with reorder as well, as the buffer only holds the later ones
+            self._gap()
+            return None
+        self.sequence = sequence
+        return self._release()
+
+    def reset(self):
+        """Wait for a new snapshot without counting a gap, e.g. after a reconnection"""
+        self.sequence = None
+        self.buffer = []
+
+    def _release(self):
+        ready = []
+        while self.buffer and (self.buffer[0][0] <= self.sequence + 1):
+            first, last, count, delta = heappop(self.buffer)
+            if last <= self.sequence:
+                self.stale += 1
+                continue
+            ready.append(delta)
+            self.sequence = last
+        return ready
+
+    def _gap(self):
+        self.resyncs += 1
+        self.sequence = None
+        while len(self.buffer) > self.size:
+            heappop(self.buffer)
+            self.dropped += 1
+
+    def stats(self):
+        return {
+            'synced': self.sequence is not None,
+            'sequence': self.sequence,
+            'buffered': len(self.buffer),
+            'resyncs': self.resyncs,
+            'dropped': self.dropped,
+            'stale': self.stale,
+        }
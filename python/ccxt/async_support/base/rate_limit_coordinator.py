@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""Unix socket server that shares rate limit buckets between processes"""
+
+import asyncio
+import json
+import os
+import sys
+
+from ccxt.base.rate_limiter import RateLimiter
+from ccxt.base.rate_limiter import UnixSocketRateLimiter
+
+__all__ = [
+    'RateLimitCoordinator',
+    'AsyncUnixSocketRateLimiter',
+]
+
+
+class RateLimitCoordinator(object):
+    """Keeps one RateLimiter per key for all the processes connected to path.
+
+    Run it in a process of its own with
+    python -m ccxt.async_support.base.rate_limit_coordinator /path/to/socket
+    and give the exchanges of every worker rateLimitBackend='/path/to/socket'."""
+
+    def __init__(self, path):
+        self.path = path
+        self.limiters = {}
+        self.server = None
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = await asyncio.start_unix_server(self.handle, path=self.path)
+        return self
+
+    async def handle(self, reader, writer):
+        try:
+            hello = json.loads(await reader.readline())
+            key = tuple(hello['key'])
+            if key not in self.limiters:
+                self.limiters[key] = RateLimiter(hello['default'], hello['buckets'])
+            limiter = self.limiters[key]
+            line = await reader.readline()
+            while line:
+                writer.write((repr(limiter.reserve(json.loads(line))) + '\n').encode('utf-8'))
+                line = await reader.readline()
+        except (ValueError, KeyError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+class AsyncUnixSocketRateLimiter(UnixSocketRateLimiter):
+    """UnixSocketRateLimiter with a non-blocking reserve for the async throttle"""
+
+    def __init__(self, path, key, default={}, buckets={}):
+        super(AsyncUnixSocketRateLimiter, self).__init__(path, key, default, buckets)
+        self.stream = None
+        self.lock = asyncio.Lock()
+
+    async def reserve_async(self, cost=None):
+        # one reservation at a time, the answers come back in order
+        async with self.lock:
+            try:
+                if self.stream is None:
+                    self.stream = await asyncio.open_unix_connection(self.path)
+                    self.stream[1].write(self.hello())
+                reader, writer = self.stream
+                writer.write((json.dumps(cost) + '\n').encode('utf-8'))
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError('rate limit coordinator closed the connection')
+            except OSError:
+                # e.g. no coordinator listens on path (yet), the next call tries again
+                self.close()
+                return self.local.reserve(cost)
+            return float(line)
+
+    def close(self):
+        super(AsyncUnixSocketRateLimiter, self).close()
+        if self.stream is not None:
+            self.stream[1].close()
+            self.stream = None
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    coordinator = loop.run_until_complete(RateLimitCoordinator(sys.argv[1]).start())
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(coordinator.close())
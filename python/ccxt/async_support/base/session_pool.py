@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""aiohttp sessions shared by the exchanges of a process"""
+
+import ssl
+
+import aiohttp
+
+__all__ = [
+    'ssl_context',
+    'acquire',
+    'release',
+    'stats',
+]
+
+# connector settings used unless the exchange's aiohttp_pool overrides them
+defaults = {
+    'limit': 100,  # connections in total
+    'limit_per_host': 10,
+    'keepalive_timeout': 30,  # seconds an idle connection is kept open
+    'ttl_dns_cache': 300,  # seconds
+}
+
+contexts = {}
+pools = {}
+
+
+def ssl_context(cafile):
+    """One SSL context per CA bundle, so the bundle is loaded only once"""
+    if cafile not in contexts:
+        contexts[cafile] = ssl.create_default_context(cafile=cafile)
+    return contexts[cafile]
+
+
+def acquire(loop, cafile, trust_env=False, config={}):
+    """Return the session shared by the exchanges with the same event loop,
+    CA bundle and trust_env. The connector is created with the config of the
+    first exchange that asks for it. Every acquire needs a matching release."""
+    key = (loop, cafile, trust_env)
+    pool = pools.get(key)
+    if pool is None or pool['session'].closed:
+        settings = dict(defaults)
+        settings.update(config)
+        connector = aiohttp.TCPConnector(ssl=ssl_context(cafile), loop=loop, **settings)
+        pool = pools[key] = {
+            'session': aiohttp.ClientSession(loop=loop, connector=connector, trust_env=trust_env),
+            'settings': settings,
+            'references': 0,
+        }
+    pool['references'] += 1
+    return pool['session']
+
+
+async def release(session):
+    """Close the shared session once the last exchange using it lets it go"""
+    for key, pool in list(pools.items()):
+        if pool['session'] is session:
+            pool['references'] -= 1
+            if pool['references'] <= 0:
+                del pools[key]
+                await session.close()
+            return
+
+
+def stats():
+    """Utilization of every shared session: the exchanges using it, its
+    connection limits, the connections in use (in total and per host) and
+    the idle keep-alive connections"""
+    result = []
+    for (loop, cafile, trust_env), pool in pools.items():
+        connector = pool['session'].connector
+        acquired = getattr(connector, '_acquired', ())
+        per_host = getattr(connector, '_acquired_per_host', {})
+        idle = getattr(connector, '_conns', {})
+        result.append({
+            'cafile': cafile,
+            'trust_env': trust_env,
+            'exchanges': pool['references'],
+            'limit': connector.limit,
+            'limit_per_host': connector.limit_per_host,
+            'acquired': len(acquired),
+            'acquired_per_host': {key.host: len(connections) for key, connections in per_host.items()},
+            'idle': sum(len(connections) for connections in idle.values()),
+        })
+    return result
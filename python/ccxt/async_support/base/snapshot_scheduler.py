@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+"""Queue of the REST order book snapshots that websocket books start from"""
+
+import asyncio
+import collections
+
+__all__ = [
+    'SnapshotScheduler',
+]
+
+
+class SnapshotScheduler(object):
+    """Fetches order book snapshots a few at a time.
+
+    Requests are queued per symbol, a symbol already queued is not queued
+    twice. A request for a symbol whose snapshot is being fetched is queued
+    again once that fetch is done, the running one may predate what the
+    request needs, e.g. a resync. The next snapshot fetched is the one of a symbol with consumers
+    waiting for its book, then the resyncs of books that were in use, then
+    the first snapshots, each in the order they were requested.
+
+    Every fetch goes through the exchange's rate limiter. The depth is taken
+    from options['snapshotDepths'], a dict of the depths the exchange accepts
+    to their rate limit cost: while the queue is short the deeper
+    options['snapshotDepth'] is fetched, with a backlog the cheapest depth
+    that still covers the subscribed limit, or the default depth of the
+    exchange for a book without a limit. The cost is reserved before fetching,
+    from the 'weight' bucket of exchanges whose rateLimitBuckets have one,
+    otherwise the part of it beyond the single request charged by fetch2."""
+
+    def __init__(self, exchange, concurrency=2):
+        self.exchange = exchange
+        self.concurrency = concurrency
+        self.pending = collections.OrderedDict()
+        self.running = {}
+        # requests that came in while their symbol was running
+        self.rerun = {}
+        self.completed = 0
+        self.failed = 0
+
+    def request(self, symbol, limit, callback, resync=False):
+        """Queue a snapshot of symbol, callback(error, orderbook) gets the result"""
+        queue = self.rerun if symbol in self.running else self.pending
+        if symbol in queue:
+            job = queue[symbol]
+            job['resync'] = job['resync'] or resync
+            job['callback'] = callback
+            job['limit'] = limit
+            return False
+        queue[symbol] = {
+            'symbol': symbol,
+            'limit': limit,
+            'callback': callback,
+            'resync': resync,
+        }
+        self.pump()
+        return True
+
+    def cancel(self, symbol):
+        self.pending.pop(symbol, None)
+        self.rerun.pop(symbol, None)
+
+    def next(self):
+        best = None
+        best_rank = None
+        for symbol, job in self.pending.items():
+            rank = (0 if self.exchange.dispatcher.has('ob', symbol) else 1, 0 if job['resync'] else 1)
+            if rank == (0, 0):
+                best = job
+                break
+            if (best_rank is None) or (rank < best_rank):
+                best = job
+                best_rank = rank
+        del self.pending[best['symbol']]
+        return best
+
+    def depth(self, limit):
+        depths = self.exchange.safe_value(self.exchange.options, 'snapshotDepths')
+        if not depths:
+            return limit
+        accepted = sorted(depths.keys())
+        wanted = limit
+        if len(self.pending) < self.concurrency:
+            preferred = self.exchange.safe_integer(self.exchange.options, 'snapshotDepth')
+            if (preferred is not None) and ((wanted is None) or (preferred > wanted)):
+                wanted = preferred
+        if wanted is None:
+            # a book without a limit needs a full snapshot, the default one
+            return None
+        for depth in accepted:
+            if depth >= wanted:
+                return depth
+        return accepted[-1]
+
+    def cost(self, depth):
+        depths = self.exchange.safe_value(self.exchange.options, 'snapshotDepths')
+        if not depths or (depth not in depths):
+            return 0
+        return depths[depth]
+
+    def pump(self):
+        while self.pending and (len(self.running) < self.concurrency):
+            job = self.next()
+            job['depth'] = self.depth(job['limit'])
+            self.running[job['symbol']] = job
+            job['task'] = asyncio.ensure_future(self.fetch(job), loop=self.exchange.asyncio_loop)
+
+    async def fetch(self, job):
+        error = None
+        response = None
+        try:
+            cost = self.cost(job['depth'])
+            if self.exchange.enableRateLimit and cost:
+                if 'weight' in (self.exchange.rateLimitBuckets or {}):
+                    # fetch2 paces the request itself in the default bucket
+                    await self.exchange.throttle({'default': 0, 'weight': cost})
+                elif cost > 1:
+                    # fetch2 charges the default cost of one request
+                    await self.exchange.throttle(cost - 1)
+            response = await self.exchange.fetch_order_book(job['symbol'], job['depth'])
+            self.completed += 1
+        except Exception as ex:
+            error = ex
+            self.failed += 1
+        finally:
+            del self.running[job['symbol']]
+        try:
+            job['callback'](error, response)
+        finally:
+            rerun = self.rerun.pop(job['symbol'], None)
+            if (rerun is not None) and (job['symbol'] not in self.pending):
+                self.pending[job['symbol']] = rerun
+            self.pump()
+
+    def stats(self):
+        return {
+            'concurrency': self.concurrency,
+            'pending': list(self.pending.keys()),
+            'running': {symbol: self.running[symbol]['depth'] for symbol in self.running},
+            'completed': self.completed,
+            'failed': self.failed,
+        }
+
+    def close(self):
+        self.pending.clear()
+        self.rerun.clear()
+        for symbol in list(self.running.keys()):
+            self.running[symbol]['task'].cancel()
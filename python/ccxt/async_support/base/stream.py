@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""Async iterators over the websocket events of one symbol"""
+
+import collections
+
+from ccxt.base.errors import ExchangeError
+
+__all__ = [
+    'EventStream',
+]
+
+
+class EventStream(object):
+    """Queues the (event, symbol) updates of an exchange for one consumer.
+
+    The queue holds at most maxsize updates, what happens to the next one is
+    decided by the overflow policy:
+
+    - 'block' keeps it and pauses reading the exchange's connections until
+      the consumer catches up, so the queue may overrun maxsize by the frames
+      already received
+    - 'drop-oldest' discards the oldest queued update
+    - 'conflate' replaces the newest queued update, which suits events that
+      carry the whole state, like order books and tickers
+
+    The subscription is made on the first iteration and released by close()
+    once no other stream of the exchange needs it."""
+
+    policies = ('block', 'drop-oldest', 'conflate')
+
+    def __init__(self, exchange, event, symbol, params={}, maxsize=100, overflow='block'):
+        if overflow not in self.policies:
+            raise ExchangeError('invalid overflow policy: ' + str(overflow) + ', expected one of ' + ', '.join(self.policies))
+        if maxsize < 1:
+            raise ExchangeError('invalid maxsize: ' + str(maxsize))
+        self.exchange = exchange
+        self.event = event
+        self.symbol = symbol
+        self.params = params
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.queue = collections.deque()
+        self.waiter = None
+        self.started = False
+        self.closed = False
+        self.paused = False
+        self.received = 0
+        self.dropped = 0
+
+    @property
+    def depth(self):
+        return len(self.queue)
+
+    def stats(self):
+        return {
+            'event': self.event,
+            'symbol': self.symbol,
+            'overflow': self.overflow,
+            'maxsize': self.maxsize,
+            'depth': len(self.queue),
+            'received': self.received,
+            'dropped': self.dropped,
+            'paused': self.paused,
+        }
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not (self.started or self.closed):
+            await self.start()
+        while not self.queue:
+            if self.closed:
+                raise StopAsyncIteration
+            self.waiter = self.exchange.asyncio_loop.create_future()
+            try:
+                await self.waiter
+            finally:
+                self.waiter = None
+        item = self.queue.popleft()
+        if self.paused and (len(self.queue) < self.maxsize):
+            self.paused = False
+            self.exchange._websocketResumeReading(self)
+        return item
+
+    async def start(self):
+        self.started = True
+        # listen before subscribing, the first update may arrive with the ack
+        self.exchange.on_symbol(self.event, self.symbol, self.push)
+        streams = self.exchange.websocketStreams.setdefault((self.event, self.symbol), [])
+        streams.append(self)
+        try:
+            conxid = (await self.exchange.websocket_subscribe_all([{
+                'event': self.event,
+                'symbol': self.symbol,
+                'params': self.params,
+            }]))[0]
+        except Exception:
+            streams.remove(self)
+            self.exchange.remove_symbol_listener(self.event, self.symbol, self.push)
+            self.closed = True
+            raise
+        if (self.event == 'ob') and not self.queue:
+            # a book subscribed before this stream will not be sent again until it changes
+            ob = self.exchange._get_current_websocket_orderbook(conxid, self.symbol, self.exchange.safe_integer(self.params, 'limit'))
+            if ob is not None:
+                self.push(self.symbol, ob)
+
+    def push(self, symbol, item, *args):
+        if self.closed:
+            return
+        self.received += 1
+        if len(self.queue) >= self.maxsize:
+            if self.overflow == 'conflate':
+                self.dropped += 1
+                self.queue[-1] = item
+                return
+            elif self.overflow == 'drop-oldest':
+                self.dropped += 1
+                self.queue.popleft()
+            elif not self.paused:
+                self.paused = True
+                self.exchange._websocketPauseReading(self)
+        self.queue.append(item)
+        if (self.waiter is not None) and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    async def close(self):
+        """Stop the stream, the queued updates can still be consumed"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.started:
+            self.exchange.remove_symbol_listener(self.event, self.symbol, self.push)
+        if self.paused:
+            self.paused = False
+            self.exchange._websocketResumeReading(self)
+        if (self.waiter is not None) and not self.waiter.done():
+            self.waiter.set_result(None)
+        key = (self.event, self.symbol)
+        streams = self.exchange.websocketStreams.get(key, [])
+        if self in streams:
+            streams.remove(self)
+        if self.started and not streams:
+            self.exchange.websocketStreams.pop(key, None)
+            await self.exchange.websocket_unsubscribe(self.event, self.symbol, self.params)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+"""Coarse timers of the websocket connections of one exchange"""
+
+import math
+
+__all__ = [
+    'TimerHandle',
+    'TimerWheel',
+]
+
+
+class TimerHandle(object):
+    """A callback scheduled on a TimerWheel, cancel() unschedules it"""
+
+    __slots__ = ('wheel', 'when', 'interval', 'callback', 'args', 'tick', 'cancelled')
+
+    def __init__(self, wheel, when, interval, callback, args):
+        self.wheel = wheel
+        self.when = when
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.tick = None
+        self.cancelled = False
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self.wheel._remove(self)
+
+
+class TimerWheel(object):
+    """A hashed timing wheel driven by a single loop timer.
+
+    Timers fall into one of size slots of tick seconds each, a timer further
+    away than a full turn waits in its slot for the turns in between.
+    Scheduling and cancelling are a dict insert and delete, and the loop
+    only ever has the next tick scheduled, and nothing at all while the wheel
+    is empty. Timers fire on the first tick at or after their deadline, at
+    most tick seconds late. Heartbeats, pong deadlines
+    and request timeouts of thousands of subscriptions need no more."""
+
+    def __init__(self, loop, tick=0.05, size=512):
+        self.loop = loop
+        self.tick = tick
+        self.size = size
+        self.slots = [{} for i in range(size)]
+        self.count = 0
+        self.fired = 0
+        # ticks are counted from origin, position is the last one processed
+        self.origin = loop.time()
+        self.position = 0
+        self._handle = None
+        self._running = False
+
+    def time(self):
+        return self.loop.time()
+
+    def call_later(self, delay, callback, *args):
+        return self._add(TimerHandle(self, self.loop.time() + delay, None, callback, args))
+
+    def call_at(self, when, callback, *args):
+        return self._add(TimerHandle(self, when, None, callback, args))
+
+    def call_periodic(self, interval, callback, *args):
+        """Call callback every interval seconds until the handle is cancelled"""
+        return self._add(TimerHandle(self, self.loop.time() + interval, interval, callback, args))
+
+    def _add(self, handle):
+        idle = (self._handle is None) and not self._running
+        if idle:
+            # skip the ticks that passed while the wheel was empty
+            self.position = int((self.loop.time() - self.origin) / self.tick)
+        handle.tick = max(self.position + 1, int(math.ceil((handle.when - self.origin) / self.tick)))
+        self.slots[handle.tick % self.size][id(handle)] = handle
+        self.count += 1
+        if idle:
+            self._schedule()
+        return handle
+
+    def _remove(self, handle):
+        if self.slots[handle.tick % self.size].pop(id(handle), None) is not None:
+            self.count -= 1
+
+    def _schedule(self):
+        self._handle = self.loop.call_at(self.origin + (self.position + 1) * self.tick, self._run)
+
+    def _run(self):
+        self._handle = None
+        self._running = True
+        try:
+            # the loop may run the timer up to its clock resolution early
+            current = max(self.position + 1, int((self.loop.time() - self.origin) / self.tick))
+            while self.position < current:
+                self.position += 1
+                slot = self.slots[self.position % self.size]
+                due = [handle for handle in slot.values() if handle.tick <= self.position]
+                for handle in due:
+                    del slot[id(handle)]
+                    self.count -= 1
+                for handle in due:
+                    self._fire(handle)
+        finally:
+            self._running = False
+        if self.count:
+            self._schedule()
+
+    def _fire(self, handle):
+        if handle.cancelled:
+            return
+        self.fired += 1
+        if handle.interval is not None:
+            # rescheduled first, the callback may cancel it
+            now = self.loop.time()
+            handle.when += handle.interval
+            if handle.when <= now:
+                handle.when = now + handle.interval
+            self._add(handle)
+        else:
+            handle.cancelled = True
+        try:
+            handle.callback(*handle.args)
+        except Exception as ex:
+            self.loop.call_exception_handler({
+                'message': 'Exception in TimerWheel callback ' + repr(handle.callback),
+                'exception': ex,
+            })
+
+    def stats(self):
+        return {
+            'tick': self.tick,
+            'scheduled': self.count,
+            'fired': self.fired,
+        }
+
+    def close(self):
+        """Drop every timer"""
+        for slot in self.slots:
+            for handle in slot.values():
+                handle.cancelled = True
+            slot.clear()
+        self.count = 0
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
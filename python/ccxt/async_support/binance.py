@@ -132,20 +132,35 @@ class binance (Exchange):
                         'account',
                         'myTrades',
                     ],
-                    'post': [
-                        'order',
-                        'order/test',
-                    ],
+                    # new orders also count towards the 10 orders per second limit
+                    'post': {
+                        'order': {'orders': 1},
+                        'order/test': 1,
+                    },
                     'delete': [
                         'order',
                     ],
                 },
             },
+            'rateLimitBuckets': {
+                'orders': {
+                    'refillRate': 0.01,
+                    'capacity': 10,
+                },
+                # 1200 request weight per minute
+                'weight': {
+                    'refillRate': 0.02,
+                    'capacity': 1200,
+                },
+            },
             'wsconf': {
                 'conx-tpls': {
                     'default': {
                         'type': 'ws-s',
                         'baseurl': 'wss://stream.binance.com:9443/stream?streams=',
+                        'streamUpdate': 'live',
+                        'maxStreams': 1024,  # streams per connection
+                        'maxUrlLength': 4096,
                     },
                 },
                 'methodmap': {
@@ -339,6 +354,11 @@ class binance (Exchange):
                     'market': 'FULL',  # 'ACK' for order id, 'RESULT' for full order or 'FULL' for order with fills
                     'limit': 'RESULT',  # we change it from 'ACK' by default to 'RESULT'
                 },
+                # depth limits accepted by GET /api/v1/depth and their request weight
+                'snapshotDepths': {5: 1, 10: 1, 20: 1, 50: 1, 100: 1, 500: 5, 1000: 10},
+                # depth of the websocket order book snapshots while they are not queued up,
+                # the deepest one that still costs a single request weight
+                'snapshotDepth': 100,
             },
             'exceptions': {
                 '-1000': ExchangeNotAvailable,  # {"code":-1000,"msg":"An unknown error occured while processing the request."}
@@ -1188,7 +1208,16 @@ class binance (Exchange):
         return response
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
+        id = self.safe_string(msg, 'id')
+        if id is not None:
+            # response to a SUBSCRIBE or UNSUBSCRIBE request
+            error = self.safe_value(msg, 'error')
+            if error is None:
+                self.emit(id, True)
+            else:
+                self.emit(id, False, ExchangeError(self.id + ' ' + self.json(error)))
+            return
         stream = self.safe_string(msg, 'stream')
         resData = self.safe_value(msg, 'data', {})
         parts = stream.split('@')
@@ -1208,43 +1237,43 @@ class binance (Exchange):
 
     def _websocket_handle_ob(self, contextId, data):
         symbol = self.find_symbol(self.safe_string(data, 's'))
-        # if asyncContext has no previous orderbook you have to cache all deltas
-        # and fetch orderbook from rest api
+        # deltas are buffered until they are aligned with a rest snapshot,
+        # a gap in the update ids takes a new snapshot of this symbol only
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
-        if not('ob' in list(symbolData.keys())):
-            if not('deltas' in list(symbolData.keys())):
-                symbolData['deltas'] = []
-            deltas = symbolData['deltas']
-            partsLen = len(deltas)
-            if partsLen > 50:
-                if not('failCount' in list(symbolData.keys())):
-                    symbolData['failCount'] = 0
-                symbolData['failCount'] = symbolData['failCount'] + 1
-                if symbolData['failCount'] > 5:
-                    self.emit('err', ExchangeError(self.id + ': max deltas failCount reached for symbol ' + symbol))
-                    self.websocketClose(contextId)
-                else:
-                    # Launch again
-                    del symbolData['ob']
-                    del symbolData['deltas']
-                self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
-            else:
-                symbolData['deltas'].append(data)
-                if not('snaplaunched' in list(symbolData.keys())):
-                    symbolData['snaplaunched'] = True
-                    self._executeAndCallback(contextId, self._websocketMethodMap('fetchOrderBook'), [symbol], self._websocketMethodMap('_websocketHandleObRestSnapshot'), {
-                        'symbol': symbol,
-                        'contextId': contextId,
-                    })
-                self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
-        else:
+        sync = self._websocketOrderBookSync(symbol)
+        deltas = sync.push(self.safe_integer(data, 'U'), self.safe_integer(data, 'u'), data)
+        if deltas is None:
+            del symbolData['ob']
+        if not sync.synced:
+            self._websocket_fetch_ob_snapshot(contextId, symbol, deltas is None)
+            return
+        if len(deltas) == 0:
+            return
+        for delta in deltas:
+            symbolData['ob'] = self.mergeOrderBookDelta(symbolData['ob'], delta, delta['E'], 'b', 'a')
+        self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+        self._websocket_emit_ob(contextId, symbol, symbolData['ob'])
+
+    def _websocket_fetch_ob_snapshot(self, contextId, symbol, resync=False):
+        symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
+        if not self.safe_value(symbolData, 'snaplaunched', False):
+            symbolData['snaplaunched'] = True
+            self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+            limit = None
             config = self._contextGet(contextId, 'config')
-            symbolData['ob'] = self.mergeOrderBookDelta(symbolData['ob'], data, data['E'], 'b', 'a')
             if config is not None:
-                self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], config['ob'][symbol]['limit']))
-            else:
-                self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob']))
-            self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+                limit = config['ob'][symbol]['limit']
+            self._websocketFetchSnapshot(contextId, symbol, limit, resync, self._websocketMethodMap('_websocketHandleObRestSnapshot'), {
+                'symbol': symbol,
+                'contextId': contextId,
+            })
+
+    def _websocket_emit_ob(self, contextId, symbol, ob):
+        config = self._contextGet(contextId, 'config')
+        if config is not None:
+            self.emit('ob', symbol, self._viewOrderBook(ob, config['ob'][symbol]['limit']))
+        else:
+            self.emit('ob', symbol, self._viewOrderBook(ob))
 
     def _websocket_handle_trade(self, contextId, data):
         symbol = self.find_symbol(self.safe_string(data, 's'))
@@ -1295,35 +1324,26 @@ class binance (Exchange):
     def _websocket_handle_ob_rest_snapshot(self, context, error, response):
         symbol = context['symbol']
         contextId = context['contextId']
+        if not self._contextIsSubscribed(contextId, 'ob', symbol) and not self._contextIsSubscribing(contextId, 'ob', symbol):
+            return
         data = self._contextGetSymbolData(contextId, 'ob', symbol)
-        config = self._contextGet(contextId, 'config')
-        # print('order book snapshot returned for '+ symbol)
-        if not error:
-            lastUpdateId = self.safe_integer(response, 'nonce')
-            deltas = data['deltas']
-            index = 0
-            for index in range(0, len(deltas)):
-                delta = deltas[index]
-                U = self.safe_integer(delta, 'U')
-                u = self.safe_integer(delta, 'u')
-                if u <= lastUpdateId:
-                    continue
-                if (U <= lastUpdateId + 1) and(u >= lastUpdateId + 1):
-                    break
-                self.emit('err', ExchangeError(self.id + ': error in update ids in deltas for ' + symbol))
-                self.websocketClose(contextId)
-                return
-            # process orderbook
-            for i in range(index, len(deltas)):
-                delta = deltas[i]
-                self.mergeOrderBookDelta(response, delta, None, 'b', 'a')
-            data['ob'] = response
-            data['deltas'] = []
-            if config is not None:
-                self.emit('ob', symbol, self._cloneOrderBook(response, config['ob'][symbol]['limit']))
-            else:
-                self.emit('ob', symbol, self._cloneOrderBook(response))
-            self._contextSetSymbolData(contextId, 'ob', symbol, data)
+        data['snaplaunched'] = False
+        self._contextSetSymbolData(contextId, 'ob', symbol, data)
+        if error:
+            self.emit('err', ExchangeError(self.id + ': order book snapshot failed for ' + symbol + ': ' + str(error)), contextId)
+            return
+        sync = self._websocketOrderBookSync(symbol)
+        deltas = sync.align(self.safe_integer(response, 'nonce'))
+        if deltas is None:
+            # the snapshot is older than the buffered deltas
+            self._websocket_fetch_ob_snapshot(contextId, symbol, True)
+            return
+        ob = self.order_book(response)
+        for delta in deltas:
+            ob = self.mergeOrderBookDelta(ob, delta, delta['E'], 'b', 'a')
+        data['ob'] = ob
+        self._contextSetSymbolData(contextId, 'ob', symbol, data)
+        self._websocket_emit_ob(contextId, symbol, ob)
 
     def _websocket_subscribe(self, contextId, event, symbol, nonce, params={}):
         if event != 'ob' and event != 'trade' and event != 'ohlcv' and event != 'ticker':
@@ -1340,22 +1360,46 @@ class binance (Exchange):
             }
             config = self.deep_extend(config, newConfig)
             self._contextSet(contextId, 'config', config)
-        nonceStr = str(nonce)
-        self.emit(nonceStr, True)
+        # streams missing from the url of the connection are added to it live
+        stream = self._websocket_generate_url_stream([{'event': event, 'symbol': symbol}], {'url': ''}, params)
+        streams = self._contextGet(contextId, 'streams')
+        if (streams is not None) and not(stream in streams):
+            streams.append(stream)
+            self.websocketSendJson({
+                'method': 'SUBSCRIBE',
+                'params': [stream],
+                'id': nonce,
+            }, contextId)
+        else:
+            nonceStr = str(nonce)
+            self.emit(nonceStr, True)
 
     def _websocket_unsubscribe(self, contextId, event, symbol, nonce, params={}):
         if event != 'ob' and event != 'trade':
             raise NotSupported('unsubscribe ' + event + '(' + symbol + ') not supported for exchange ' + self.id)
-        nonceStr = str(nonce)
-        self.emit(nonceStr, True)
+        stream = self._websocket_generate_url_stream([{'event': event, 'symbol': symbol}], {'url': ''}, params)
+        streams = self._contextGet(contextId, 'streams')
+        conx = self._contextGetConnection(contextId)
+        if (streams is not None) and (stream in streams) and (conx is not None) and conx.isActive():
+            streams.remove(stream)
+            self.websocketSendJson({
+                'method': 'UNSUBSCRIBE',
+                'params': [stream],
+                'id': nonce,
+            }, contextId)
+        else:
+            nonceStr = str(nonce)
+            self.emit(nonceStr, True)
 
     def _websocket_on_open(self, contextId, websocketConexConfig):
         url = websocketConexConfig['url']
         parts = url.split('=')
         partsLen = len(parts)
+        self._contextSet(contextId, 'streams', [])
         if partsLen > 1:
             streams = parts[1]
             streams = streams.split('/')
+            self._contextSet(contextId, 'streams', streams)
             for i in range(0, len(streams)):
                 stream = streams[i]
                 pair = stream.split('@')
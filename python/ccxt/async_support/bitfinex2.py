@@ -6,7 +6,6 @@
 from ccxt.async_support.bitfinex import bitfinex
 import hashlib
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import InsufficientFunds
 from ccxt.base.errors import NotSupported
@@ -176,11 +175,9 @@ class bitfinex2 (bitfinex):
                         'type': 'ws',
                         'baseurl': 'wss://api.bitfinex.com/ws/2',
                         'wait4readyEvent': 'statusok',
+                        'maxChannels': 25,  # public channels per connection
                     },
                 },
-                'methodmap': {
-                    '_websocketTimeoutRemoveNonce': '_websocketTimeoutRemoveNonce',
-                },
                 'events': {
                     'ob': {
                         'conx-tpl': 'default',
@@ -493,7 +490,7 @@ class bitfinex2 (bitfinex):
         return response
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         # console.log(msg)
         event = self.safe_string(msg, 'event')
         if event is not None:
@@ -534,7 +531,7 @@ class bitfinex2 (bitfinex):
             self.websocketSendJson({
                 'event': 'conf',
                 'flags': 32768,
-            })
+            }, contextId)
             self.emit('statusok', True)
 
     def _websocket_handle_error(self, contextId, msg):
@@ -545,11 +542,11 @@ class bitfinex2 (bitfinex):
         if channel == 'book':
             id = self.safe_string(msg, 'symbol')
             symbol = self.find_symbol(id)
-            self._websocket_process_pending_nonces(contextId, 'sub-nonces', 'ob', symbol, False, ex)
+            self._websocketAcknowledgeAll(contextId, 'subscribe', 'ob', symbol, False, ex)
         elif channel == 'trades':
             id = self.safe_string(msg, 'symbol')
             symbol = self.find_symbol(id)
-            self._websocket_process_pending_nonces(contextId, 'sub-nonces', 'trade', symbol, False, ex)
+            self._websocketAcknowledgeAll(contextId, 'subscribe', 'trade', symbol, False, ex)
         self.emit('err', ex, contextId)
 
     def _websocket_handle_trade(self, contextId, symbol, msg):
@@ -582,13 +579,13 @@ class bitfinex2 (bitfinex):
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
         if isinstance(firstElement, list):
             # snapshot
-            symbolData['ob'] = {
+            symbolData['ob'] = self.order_book({
                 'bids': [],
                 'asks': [],
                 'timestamp': timestamp,
                 'datetime': dt,
                 'nonce': None,
-            }
+            })
             for i in range(0, len(data)):
                 record = data[i]
                 price = record[0]
@@ -631,21 +628,9 @@ class bitfinex2 (bitfinex):
                 self.updateBidAsk([price, amount], symbolData['ob'][side], isBid)
             symbolData['ob']['timestamp'] = timestamp
             symbolData['ob']['datetime'] = dt
-        self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
-    def _websocket_process_pending_nonces(self, contextId, nonceKey, event, symbol, success, ex):
-        symbolData = self._contextGetSymbolData(contextId, event, symbol)
-        if nonceKey in symbolData:
-            nonces = symbolData[nonceKey]
-            keys = list(nonces.keys())
-            for i in range(0, len(keys)):
-                nonce = keys[i]
-                self._cancelTimeout(nonces[nonce])
-                self.emit(nonce, success, ex)
-            symbolData[nonceKey] = {}
-            self._contextSetSymbolData(contextId, event, symbol, symbolData)
-
     def _websocket_handle_subscription(self, contextId, event, msg):
         id = self.safe_string(msg, 'symbol')
         symbol = self.find_symbol(id)
@@ -664,9 +649,9 @@ class bitfinex2 (bitfinex):
         symbolData['channelId'] = channel
         self._contextSetSymbolData(contextId, event, symbol, symbolData)
         if event == 'ob':
-            self._websocket_process_pending_nonces(contextId, 'sub-nonces', 'ob', symbol, True, None)
+            self._websocketAcknowledgeAll(contextId, 'subscribe', 'ob', symbol, True, None)
         elif event == 'trade':
-            self._websocket_process_pending_nonces(contextId, 'sub-nonces', 'trade', symbol, True, None)
+            self._websocketAcknowledgeAll(contextId, 'subscribe', 'trade', symbol, True, None)
 
     def _websocket_handle_unsubscription(self, contextId, msg):
         status = self.safe_string(msg, 'status')
@@ -682,19 +667,14 @@ class bitfinex2 (bitfinex):
             # remove channel ids ?
             self.omit(channels, chanKey)
             self._contextSet(contextId, 'channels', channels)
-            self._websocket_process_pending_nonces(contextId, 'unsub-nonces', event, symbol, True, None)
+            self._websocketAcknowledgeAll(contextId, 'unsubscribe', event, symbol, True, None)
 
     def _websocket_subscribe(self, contextId, event, symbol, nonce, params={}):
         if event != 'ob' and event != 'trade':
             raise NotSupported('subscribe ' + event + '(' + symbol + ') not supported for exchange ' + self.id)
-        # save nonce for subscription response
+        # the ack settles the pending request of this symbol, see _websocketAcknowledgeAll
         symbolData = self._contextGetSymbolData(contextId, event, symbol)
-        if not('sub-nonces' in list(symbolData.keys())):
-            symbolData['sub-nonces'] = {}
         symbolData['limit'] = self.safe_integer(params, 'limit', None)
-        nonceStr = str(nonce)
-        handle = self._setTimeout(contextId, self.timeout, self._websocketMethodMap('_websocketTimeoutRemoveNonce'), [contextId, nonceStr, event, symbol, 'sub-nonce'])
-        symbolData['sub-nonces'][nonceStr] = handle
         self._contextSetSymbolData(contextId, event, symbol, symbolData)
         # send request
         id = self.market_id(symbol)
@@ -706,13 +686,13 @@ class bitfinex2 (bitfinex):
                 'prec': 'P0',
                 'freq': 'F0',
                 'len': '100',
-            })
+            }, contextId)
         elif event == 'trade':
             self.websocketSendJson({
                 'event': 'subscribe',
                 'channel': 'trades',
                 'symbol': id,
-            })
+            }, contextId)
 
     def _websocket_unsubscribe(self, contextId, event, symbol, nonce, params={}):
         if event != 'ob' and event != 'trade':
@@ -722,21 +702,7 @@ class bitfinex2 (bitfinex):
             'event': 'unsubscribe',
             'chanId': symbolData['channelId'],
         }
-        if not('unsub-nonces' in list(symbolData.keys())):
-            symbolData['unsub-nonces'] = {}
-        nonceStr = str(nonce)
-        handle = self._setTimeout(contextId, self.timeout, self._websocketMethodMap('_websocketTimeoutRemoveNonce'), [contextId, nonceStr, event, symbol, 'unsub-nonces'])
-        symbolData['unsub-nonces'][nonceStr] = handle
-        self._contextSetSymbolData(contextId, event, symbol, symbolData)
-        self.websocketSendJson(payload)
-
-    def _websocket_timeout_remove_nonce(self, contextId, timerNonce, event, symbol, key):
-        symbolData = self._contextGetSymbolData(contextId, event, symbol)
-        if key in symbolData:
-            nonces = symbolData[key]
-            if timerNonce in nonces:
-                self.omit(symbolData[key], timerNonce)
-                self._contextSetSymbolData(contextId, event, symbol, symbolData)
+        self.websocketSendJson(payload, contextId)
 
     def _get_current_websocket_orderbook(self, contextId, symbol, limit):
         data = self._contextGetSymbolData(contextId, 'ob', symbol)
@@ -4,7 +4,6 @@
 # https://github.com/ccxt/ccxt/blob/master/CONTRIBUTING.md#how-to-contribute-code
 
 from ccxt.async_support.base.exchange import Exchange
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import AuthenticationError
 from ccxt.base.errors import PermissionDenied
@@ -642,8 +641,6 @@ class bitmex (Exchange):
             self._cancelTimeout(lastTimer)
         lastTimer = self._setTimeout(contextId, 5000, self._websocketMethodMap('_websocketTimeoutSendPing'), [])
         self._contextSet(contextId, 'timer', lastTimer)
-        dbids = {}
-        self._contextSet(contextId, 'dbids', dbids)
         # send auth
         # nonce = self.nonce()
         # signature = self.hmac(self.encode('GET/realtime' + str(nonce)), self.encode(self.secret))
@@ -655,9 +652,9 @@ class bitmex (Exchange):
 
     def _websocket_on_message(self, contextId, data):
         # send ping after 5 seconds if not message received
-        if data == 'pong':
+        if data == 'pong' or data == b'pong':
             return
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         table = self.safe_string(msg, 'table')
         subscribe = self.safe_string(msg, 'subscribe')
         unsubscribe = self.safe_string(msg, 'unsubscribe')
@@ -723,12 +720,11 @@ class bitmex (Exchange):
                 event = None
             if event is not None:
                 symbol = self.find_symbol(parts[1])
-                if success and event == 'ob':
-                    dbids = self._contextGet(contextId, 'dbids')
-                    if symbol in dbids:
-                        self.omit(dbids, symbol)
-                        self._contextSet(contextId, 'dbids', dbids)
                 symbolData = self._contextGetSymbolData(contextId, event, symbol)
+                if success and event == 'ob' and 'ob' in symbolData:
+                    # the book and its level ids go with the subscription
+                    del symbolData['ob']
+                    self._contextSetSymbolData(contextId, event, symbol, symbolData)
                 if 'unsub-nonces' in symbolData:
                     nonces = symbolData['unsub-nonces']
                     keys = list(nonces.keys())
@@ -752,10 +748,11 @@ class bitmex (Exchange):
     def _websocket_handle_ob(self, contextId, msg):
         action = self.safe_string(msg, 'action')
         data = self.safe_value(msg, 'data')
-        symbol = self.safe_string(data[0], 'symbol')
-        dbids = self._contextGet(contextId, 'dbids')
+        if data is None or len(data) == 0:
+            return
+        symbol = self.find_symbol(self.safe_string(data[0], 'symbol'))
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
-        symbol = self.find_symbol(symbol)
+        # rows name their level by id, only inserts carry a price
         if action == 'partial':
             ob = {
                 'bids': [],
@@ -764,63 +761,29 @@ class bitmex (Exchange):
                 'datetime': None,
                 'nonce': None,
             }
-            obIds = {}
             for o in range(0, len(data)):
                 order = data[o]
                 side = 'asks' if (order['side'] == 'Sell') else 'bids'
-                amount = order['size']
-                price = order['price']
-                priceId = order['id']
-                ob[side].append([price, amount])
-                obIds[priceId] = price
-            ob['bids'] = self.sort_by(ob['bids'], 0, True)
-            ob['asks'] = self.sort_by(ob['asks'], 0)
-            symbolData['ob'] = ob
-            dbids[symbol] = obIds
-            self.emit('ob', symbol, self._cloneOrderBook(ob, symbolData['limit']))
-        elif action == 'update':
-            if symbol in dbids:
-                obIds = dbids[symbol]
-                curob = symbolData['ob']
-                for o in range(0, len(data)):
-                    order = data[o]
-                    amount = order['size']
-                    side = 'asks' if (order['side'] == 'Sell') else 'bids'
-                    priceId = order['id']
-                    price = obIds[priceId]
-                    self.updateBidAsk([price, amount], curob[side], order['side'] == 'Buy')
-                symbolData['ob'] = curob
-                self.emit('ob', symbol, self._cloneOrderBook(curob, symbolData['limit']))
-        elif action == 'insert':
-            if symbol in dbids:
-                curob = symbolData['ob']
-                for o in range(0, len(data)):
-                    order = data[o]
-                    amount = order['size']
-                    side = 'asks' if (order['side'] == 'Sell') else 'bids'
-                    priceId = order['id']
-                    price = order['price']
-                    self.updateBidAsk([price, amount], curob[side], order['side'] == 'Buy')
-                    dbids[symbol][priceId] = price
-                symbolData['ob'] = curob
-                self.emit('ob', symbol, self._cloneOrderBook(curob, symbolData['limit']))
-        elif action == 'delete':
-            if symbol in dbids:
-                obIds = dbids[symbol]
-                curob = symbolData['ob']
-                for o in range(0, len(data)):
-                    order = data[o]
-                    side = 'asks' if (order['side'] == 'Sell') else 'bids'
-                    priceId = order['id']
-                    price = obIds[priceId]
-                    self.updateBidAsk([price, 0], curob[side], order['side'] == 'Buy')
-                    self.omit(dbids[symbol], priceId)
-                symbolData['ob'] = curob
-                self.emit('ob', symbol, self._cloneOrderBook(curob, symbolData['limit']))
+                ob[side].append([order['price'], order['size'], order['id']])
+            symbolData['ob'] = self.indexed_order_book(ob)
+        elif action == 'update' or action == 'insert' or action == 'delete':
+            if 'ob' not in symbolData:
+                return
+            curob = symbolData['ob']
+            for o in range(0, len(data)):
+                order = data[o]
+                side = 'asks' if (order['side'] == 'Sell') else 'bids'
+                if action == 'update':
+                    curob[side].store_id(order['id'], order['size'])
+                elif action == 'insert':
+                    curob[side].store_id(order['id'], order['size'], order['price'])
+                else:
+                    curob[side].remove_id(order['id'])
         else:
             self.emit('err', ExchangeError(self.id + ' invalid orderbook message'))
-        self._contextSet(contextId, 'dbids', dbids)
+            return
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
 
     def _websocket_subscribe(self, contextId, event, symbol, nonce, params={}):
         if event != 'ob' and event != 'trade':
@@ -12,7 +12,6 @@ try:
 except NameError:
     basestring = str  # Python 2
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import AuthenticationError
 from ccxt.base.errors import PermissionDenied
@@ -870,7 +869,7 @@ class bitstamp (Exchange):
                 raise ExchangeError(self.id + ' ' + body)
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         # console.log(data)
         evt = self.safe_string(msg, 'event')
         if evt == 'subscription_succeeded':
@@ -894,7 +893,7 @@ class bitstamp (Exchange):
         ob = self.parse_order_book(data, timestamp * 1000)
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
         symbolData['ob'] = ob
-        self.emit('ob', symbol, self._cloneOrderBook(ob, symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(ob, symbolData['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
     def _websocket_parse_trade(self, data, symbol):
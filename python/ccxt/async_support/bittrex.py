@@ -204,8 +204,12 @@ class bittrex (Exchange):
                         'baseurl': 'wss://socket.bittrex.com/signalr/connect?transport=webSockets&clientProtocol=1.5&connectionToken=',
                         'tokenUrl': 'https://socket.bittrex.com/signalr/negotiate?clientProtocol=1.5&connectionData=[{"name":"c2"}]&_=1524596108843',
                         'disableCertCheck': True,
+                        'decompress': '_websocketInflateMessage',
                     },
                 },
+                'methodmap': {
+                    '_websocketInflateMessage': '_websocketInflateMessage',
+                },
                 'events': {
                     'ob': {
                         'conx-tpl': 'default',
@@ -1010,7 +1014,7 @@ class bittrex (Exchange):
         # WebsocketConnection: {"C":"d-30A89C0B-B2bAF,2|Dj,DCF8E","M":[{"H":"C2","M":"uE","A":["bc4xDsIwDIXhu7w5WHYSN3ZGYAUJWgZAXblE1bu3QlUFBW+WPv32gBMqbu2x2+27AwLOqM4qnAMeqM8B3R1VAq6oSZNTEebYGAdcUJl4DBvC5DlJkRi3hBcSjUTVXPJaKcrsJX1LbYiXebu4rmMf0P58p0wpmbmJ/T/dZHdy/0jORHRNvuZkP04="]}]}
         # WebsocketConnection: {"I":"1548328520","E":"There was an error invoking Hub method 'c2.SubscribeToExchangeDeltas'."}
         # better to create SignalR Class to do all of self?
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         opIndex = self.safe_string(msg, 'I')
         if opIndex is not None:
             # response to a request
@@ -1031,9 +1035,7 @@ class bittrex (Exchange):
                             'I': 'snapshot_' + rest,
                         })
                 elif opIndex.find('snapshot_') == 0:
-                    data = self.inflateRaw(result, 'base64')
-                    parsedData = json.loads(data)
-                    self._websocket_handle_order_book_snapshot(contextId, parsedData)
+                    self._websocket_handle_order_book_snapshot(contextId, result)
         else:
             # TODO: check sequence number
             messages = self.safe_value(msg, 'M')
@@ -1044,9 +1046,27 @@ class bittrex (Exchange):
                     methodArgs = self.safe_value(messages[i], 'A')
                     if hub == 'C2':
                         if method == 'uE':
-                            data = self.inflateRaw(methodArgs[0], 'base64')
-                            parsedData = json.loads(data)
-                            self._websocket_handle_order_book_delta(contextId, parsedData)
+                            self._websocket_handle_order_book_delta(contextId, methodArgs[0])
+
+    def _websocket_inflate_message(self, data):
+        # runs off the event loop for large frames such as QueryExchangeState
+        # snapshots, the deflated payloads are returned inflated and parsed
+        msg = self.websocketParseJson(data)
+        opIndex = self.safe_string(msg, 'I')
+        if opIndex is not None:
+            result = self.safe_value(msg, 'R')
+            if (opIndex.find('snapshot_') == 0) and (result is not None):
+                msg['R'] = self.websocketParseJson(self.inflateRaw(result, 'base64'))
+        else:
+            messages = self.safe_value(msg, 'M')
+            if messages is not None:
+                for i in range(0, len(messages)):
+                    hub = self.safe_string(messages[i], 'H')
+                    method = self.safe_string(messages[i], 'M')
+                    if hub == 'C2' and method == 'uE':
+                        methodArgs = messages[i]['A']
+                        methodArgs[0] = self.websocketParseJson(self.inflateRaw(methodArgs[0], 'base64'))
+        return msg
 
     def _websocket_parse_trade(self, trade, symbol):
         # Websocket trade format different than REST trade format
@@ -1074,10 +1094,10 @@ class bittrex (Exchange):
         symbol = self.find_symbol(id)
         if not self._contextIsSubscribed(contextId, 'ob', symbol):
             return
-        ob = self.parse_order_book(data, None, 'Z', 'S', 'R', 'Q')
+        ob = self.order_book(self.parse_order_book(data, None, 'Z', 'S', 'R', 'Q'))
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
         symbolData['ob'] = ob
-        self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
     def _websocket_handle_order_book_delta(self, contextId, data):
@@ -1110,7 +1130,7 @@ class bittrex (Exchange):
                             self.updateBidAsk([price, 0], symbolData['ob']['asks'], False)
                         else:
                             self.updateBidAsk([price, amount], symbolData['ob']['asks'], False)
-                self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
+                self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
                 self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
         if self._contextIsSubscribed(contextId, 'trade', symbol):
             fills = self.safe_value(data, 'f')
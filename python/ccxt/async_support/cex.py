@@ -19,7 +19,6 @@ from ccxt.base.errors import ArgumentsRequired
 from ccxt.base.errors import NullResponse
 from ccxt.base.errors import InvalidOrder
 from ccxt.base.errors import NotSupported
-from ccxt.base.errors import NetworkError
 
 
 class cex (Exchange):
@@ -554,7 +553,7 @@ class cex (Exchange):
         }
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         e = self.safe_string(msg, 'e')
         oid = self.safe_string(msg, 'oid')
         resData = self.safe_value(msg, 'data', {})
@@ -579,13 +578,22 @@ class cex (Exchange):
         if msg['ok'] == 'ok':
             symbol = resData['pair'].replace(':', '/')
             timestamp = resData['timestamp'] * 1000
-            ob = self.parse_order_book(resData, timestamp)
+            ob = self.order_book(self.parse_order_book(resData, timestamp))
             ob['nonce'] = resData['id']
             data = self._contextGetSymbolData(contextId, 'ob', symbol)
-            data['ob'] = ob
-            self._contextSetSymbolData(contextId, 'ob', symbol, data)
+            # updates received while resubscribing are applied on top of the snapshot
+            deltas = self._websocketOrderBookSync(symbol).align(ob['nonce'])
+            if deltas is not None:
+                for i in range(0, len(deltas)):
+                    ob = self.mergeOrderBookDelta(ob, deltas[i], deltas[i]['time'])
+                    ob['nonce'] = deltas[i]['id']
+                data['ob'] = ob
+                self._contextSetSymbolData(contextId, 'ob', symbol, data)
             self.emit(oid, True)
-            self.emit('ob', symbol, self._cloneOrderBook(data['ob'], data['limit']))
+            if deltas is None:
+                self._websocket_resync_ob(contextId, symbol)
+                return
+            self.emit('ob', symbol, self._viewOrderBook(data['ob'], data['limit']))
         else:
             error = ExchangeError(self.safe_string(resData, 'error', 'orderbook error'))
             self.emit(oid, False, error)
@@ -604,17 +612,40 @@ class cex (Exchange):
 
     def _websocket_handle_ob_update(self, contextId, msg, oid, resData):
         symbol = resData['pair'].replace(':', '/')
-        timestamp = resData['time']
         data = self._contextGetSymbolData(contextId, 'ob', symbol)
-        if data['ob']['nonce'] != (resData['id'] - 1):
-            self.websocketClose()
-            self.emit('err', NetworkError('invalid orderbook sequence in ' + self.id + ' ' + data['ob']['nonce'] + ' != ' + resData['id'] + ' -1'))
-        else:
-            ob = self.mergeOrderBookDelta(data['ob'], resData, timestamp)
-            ob['nonce'] = resData['id']
-            data['ob'] = ob
+        deltas = self._websocketOrderBookSync(symbol).push(resData['id'], resData['id'], resData)
+        if deltas is None:
+            # a missing update id resubscribes this pair only
+            del data['ob']
             self._contextSetSymbolData(contextId, 'ob', symbol, data)
-            self.emit('ob', symbol, self._cloneOrderBook(data['ob'], data['limit']))
+            self._websocket_resync_ob(contextId, symbol)
+            return
+        if len(deltas) == 0:
+            return
+        for i in range(0, len(deltas)):
+            data['ob'] = self.mergeOrderBookDelta(data['ob'], deltas[i], deltas[i]['time'])
+            data['ob']['nonce'] = deltas[i]['id']
+        self._contextSetSymbolData(contextId, 'ob', symbol, data)
+        self.emit('ob', symbol, self._viewOrderBook(data['ob'], data['limit']))
+
+    def _websocket_resync_ob(self, contextId, symbol):
+        [currencyBase, currencyQuote] = symbol.split('/')
+        self.websocketSendJson({
+            'e': 'order-book-unsubscribe',
+            'data': {
+                'pair': [currencyBase, currencyQuote],
+            },
+            'oid': str(self._websocketNonce()),
+        }, contextId)
+        self.websocketSendJson({
+            'e': 'order-book-subscribe',
+            'data': {
+                'pair': [currencyBase, currencyQuote],
+                'subscribe': True,
+                'depth': 0,
+            },
+            'oid': str(self._websocketNonce()),
+        }, contextId)
 
     def _websocket_auth_payload(self):
         timestamp = int(math.floor(self.milliseconds()) / 1000)
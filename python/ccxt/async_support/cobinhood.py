@@ -4,7 +4,6 @@
 # https://github.com/ccxt/ccxt/blob/master/CONTRIBUTING.md#how-to-contribute-code
 
 from ccxt.async_support.base.exchange import Exchange
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import PermissionDenied
 from ccxt.base.errors import InsufficientFunds
@@ -835,7 +834,7 @@ class cobinhood (Exchange):
         return self.milliseconds()
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         # console.log(msg)
         h = self.safe_value(msg, 'h', ['', '', ''])
         channel = h[0]
@@ -929,11 +928,11 @@ class cobinhood (Exchange):
             'bids': [],
             'asks': [],
         })
-        ob = self.parse_order_book(d, None, 'bids', 'asks', 0, 2)
+        ob = self.order_book(self.parse_order_book(d, None, 'bids', 'asks', 0, 2))
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
         symbolData['ob'] = ob
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
-        self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
 
     def _websocket_handle_order_book_update(self, contextId, symbol, msg):
         d = self.safe_value(msg, 'd', {
@@ -944,7 +943,7 @@ class cobinhood (Exchange):
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
         symbolData['ob'] = self.mergeOrderBookDeltaDiff(symbolData['ob'], delta)
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
-        self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
 
     def _websocket_handle_ticker(self, contextId, symbol, msg):
         d = self.safe_value(msg, 'd')
@@ -4,7 +4,6 @@
 # https://github.com/ccxt/ccxt/blob/master/CONTRIBUTING.md#how-to-contribute-code
 
 from ccxt.async_support.base.exchange import Exchange
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import NotSupported
 
@@ -326,7 +325,7 @@ class coincheck (Exchange):
         raise ExchangeError(self.id + ' ' + self.json(response))
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         id = self.safe_integer({
             'a': msg[0],
         }, 'a')
@@ -340,12 +339,12 @@ class coincheck (Exchange):
         # just testing
         data = self._contextGetSymbolData(contextId, 'ob', symbol)
         if not('ob' in list(data.keys())):
-            ob = self.parse_order_book(ob, None)
+            ob = self.order_book(self.parse_order_book(ob, None))
             data['ob'] = ob
-            self.emit('ob', symbol, self._cloneOrderBook(ob, data['limit']))
+            self.emit('ob', symbol, self._viewOrderBook(ob, data['limit']))
         else:
             data['ob'] = self.mergeOrderBookDelta(data['ob'], ob, None)
-            self.emit('ob', symbol, self._cloneOrderBook(data['ob'], data['limit']))
+            self.emit('ob', symbol, self._viewOrderBook(data['ob'], data['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, data)
 
     def _websocket_subscribe(self, contextId, event, symbol, nonce, params={}):
@@ -13,7 +13,6 @@ except NameError:
     basestring = str  # Python 2
 import hashlib
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import AuthenticationError
 from ccxt.base.errors import NotSupported
@@ -422,7 +421,7 @@ class exx (Exchange):
                         raise ExchangeError(feedback)
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         print(msg)
 
     def _websocket_subscribe(self, contextId, event, symbol, nonce, params={}):
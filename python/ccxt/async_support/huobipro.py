@@ -13,7 +13,6 @@ except NameError:
     basestring = str  # Python 2
 import hashlib
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import AuthenticationError
 from ccxt.base.errors import InsufficientFunds
@@ -170,6 +169,8 @@ class huobipro (Exchange):
                     'default': {
                         'type': 'ws',
                         'baseurl': 'wss://api.huobi.pro/ws',
+                        # every frame is gzipped
+                        'decompress': 'gunzip',
                     },
                 },
                 'events': {
@@ -937,12 +938,8 @@ class huobipro (Exchange):
                     raise ExchangeError(feedback)
 
     def _websocket_on_message(self, contextId, data):
-        # TODO: pako function in Exchange.js/.py/.php
-        # console.log(data)
-        text = self.gunzip(data)
-        # text = pako.inflate(data, {'to': 'string',})
-        # print(text)
-        msg = json.loads(text)
+        # frames arrive gunzipped by the decompression stage of the connection
+        msg = self.websocketParseJson(data)
         ping = self.safe_value(msg, 'ping')
         tick = self.safe_value(msg, 'tick')
         if ping is not None:
@@ -992,7 +989,7 @@ class huobipro (Exchange):
             symbolData['ob'] = ob
             self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
             # note, huobipro limit != depth
-            self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
+            self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
         elif channel == 'trade':
             # data:
             # {'ch': 'market.btchusd.trade.detail', 'ts': 1551962828309, 'tick': {'id': 100123237799, 'ts': 1551962828291, 'data': [{'amount': 0.435, 'ts': 1551962828291, 'id': 10012323779926186502443, 'price': 3871.72, 'direction': 'sell'}]}}
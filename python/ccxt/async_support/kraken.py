@@ -14,7 +14,6 @@ except NameError:
 import base64
 import hashlib
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import AuthenticationError
 from ccxt.base.errors import ArgumentsRequired
@@ -242,9 +241,6 @@ class kraken (Exchange):
                         'sandboxurl': 'wss://ws-sandbox.kraken.com',
                     },
                 },
-                'methodmap': {
-                    '_websocketTimeoutRemoveNonce': '_websocketTimeoutRemoveNonce',
-                },
                 'events': {
                     'ob': {
                         'conx-tpl': 'default',
@@ -1165,7 +1161,7 @@ class kraken (Exchange):
         return None
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         event = self.safe_string(msg, 'event')
         status = self.safe_string(msg, 'status')
         if event is None:
@@ -1201,7 +1197,7 @@ class kraken (Exchange):
                 errorMsg = self.safe_string(msg, 'errorMessage')
                 ex = ExchangeError(self.id + ' ' + errorMsg)
                 if symbol is not None:
-                    self._websocket_process_pending_nonces(contextId, 'sub-nonces', 'ob', symbol, False, ex)
+                    self._websocketAcknowledgeAll(contextId, 'subscribe', 'ob', symbol, False, ex)
             else:
                 self.emit('err', ExchangeError(self.id + ' not valid status received ' + status), contextId)
         elif status == 'error':
@@ -1223,15 +1219,15 @@ class kraken (Exchange):
         self._contextSet(contextId, 'channels', channels)
         symbolData = self._contextGetSymbolData(contextId, event, symbol)
         symbolData['channelId'] = channel
-        symbolData['ob'] = {
+        symbolData['ob'] = self.order_book({
             'bids': [],
             'asks': [],
             'timestamp': None,
             'datetime': None,
             'nonce': None,
-        }
+        })
         self._contextSetSymbolData(contextId, event, symbol, symbolData)
-        self._websocket_process_pending_nonces(contextId, 'sub-nonces', 'ob', symbol, True, None)
+        self._websocketAcknowledgeAll(contextId, 'subscribe', 'ob', symbol, True, None)
 
     def _websocket_handle_unsubscription(self, contextId, msg):
         chanId = self.safe_integer(msg, 'channelID')
@@ -1245,7 +1241,7 @@ class kraken (Exchange):
         # remove channel ids ?
         self.omit(channels, chanKey)
         self._contextSet(contextId, 'channels', channels)
-        self._websocket_process_pending_nonces(contextId, 'unsub-nonces', event, symbol, True, None)
+        self._websocketAcknowledgeAll(contextId, 'unsubscribe', event, symbol, True, None)
 
     def _websocket_handle_order_book(self, contextId, symbol, data):
         bids = self.safe_value(data, 'bs')
@@ -1253,41 +1249,24 @@ class kraken (Exchange):
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
         if (bids is not None) and(asks is not None):
             # snapshot
-            ob = self.parse_order_book(data, None, 'bs', 'as')
+            ob = self.order_book(self.parse_order_book(data, None, 'bs', 'as'))
             symbolData['ob'] = ob
         else:
             symbolData['ob'] = self.mergeOrderBookDelta(symbolData['ob'], data, None, 'b', 'a')
-        self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
-    def _websocket_process_pending_nonces(self, contextId, nonceKey, event, symbol, success, ex):
-        symbolData = self._contextGetSymbolData(contextId, event, symbol)
-        if nonceKey in symbolData:
-            nonces = symbolData[nonceKey]
-            keys = list(nonces.keys())
-            for i in range(0, len(keys)):
-                nonce = keys[i]
-                self._cancelTimeout(nonces[nonce])
-                self.emit(nonce, success, ex)
-            symbolData[nonceKey] = {}
-            self._contextSetSymbolData(contextId, event, symbol, symbolData)
-
     def _websocket_subscribe(self, contextId, event, symbol, nonce, params={}):
         if event != 'ob':
             raise NotSupported('subscribe ' + event + '(' + symbol + ') not supported for exchange ' + self.id)
-        # save nonce for subscription response
+        # the ack settles the pending request of this symbol, see _websocketAcknowledgeAll
         symbolData = self._contextGetSymbolData(contextId, event, symbol)
-        if not('sub-nonces' in list(symbolData.keys())):
-            symbolData['sub-nonces'] = {}
         depthValidValues = [10, 25, 100, 500, 1000]
         depth = self.safe_integer(params, 'depth', 1000)
         if not self.in_array(depth, depthValidValues):
             raise ExchangeError(self.id + 'Not valid "depth" value(' + str(depthValidValues) + ')')
         symbolData['limit'] = self.safe_integer(params, 'limit', None)
         symbolData['depth'] = depth
-        nonceStr = str(nonce)
-        handle = self._setTimeout(contextId, self.timeout, self._websocketMethodMap('_websocketTimeoutRemoveNonce'), [contextId, nonceStr, event, symbol, 'sub-nonce'])
-        symbolData['sub-nonces'][nonceStr] = handle
         self._contextSetSymbolData(contextId, event, symbol, symbolData)
         # send request
         self.websocketSendJson({
@@ -1307,22 +1286,8 @@ class kraken (Exchange):
             'event': 'unsubscribe',
             'channelID': symbolData['channelId'],
         }
-        if not('unsub-nonces' in list(symbolData.keys())):
-            symbolData['unsub-nonces'] = {}
-        nonceStr = str(nonce)
-        handle = self._setTimeout(contextId, self.timeout, self._websocketMethodMap('_websocketTimeoutRemoveNonce'), [contextId, nonceStr, event, symbol, 'unsub-nonces'])
-        symbolData['unsub-nonces'][nonceStr] = handle
-        self._contextSetSymbolData(contextId, event, symbol, symbolData)
         self.websocketSendJson(payload)
 
-    def _websocket_timeout_remove_nonce(self, contextId, timerNonce, event, symbol, key):
-        symbolData = self._contextGetSymbolData(contextId, event, symbol)
-        if key in symbolData:
-            nonces = symbolData[key]
-            if timerNonce in nonces:
-                self.omit(symbolData[key], timerNonce)
-                self._contextSetSymbolData(contextId, event, symbol, symbolData)
-
     def _get_current_websocket_orderbook(self, contextId, symbol, limit):
         data = self._contextGetSymbolData(contextId, 'ob', symbol)
         if ('ob' in list(data.keys())) and(data['ob'] is not None):
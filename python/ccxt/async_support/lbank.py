@@ -5,7 +5,6 @@
 
 from ccxt.async_support.base.exchange import Exchange
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import AuthenticationError
 from ccxt.base.errors import InvalidOrder
@@ -551,7 +550,7 @@ class lbank (Exchange):
         return response
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         success = self.safe_string(msg, 'success')
         channel = self.safe_string(msg, 'channel')
         if success is not None:
@@ -601,7 +600,7 @@ class lbank (Exchange):
         data = self._contextGetSymbolData(contextId, 'ob', symbol)
         data['ob'] = ob
         self._contextSetSymbolData(contextId, 'ob', symbol, data)
-        self.emit('ob', symbol, self._cloneOrderBook(ob, data['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(ob, data['limit']))
 
     def _websocket_subscribe(self, contextId, event, symbol, nonce, params={}):
         if event != 'ob':
@@ -6,7 +6,6 @@
 from ccxt.async_support.base.exchange import Exchange
 import hashlib
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import AuthenticationError
 from ccxt.base.errors import PermissionDenied
@@ -126,6 +125,9 @@ class poloniex (Exchange):
                         'baseurl': 'wss://api2.poloniex.com',
                     },
                 },
+                'methodmap': {
+                    '_websocketHandleObRestSnapshot': '_websocketHandleObRestSnapshot',
+                },
                 'events': {
                     'ob': {
                         'conx-tpl': 'default',
@@ -188,6 +190,8 @@ class poloniex (Exchange):
                 'XAP': 'API Coin',
             },
             'options': {
+                # the deepest book returnOrderBook serves
+                'snapshotDepth': 100,
                 'limits': {
                     'cost': {
                         'min': {
@@ -1092,7 +1096,7 @@ class poloniex (Exchange):
         self._contextSet(contextId, 'symbolids', symbolIds)
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         channelId = msg[0]
         if channelId == 1000:
             # account notification(beta)
@@ -1104,7 +1108,8 @@ class poloniex (Exchange):
             # 24 hour exchange volume
             print('24 hour exchange volume')
         elif channelId == 1010:
-            print(self.id + '._websocketOnMessage() heartbeat ' + data)
+            # heartbeat, nothing to do
+            pass
         else:
             # if channelId is not one of the above, check if it is a marketId
             symbolsIds = self._contextGet(contextId, 'symbolids')
@@ -1149,7 +1154,6 @@ class poloniex (Exchange):
             if orderbook[0][0] == 'i':
                 if not self._contextIsSubscribed(contextId, 'ob', symbol):
                     return
-                symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
                 # currencyPair = orderbook[0][1]['currencyPair']
                 fullOrderbook = orderbook[0][1]['orderBook']
                 asks = []
@@ -1168,14 +1172,9 @@ class poloniex (Exchange):
                     'isFrozen': 0,
                     'seq': sequenceNumber,
                 }
-                # I decided not to push the initial orderbook to cache.
-                # This way is less consistent but I think it's easier.
-                fullOrderbook = self.parse_order_book(fullOrderbook)
-                fullOrderbook = self._cloneOrderBook(fullOrderbook, symbolData['limit'])
-                fullOrderbook['obLastSequenceNumber'] = sequenceNumber
-                symbolData['ob'] = fullOrderbook
-                self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
-                self.emit('ob', symbol, symbolData['ob'])
+                fullOrderbook = self.order_book(self.parse_order_book(fullOrderbook))
+                fullOrderbook['nonce'] = sequenceNumber
+                self._websocket_apply_ob_snapshot(contextId, symbol, fullOrderbook)
             else:
                 order = None
                 orderbookDelta = {
@@ -1217,68 +1216,70 @@ class poloniex (Exchange):
                         return
                 if not self._contextIsSubscribed(contextId, 'ob', symbol):
                     return
-                # Add to cache
+                # deltas may arrive out of order, a missing sequence number
+                # resyncs the book of this symbol from a rest snapshot
                 orderbookDelta = self.parse_order_book(orderbookDelta)
                 symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
-                if (symbolData['obDeltaCache']) is None:
-                    # This check is necessary because the obDeltaCache will be deleted on a call to fetchOrderBook()
-                    symbolData['obDeltaCache'] = {}  # make empty cache
-                    symbolData['obDeltaCacheSize'] = 0  # counting number of cached deltas
-                symbolData['obDeltaCacheSize'] += 1
-                sequenceNumberStr = str(sequenceNumber)
-                symbolData['obDeltaCache'][sequenceNumberStr] = orderbookDelta
-                # Schedule call to _websocketOrderBookDeltaCache()
-                self._websocket_handle_ob_delta_cache(contextId, symbol)
-                self.emit('ob', symbol, symbolData['ob'])
+                sync = self._websocketOrderBookSync(symbol, symbolData['obDeltaCacheSizeMax'])
+                deltas = sync.push(sequenceNumber, sequenceNumber, orderbookDelta)
+                if deltas is None:
+                    del symbolData['ob']
+                    self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+                    self._websocket_fetch_ob_snapshot(contextId, symbol)
+                    return
+                if len(deltas) == 0:
+                    return
+                for i in range(0, len(deltas)):
+                    symbolData['ob'] = self.mergeOrderBookDelta(symbolData['ob'], deltas[i])
+                self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+                self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
 
-    def _websocket_handle_ob_delta_cache(self, contextId, symbol):
+    def _websocket_apply_ob_snapshot(self, contextId, symbol, ob):
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
-        # Handle out-of-order sequenceNumber
-        # To avoid a memory leak, we must put a maximum on the size of obDeltaCache.
-        # When self maximum is reached, we accept that we have lost some orderbook updates.
-        # In self case we must fetch a new orderbook.
-        # Alternatively, we could apply all cached deltas and keep going.
-        if symbolData['obDeltaCacheSize'] > symbolData['obDeltaCacheSizeMax']:
-            symbolData['ob'] = self.fetch_order_book(symbol, symbolData['limit'])
-            # del symbolData['obDeltaCache']
-            symbolData['obDeltaCache'] = None
-            symbolData['obDeltaCacheSize'] = 0
-            self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+        sync = self._websocketOrderBookSync(symbol, symbolData['obDeltaCacheSizeMax'])
+        deltas = sync.align(ob['nonce'])
+        if deltas is None:
+            # the snapshot is older than the buffered deltas, a newer one is fetched
+            if 'ob' in symbolData:
+                del symbolData['ob']
+                self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+            self._websocket_fetch_ob_snapshot(contextId, symbol)
             return
-        if symbolData['obDeltaCacheSize'] == 0:
+        for i in range(0, len(deltas)):
+            ob = self.mergeOrderBookDelta(ob, deltas[i])
+        symbolData['ob'] = ob
+        self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
+
+    def _websocket_fetch_ob_snapshot(self, contextId, symbol):
+        symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
+        if not self.safe_value(symbolData, 'snaplaunched', False):
+            symbolData['snaplaunched'] = True
             self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+            # as deep as possible, later deltas cannot repair a truncated book,
+            # it is cut to the limit when emitted
+            self._websocketFetchSnapshot(contextId, symbol, self.safe_integer(self.options, 'snapshotDepth'), True, self._websocketMethodMap('_websocketHandleObRestSnapshot'), {
+                'symbol': symbol,
+                'contextId': contextId,
+            })
+
+    def _websocket_handle_ob_rest_snapshot(self, context, error, response):
+        symbol = context['symbol']
+        contextId = context['contextId']
+        if not self._contextIsSubscribed(contextId, 'ob', symbol):
             return
-        # if the cache exists
-        # check if the next sequenceNumber is in the cache
-        fullOrderbook = symbolData['ob']
-        lastSequenceNumber = fullOrderbook['obLastSequenceNumber']
-        cachedSequenceNumber = lastSequenceNumber + 1
-        cachedSequenceNumberStr = str(cachedSequenceNumber)
-        orderbookDelta = symbolData['obDeltaCache'][cachedSequenceNumberStr]
-        continueBool = orderbookDelta is not None
-        # While loop is not transpiled properly
-        # while(continueBool) {
-        nkeys = symbolData['obDeltaCacheSize']
-        i = 0
-        for i in range(0, nkeys):
-            if not continueBool:
-                break
-            symbolData['obDeltaCache'][cachedSequenceNumberStr] = None
-            fullOrderbook = self.mergeOrderBookDelta(symbolData['ob'], orderbookDelta)
-            fullOrderbook = self._cloneOrderBook(fullOrderbook, symbolData['limit'])
-            fullOrderbook['obLastSequenceNumber'] = cachedSequenceNumber
-            symbolData['ob'] = fullOrderbook
-            cachedSequenceNumber += 1
-            orderbookDelta = symbolData['obDeltaCache'][cachedSequenceNumberStr]
-            continueBool = orderbookDelta is not None
-            symbolData['obDeltaCacheSize'] -= 1
+        symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
+        symbolData['snaplaunched'] = False
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+        if error:
+            self.emit('err', ExchangeError(self.id + ': order book snapshot failed for ' + symbol + ': ' + str(error)), contextId)
+            return
+        self._websocket_apply_ob_snapshot(contextId, symbol, self.order_book(response))
 
     def _websocket_subscribe_ob(self, contextId, event, symbol, nonce, params={}):
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
         symbolData['limit'] = self.safe_integer(params, 'limit', None)
-        symbolData['obDeltaCache'] = None
-        symbolData['obDeltaCacheSize'] = 0
+        # how many later deltas a missing one may be late by
         symbolData['obDeltaCacheSizeMax'] = self.safe_integer(params, 'obDeltaCacheSizeMax', 10)
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
         # get symbol id2
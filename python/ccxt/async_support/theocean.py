@@ -1226,7 +1226,7 @@ class theocean (Exchange):
         return response
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         evtData = msg[1]
         type = self.safe_string(evtData, 'type')
         channel = self.safe_string(evtData, 'channel')
@@ -1254,9 +1254,9 @@ class theocean (Exchange):
         payload = self.safe_value(msg, 'payload')
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
         market = self.market(symbol)
-        ob = self.parse_order_book(payload, None, 'bids', 'asks', 'price', 'availableAmount', market)
+        ob = self.order_book(self.parse_order_book(payload, None, 'bids', 'asks', 'price', 'availableAmount', market))
         symbolData['ob'] = ob
-        self.emit('ob', symbol, self._cloneOrderBook(ob, symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(ob, symbolData['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
     def _websocket_handle_ob_update(self, contextId, msg):
@@ -1275,7 +1275,7 @@ class theocean (Exchange):
         for i in range(0, len(obUpdate['asks'])):
             self.updateBidAsk(obUpdate['asks'][i], ob['asks'], False)
         symbolData['ob'] = ob
-        self.emit('ob', symbol, self._cloneOrderBook(ob, symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(ob, symbolData['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
     def _websocket_handle_subscription(self, contextId, event, symbol):
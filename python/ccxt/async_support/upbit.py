@@ -5,7 +5,6 @@
 
 from ccxt.async_support.base.exchange import Exchange
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import AuthenticationError
 from ccxt.base.errors import PermissionDenied
@@ -1459,7 +1458,7 @@ class upbit (Exchange):
             raise ExchangeError(feedback)  # unknown message
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         # console.log(msg)
         type = self.safe_string(msg, 'type')
         code = self.safe_string(msg, 'code')
@@ -1478,13 +1477,13 @@ class upbit (Exchange):
     def _websocket_handle_order_book(self, contextId, symbol, msg):
         obUnits = self.safe_value(msg, 'orderbook_units', [])
         timestamp = self.safe_float(msg, 'timestamp')
-        ob = {
+        ob = self.order_book({
             'bids': [],
             'asks': [],
             'timestamp': timestamp,
             'datetime': self.iso8601(timestamp),
             'nonce': None,
-        }
+        })
         for i in range(0, len(obUnits)):
             obUnit = obUnits[i]
             bidPrice = self.safe_float(obUnit, 'bid_price')
@@ -1496,7 +1495,7 @@ class upbit (Exchange):
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
         symbolData['ob'] = ob
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
-        self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
 
     def _websocket_handle_ticker(self, contextId, symbol, msg):
         #  {"type":"ticker","code":"BTC-ETH","opening_price":0.02601664,"high_price":0.02615611,"low_price":0.02587020,"trade_price":0.02599133,"prev_closing_price":0.02602994,"acc_trade_price":142.52289604,"change":"FALL","change_price":0.00003861,"signed_change_price":-0.00003861,"change_rate":0.0014832919,"signed_change_rate":-0.0014832919,"ask_bid":"ASK","trade_volume":39.09714085,"acc_trade_volume":5470.69961159,"trade_date":"20181215","trade_time":"153346","trade_timestamp":1544888026830,"acc_ask_volume":2350.63591821,"acc_bid_volume":3120.06369338,"highest_52_week_price":0.12345678,"highest_52_week_date":"2018-02-01","lowest_52_week_price":0.02460824,"lowest_52_week_date":"2018-12-07","trade_status":null,"market_state":"ACTIVE","market_state_for_ios":null,"is_trading_suspended":false,"delisting_date":null,"market_warning":"NONE","timestamp":1544888027872,"acc_trade_price_24h":null,"acc_trade_volume_24h":null,"stream_type":"SNAPSHOT"}
@@ -22,37 +22,49 @@ class MyClientProtocol(WebSocketClientProtocol):
         self.is_closing = False
         self.activity_timeout = 120
         self.pong_timeout = 30
-        self._activity_timer = None
+        # seconds between two checks of the activity timestamps
+        self.activity_check_interval = 1
+        self.last_activity = None
+        self.ping_sent = None
+        self._activity_check = None
         self.verbose = verbose
 
     def resetActivityCheck(self):
-        if self._activity_timer is not None:
-            self._activity_timer.cancel()
-
+        # every message only stamps the time, a periodic check on the shared
+        # timer wheel pings after activity_timeout seconds of silence
+        self.last_activity = self.loop.time()
+        self.ping_sent = None
+        if (self._activity_check is None) and not self.is_closing:
+            self._activity_check = self.event_emitter.getTimers().call_periodic(self.activity_check_interval, self.checkActivity)
+
+    def stopActivityCheck(self):
+        if self._activity_check is not None:
+            self._activity_check.cancel()
+            self._activity_check = None
+
+    def checkActivity(self):
         if self.is_closing:
+            self.stopActivityCheck()
             return
-
-        def do_ping():
+        now = self.loop.time()
+        if self.ping_sent is not None:
+            if now - self.ping_sent >= self.pong_timeout:
+                # no message at all since the ping
+                self.stopActivityCheck()
+                self.event_emitter.emit('err', 'pong not received from server')
+                self._closeConnection(True)
+        elif now - self.last_activity >= self.activity_timeout:
+            if self.verbose:
+                print("PusherLightConnection: ping sent")
+                sys.stdout.flush()
+            self.ping_sent = now
             try:
-                if not self.is_closing:
-                    if self.verbose:
-                        print("PusherLightConnection: ping sent")
-                        sys.stdout.flush()
-                    self.sendMessage(json.dumps({
-                        'event': 'pusher:ping',
-                        'data': {}
-                    }).encode('utf8'))
-
-                # Wait for pong response
-                def wait4pong():
-                    if not self.is_closing:
-                        self.event_emitter.emit('err', 'pong not received from server')
-                        self._closeConnection(True)
-
-                self._activity_timer = self.loop.call_later(self.pong_timeout, wait4pong)
+                self.sendMessage(json.dumps({
+                    'event': 'pusher:ping',
+                    'data': {}
+                }).encode('utf8'))
             except Exception as ex:
                 pass
-        self._activity_timer = self.loop.call_later(self.activity_timeout, do_ping)
 
     def onConnect(self, response):
         pass
@@ -62,6 +74,9 @@ class MyClientProtocol(WebSocketClientProtocol):
         pass
 
     async def onMessage(self, payload, isBinary):
+        monitor = self.event_emitter.monitor
+        if monitor is not None:
+            monitor.frame_received()
         if self.verbose:
             print("PusherLightConnection: ")
             print(payload)
@@ -69,41 +84,45 @@ class MyClientProtocol(WebSocketClientProtocol):
         if self.is_closing:
             return
         self.resetActivityCheck()
-        if isBinary:
-            msg = json.loads(payload)
-        else:
-            msg = json.loads(payload.decode('utf8'))
+        codec = self.event_emitter.codec
+        msg = codec.loads(payload)
         if msg['event'] == 'pusher:connection_established':
             # starting
-            event_data = json.loads(msg['data'])
+            event_data = self.parseData(msg['data'])
             if 'activity_timeout' in event_data:
                 self.activity_timeout = event_data['activity_timeout']
             self.future.done() or self.future.set_result(None)
         elif msg['event'] == 'pusher:ping':
-            self.sendMessage(json.dumps({
+            self.sendMessage(codec.dumps({
                 'event': 'pusher:pong',
                 'data': {}
             }).encode('utf8'))
         elif msg['event'] == 'pusher_internal:subscription_succeeded':
             channel = msg['channel']
-            self.event_emitter.emit('message', json.dumps({
+            self.event_emitter.emit('message', {
                 'event': 'subscription_succeeded',
                 'channel': channel
-            }))
+            })
         elif msg['event'] == 'pusher:error':
             # {"event":"pusher:error","data":{"code":null,"message":"Unsupported event received on socket: subscribe"}
             self.event_emitter.emit('err', msg['data']['message'])
         else:
-            event_data = json.loads(msg['data'])
-            channel = msg['channel']
-            self.event_emitter.emit('message', json.dumps({
+            # the exchange gets the parsed message itself, not a json string
+            self.event_emitter.emit('message', {
                 'event': msg['event'],
-                'channel': channel,
-                'data': event_data
-            }))
+                'channel': msg['channel'],
+                'data': self.parseData(msg['data'])
+            })
+
+    def parseData(self, data):
+        # pusher sends event data as a json string inside the json frame
+        if isinstance(data, str):
+            return self.event_emitter.codec.loads(data)
+        return data
 
     def onClose(self, wasClean, code, reason):
         self.future.done() or self.future.set_exception(Exception(reason))
+        self.stopActivityCheck()
         if self.is_closing:
             return
         if wasClean:
@@ -149,7 +168,7 @@ class PusherLightConnection(WebsocketBaseConnection):
                 factory.protocol = lambda: client
 
                 fut = self.loop.create_connection(factory, url_parsed.hostname, port, ssl=ssl)
-                self.loop.call_later(self.timeout / 1000, lambda: future.done() or future.set_exception(TimeoutError()))
+                self.timeoutFuture(future)
                 await fut
                 # self.loop.run_until_complete(fut)
                 self.client = client
@@ -165,21 +184,25 @@ class PusherLightConnection(WebsocketBaseConnection):
     def close(self):
         if self.client is not None:
             self.client.is_closing = True
-            self.client._closeConnection(True)
+            # the transport is gone once the server dropped the connection
+            if self.client.transport is not None:
+                self.client._closeConnection(True)
             self.client = None
 
     def send(self, data):
+        self.sendJson(self.codec.loads(data))
+
+    def sendJson(self, json_data):
         if self.client is not None:
-            json_data = json.loads(data)
             if json_data['event'] == 'subscribe':
-                self.client.sendMessage(json.dumps({
+                self.client.sendMessage(self.codec.dumps({
                     'event': 'pusher:subscribe',
                     'data': {
                         'channel': json_data['channel']
                     }
                 }).encode('utf8'))
             elif json_data['event'] == 'unsubscribe':
-                self.client.sendMessage(json.dumps({
+                self.client.sendMessage(self.codec.dumps({
                     'event': 'pusher:unsubscribe',
                     'data': {
                         'channel': json_data['channel']
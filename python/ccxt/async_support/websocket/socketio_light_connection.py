@@ -5,7 +5,6 @@ from autobahn.asyncio.websocket import WebSocketClientProtocol, \
     WebSocketClientFactory
 import asyncio
 from urllib.parse import urlparse
-import json
 import sys
 
 
@@ -15,8 +14,8 @@ class MyClientProtocol(WebSocketClientProtocol):
         self.event_emitter = event_emitter  # type: pyee.EventEmitter
         self.future = future  # type: asyncio.Future
         self.is_closing = False
-        self.ping_interval_ms: 25000
-        self.ping_timeout_ms: 5000
+        self.ping_interval_ms = 25000
+        self.ping_timeout_ms = 5000
         self.ping_interval = None
         self.ping_timeout = None
         self.loop = loop
@@ -24,6 +23,7 @@ class MyClientProtocol(WebSocketClientProtocol):
 
     def createPingProcess(self):
         self.destroyPingProcess()
+        timers = self.event_emitter.getTimers()
 
         def wait4pong():
             if not self.is_closing:
@@ -31,7 +31,6 @@ class MyClientProtocol(WebSocketClientProtocol):
                 self._closeConnection(True)
 
         def do_ping():
-            self.ping_interval = self.loop.call_later(self.ping_interval_ms / 1000, do_ping)
             try:
                 if not self.is_closing:
                     if self.verbose:
@@ -41,13 +40,13 @@ class MyClientProtocol(WebSocketClientProtocol):
                     self.sendMessage('2'.encode('utf8'))
                     # print("ping sent")
                     # sys.stdout.flush()
-                    self.ping_timeout = self.loop.call_later(self.ping_timeout_ms / 1000, wait4pong)
+                    self.ping_timeout = timers.call_later(self.ping_timeout_ms / 1000, wait4pong)
                 else:
                     self.destroyPingProcess()
             except Exception as ex:
                 pass
 
-        self.ping_interval = self.loop.call_later(self.ping_interval_ms / 1000, do_ping)
+        self.ping_interval = timers.call_periodic(self.ping_interval_ms / 1000, do_ping)
 
     def destroyPingProcess(self):
         if self.ping_interval is not None:
@@ -69,6 +68,9 @@ class MyClientProtocol(WebSocketClientProtocol):
         pass
 
     def onMessage(self, payload, isBinary):
+        monitor = self.event_emitter.monitor
+        if monitor is not None:
+            monitor.frame_received()
         if self.verbose:
             print("PusherLightConnection: ")
             print(payload)
@@ -81,7 +83,7 @@ class MyClientProtocol(WebSocketClientProtocol):
         # print(payload)
         # sys.stdout.flush()
         if data[0] == '0':
-            msg = json.loads(data[1:])
+            msg = self.event_emitter.codec.loads(data[1:])
             if 'pingInterval' in msg:
                 self.ping_interval_ms = msg['pingInterval']
             if 'pingTimeout' in msg:
@@ -104,6 +106,7 @@ class MyClientProtocol(WebSocketClientProtocol):
 
     def onClose(self, wasClean, code, reason):
         self.future.done() or self.future.set_exception(Exception(reason))
+        self.destroyPingProcess()
         if self.is_closing:
             return
         if wasClean:
@@ -148,7 +151,7 @@ class SocketIoLightConnection(WebsocketBaseConnection):
                 factory.protocol = lambda: client
 
                 fut = self.loop.create_connection(factory, url_parsed.hostname, port, ssl=ssl)
-                self.loop.call_later(self.timeout / 1000, lambda: future.done() or future.set_exception(TimeoutError()))
+                self.timeoutFuture(future)
                 await fut
                 # self.loop.run_until_complete(fut)
                 self.client = client
@@ -164,7 +167,9 @@ class SocketIoLightConnection(WebsocketBaseConnection):
     def close(self):
         if self.client is not None:
             self.client.is_closing = True
-            self.client._closeConnection(True)
+            # the transport is gone once the server dropped the connection
+            if self.client.transport is not None:
+                self.client._closeConnection(True)
             self.client = None
 
     def send(self, data):
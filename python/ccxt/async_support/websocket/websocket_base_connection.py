@@ -8,12 +8,20 @@ __all__ = [
 
 from pyee import EventEmitter
 from abc import ABC, abstractmethod
-import json
+from ccxt.base.json_codec import JsonCodec
+from ccxt.async_support.base.timer_wheel import TimerWheel
 
 
 class WebsocketBaseConnection (ABC, EventEmitter):
     def __init__(self):
         super(WebsocketBaseConnection, self).__init__()
+        # LatencyTracker notified of every received frame, if any
+        self.monitor = None
+        self.codec = JsonCodec()
+        # emit text frames as the utf-8 bytes received instead of str
+        self.raw_text = False
+        # TimerWheel shared with the other connections of the exchange
+        self.timers = None
 
     @abstractmethod
     def connect(self):
@@ -27,5 +35,25 @@ class WebsocketBaseConnection (ABC, EventEmitter):
     def send(self, data):
         pass
 
+    def getTimers(self):
+        if self.timers is None:
+            self.timers = TimerWheel(self.loop)
+        return self.timers
+
+    def timeoutFuture(self, future):
+        """Fail future with a TimeoutError unless it is done within self.timeout ms"""
+        handle = self.getTimers().call_later(self.timeout / 1000, lambda: future.done() or future.set_exception(TimeoutError()))
+        future.add_done_callback(lambda f: handle.cancel())
+
     def sendJson(self, data):
-        self.send(json.dumps(data))
+        self.send(self.codec.dumps(data))
+
+    def pauseReading(self):
+        client = getattr(self, 'client', None)
+        if (client is not None) and (client.transport is not None):
+            client.transport.pause_reading()
+
+    def resumeReading(self):
+        client = getattr(self, 'client', None)
+        if (client is not None) and (client.transport is not None):
+            client.transport.resume_reading()
@@ -24,13 +24,16 @@ class MyClientProtocol(WebSocketClientProtocol):
         self.future.done() or self.future.set_result(None)
 
     def onMessage(self, payload, isBinary):
+        monitor = self.event_emitter.monitor
+        if monitor is not None:
+            monitor.frame_received()
         if self.verbose:
             print("WebsocketConnection: ")
             print(payload)
             sys.stdout.flush
         if self.is_closing:
             return
-        if isBinary:
+        if isBinary or self.event_emitter.raw_text:
             self.event_emitter.emit('message', payload)
         else:
             self.event_emitter.emit('message', payload.decode('utf8'))
@@ -88,7 +91,7 @@ class WebsocketConnection(WebsocketBaseConnection):
                 factory.protocol = lambda: client
 
                 fut = self.loop.create_connection(factory, url_parsed.hostname, port, ssl=ssl_param)
-                self.loop.call_later(self.timeout / 1000, lambda: future.done() or future.set_exception(TimeoutError()))
+                self.timeoutFuture(future)
                 await fut
                 # self.loop.run_until_complete(fut)
                 self.client = client
@@ -104,7 +107,9 @@ class WebsocketConnection(WebsocketBaseConnection):
     def close(self):
         if self.client is not None:
             self.client.is_closing = True
-            self.client._closeConnection(True)
+            # the transport is gone once the server dropped the connection
+            if self.client.transport is not None:
+                self.client._closeConnection(True)
             self.client = None
 
     def send(self, data):
@@ -22,6 +22,8 @@ from ccxt.base.errors import InvalidAddress
 # -----------------------------------------------------------------------------
 
 from ccxt.base.decimal_to_precision import decimal_to_precision
+from ccxt.base.json_codec import json_codec
+from ccxt.base.rate_limiter import RateLimiter, UnixSocketRateLimiter, shared_rate_limiter, api_costs
 from ccxt.base.decimal_to_precision import DECIMAL_PLACES, TRUNCATE, ROUND
 
 # -----------------------------------------------------------------------------
@@ -106,6 +108,7 @@ class Exchange():
     asyncio_loop = None
     aiohttp_proxy = None
     aiohttp_trust_env = False
+    aiohttp_pool = None  # True or connector settings to share one session with the other exchanges
     session = None  # Session () by default
     logger = None  # logging.getLogger(__name__) by default
     userAgent = None
@@ -240,6 +243,15 @@ class Exchange():
     rateLimitTokens = 16
     rateLimitMaxTokens = 16
     rateLimitUpdateTime = 0
+    rateLimitBuckets = None  # {name: tokenBucket config} charged by the endpoints that name them
+    rateLimiter = None
+    rateLimitCosts = None
+    # None gives every instance its own buckets, 'ip', 'key' or 'account' (uid)
+    # shares them with the instances of the same exchange and the same scope,
+    # 'key' and 'account' fall back to 'ip' without an apiKey or uid
+    rateLimitScope = None
+    # path of the Unix socket of a RateLimitCoordinator to share the buckets across processes
+    rateLimitBackend = None
     enableLastHttpResponse = True
     enableLastJsonResponse = True
     enableLastResponseHeaders = True
@@ -250,6 +262,10 @@ class Exchange():
     requiresWeb3 = False
     web3 = None
 
+    # 'orjson', 'ujson', 'rapidjson' or 'json', None picks the fastest installed
+    jsonCodec = None
+    codec = None
+
     commonCurrencies = {
         'XBT': 'BTC',
         'BCC': 'BCH',
@@ -325,6 +341,12 @@ class Exchange():
             'capacity': 1.0,
             'defaultCost': 1.0,
         }, getattr(self, 'tokenBucket') if hasattr(self, 'tokenBucket') else {})
+        self.init_rest_rate_limiter()
+
+        try:
+            self.codec = json_codec(self.jsonCodec)
+        except ImportError as e:
+            raise NotSupported(self.id + ' ' + str(e))
 
         self.session = self.session if self.session else Session()
         self.logger = self.logger if self.logger else logging.getLogger(__name__)
@@ -402,17 +424,39 @@ class Exchange():
         output = ' '.join([self.id] + [var for var in (url, method, error, details) if var is not None])
         raise exception_type(output)
 
-    def throttle(self):
-        now = float(self.milliseconds())
-        elapsed = now - self.lastRestRequestTimestamp
-        if elapsed < self.rateLimit:
-            delay = self.rateLimit - elapsed
-            time.sleep(delay / 1000.0)
+    def rate_limit_key(self):
+        scope = self.rateLimitScope
+        if scope is None:
+            # a coordinator is only useful to share the per-ip limits at least
+            return [self.id, 'ip'] if self.rateLimitBackend is not None else None
+        if scope not in ('ip', 'key', 'account'):
+            raise NotSupported(self.id + ' unknown rateLimitScope ' + str(scope))
+        # without credentials only the public, per-ip limits apply
+        if (scope == 'key') and self.apiKey:
+            return [self.id, 'key', self.apiKey]
+        if (scope == 'account') and self.uid:
+            return [self.id, 'account', self.uid]
+        return [self.id, 'ip']
+
+    def init_rest_rate_limiter(self):
+        key = self.rate_limit_key()
+        buckets = self.rateLimitBuckets or {}
+        if self.rateLimitBackend is not None:
+            self.rateLimiter = UnixSocketRateLimiter(self.rateLimitBackend, key, self.tokenBucket, buckets)
+        elif key is not None:
+            self.rateLimiter = shared_rate_limiter(key, self.tokenBucket, buckets)
+        else:
+            self.rateLimiter = RateLimiter(self.tokenBucket, buckets)
+        # endpoints defined with a cost: {'get': {'path': cost}} instead of {'get': ['path']}
+        self.rateLimitCosts = api_costs(self.api) if self.api else {}
+
+    def throttle(self, cost=None):
+        self.rateLimiter.sleep(cost)
 
     def fetch2(self, path, api='public', method='GET', params={}, headers=None, body=None):
         """A better wrapper over request for deferred signing"""
         if self.enableRateLimit:
-            self.throttle()
+            self.throttle(self.rateLimitCosts.get((api, method, path)))
         self.lastRestRequestTimestamp = self.milliseconds()
         request = self.sign(path, api, method, params, headers, body)
         return self.fetch(request['url'], request['method'], request['headers'], request['body'])
@@ -549,7 +593,7 @@ class Exchange():
     def parse_json(self, http_response):
         try:
             if Exchange.is_json_encoded_object(http_response):
-                return json.loads(http_response)
+                return self.codec.loads(http_response)
         except ValueError:  # superclass of JsonDecodeError (python2)
             pass
 
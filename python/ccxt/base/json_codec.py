@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""JSON encoders/decoders that can replace the standard json module"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # optional
+
+try:
+    import ujson
+except ImportError:
+    ujson = None  # optional
+
+try:
+    import rapidjson
+except ImportError:
+    rapidjson = None  # optional
+
+__all__ = [
+    'JsonCodec',
+    'json_codec',
+]
+
+
+class JsonCodec(object):
+    """The standard json module.
+
+    loads accepts str as well as utf-8 encoded bytes, so raw websocket
+    payloads can be decoded without converting them to str first. dumps
+    always returns str."""
+
+    name = 'json'
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, data):
+        return json.dumps(data)
+
+
+class OrjsonCodec(JsonCodec):
+
+    name = 'orjson'
+
+    def loads(self, data):
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            # NaN, Infinity and integers over 64 bits are only valid for json
+            return json.loads(data)
+
+    def dumps(self, data):
+        return orjson.dumps(data).decode('utf-8')
+
+
+class UjsonCodec(JsonCodec):
+
+    name = 'ujson'
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+    def dumps(self, data):
+        return ujson.dumps(data, escape_forward_slashes=False)
+
+
+class RapidjsonCodec(JsonCodec):
+
+    name = 'rapidjson'
+
+    def loads(self, data):
+        return rapidjson.loads(data)
+
+    def dumps(self, data):
+        return rapidjson.dumps(data)
+
+
+# fastest first
+codecs = [
+    (OrjsonCodec, orjson),
+    (UjsonCodec, ujson),
+    (RapidjsonCodec, rapidjson),
+    (JsonCodec, json),
+]
+
+
+def json_codec(name=None):
+    """Return the codec called name, or the fastest one installed when name is None"""
+    for codec, module in codecs:
+        if name is None or name == codec.name:
+            if module is not None:
+                return codec()
+            if name is not None:
+                raise ImportError('the ' + name + ' json codec is not installed')
+    raise ImportError('unknown json codec: ' + str(name))
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""Token buckets that compute the exact delay before a request may be sent"""
+
+import json
+import socket
+import time
+
+__all__ = [
+    'TokenBucket',
+    'RateLimiter',
+    'UnixSocketRateLimiter',
+    'shared_rate_limiter',
+    'api_costs',
+]
+
+# time.monotonic is python 3.3+, python 2.7 falls back to the wall clock
+monotonic = getattr(time, 'monotonic', time.time)
+
+
+class TokenBucket(object):
+    """A token bucket where callers reserve their tokens in advance.
+
+    Reserving takes the tokens right away, even if that drives the bucket
+    below zero, and returns how long the caller has to wait until the bucket
+    would have held enough of them. Callers therefore sleep exactly once and
+    are served in the order they reserved, without anybody polling the bucket."""
+
+    def __init__(self, config={}, clock=monotonic):
+        self.refillRate = config.get('refillRate', 0.001)  # tokens per millisecond
+        self.capacity = config.get('capacity', 1.0)
+        self.defaultCost = config.get('defaultCost', 1.0)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.lastTimestamp = clock()
+
+    def refill(self, now):
+        elapsed = now - self.lastTimestamp
+        self.lastTimestamp = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refillRate * 1000)
+
+    def reserve(self, cost=None, now=None):
+        """Take cost tokens, return the delay in seconds before they are available"""
+        now = self.clock() if now is None else now
+        self.refill(now)
+        self.tokens -= self.defaultCost if cost is None else cost
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / (self.refillRate * 1000)
+
+
+class RateLimiter(object):
+    """A set of named token buckets shared by the requests of one exchange.
+
+    The 'default' bucket is configured by Exchange.tokenBucket and paces every
+    request. Other buckets (Exchange.rateLimitBuckets) are only charged by the
+    endpoints whose cost names them. A cost is either a number, charged to the
+    default bucket, or a dict of bucket name to cost, in which case the default
+    bucket is charged its defaultCost unless the dict names it too."""
+
+    def __init__(self, default={}, buckets={}, clock=monotonic):
+        self.clock = clock
+        self.buckets = {'default': TokenBucket(default, clock)}
+        for name in buckets:
+            self.buckets[name] = TokenBucket(buckets[name], clock)
+        self.waiting = 0
+
+    @property
+    def queue_depth(self):
+        """The number of requests that are waiting for their tokens"""
+        return self.waiting
+
+    def reserve(self, cost=None):
+        if not isinstance(cost, dict):
+            return self.buckets['default'].reserve(cost)
+        now = self.clock()
+        delay = self.buckets['default'].reserve(cost.get('default'), now)
+        for name in cost:
+            if name != 'default':
+                delay = max(delay, self.buckets[name].reserve(cost[name], now))
+        return delay
+
+    def sleep(self, cost=None):
+        delay = self.reserve(cost)
+        if delay > 0:
+            self.waiting += 1
+            try:
+                time.sleep(delay)
+            finally:
+                self.waiting -= 1
+
+
+class UnixSocketRateLimiter(RateLimiter):
+    """A RateLimiter whose buckets live in a RateLimitCoordinator process.
+
+    The coordinator listens on a Unix socket and keeps one RateLimiter per key,
+    so every process that connects with the same key draws from the same
+    buckets. The first line sent over the connection names the key and the
+    bucket configs, then every reservation is a cost sent as one line of JSON
+    and answered with the delay. While the coordinator cannot be reached the
+    reservations come from local buckets with the same configs."""
+
+    def __init__(self, path, key, default={}, buckets={}):
+        self.path = path
+        self.key = list(key)
+        self.default = default
+        self.config = buckets
+        self.waiting = 0
+        self.socket = None
+        self.reader = None
+        # the buckets of this process alone while the coordinator is unreachable
+        self.local = RateLimiter(default, buckets)
+
+    def hello(self):
+        return (json.dumps({'key': self.key, 'default': self.default, 'buckets': self.config}) + '\n').encode('utf-8')
+
+    def connect(self):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(self.path)
+        except socket.error:
+            connection.close()
+            raise
+        self.socket = connection
+        self.reader = connection.makefile('rb')
+        self.socket.sendall(self.hello())
+
+    def reserve(self, cost=None):
+        try:
+            if self.socket is None:
+                self.connect()
+            self.socket.sendall((json.dumps(cost) + '\n').encode('utf-8'))
+            line = self.reader.readline()
+            if not line:
+                raise socket.error('rate limit coordinator closed the connection')
+        except socket.error:
+            # e.g. no coordinator listens on path (yet), the next call tries again
+            self.close()
+            return self.local.reserve(cost)
+        return float(line)
+
+    def close(self):
+        if self.socket is not None:
+            self.reader.close()
+            self.socket.close()
+            self.socket = None
+            self.reader = None
+
+
+# RateLimiters shared by the exchange instances of this process
+limiters = {}
+
+
+def shared_rate_limiter(key, default={}, buckets={}):
+    """Return the RateLimiter registered under key, creating it with the given
+    configs the first time. Later configs for the same key are ignored."""
+    key = tuple(key)
+    if key not in limiters:
+        limiters[key] = RateLimiter(default, buckets)
+    return limiters[key]
+
+
+def api_costs(api):
+    """Collect {(api, METHOD, path): cost} from api definitions whose paths are
+    given as a dict of path to cost instead of a list of paths"""
+    result = {}
+    for api_type, methods in api.items():
+        for http_method, urls in methods.items():
+            if isinstance(urls, dict):
+                for url, cost in urls.items():
+                    result[(api_type, http_method.upper(), url.strip())] = cost
+    return result
@@ -13,7 +13,6 @@ except NameError:
     basestring = str  # Python 2
 import hashlib
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import ArgumentsRequired
 from ccxt.base.errors import InsufficientFunds
@@ -596,7 +595,7 @@ class gateio (Exchange):
         return response
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         oid = self.safe_string(msg, 'id')
         method = self.safe_string(msg, 'method')
         if method is None:
@@ -613,17 +612,17 @@ class gateio (Exchange):
         ob = params[1]
         symbol = self.find_symbol(params[2].lower())
         if clean:
-            ob = self.parse_order_book(ob, None)
+            ob = self.order_book(self.parse_order_book(ob, None))
             data = self._contextGetSymbolData(contextId, 'ob', symbol)
             data['ob'] = ob
             self._contextSetSymbolData(contextId, 'ob', symbol, data)
-            self.emit('ob', symbol, self._cloneOrderBook(ob, data['limit']))
+            self.emit('ob', symbol, self._viewOrderBook(ob, data['limit']))
         else:
             data = self._contextGetSymbolData(contextId, 'ob', symbol)
             obMerged = self.mergeOrderBookDelta(data['ob'], ob, None)
             data['ob'] = obMerged
             self._contextSetSymbolData(contextId, 'ob', symbol, data)
-            self.emit('ob', symbol, self._cloneOrderBook(obMerged, data['limit']))
+            self.emit('ob', symbol, self._viewOrderBook(obMerged, data['limit']))
 
     def _websocket_subscribe(self, contextId, event, symbol, nonce, params={}):
         if event != 'ob':
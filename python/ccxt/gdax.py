@@ -6,7 +6,6 @@
 from ccxt.base.exchange import Exchange
 import base64
 import hashlib
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import AuthenticationError
 from ccxt.base.errors import ArgumentsRequired
@@ -699,7 +698,7 @@ class gdax (Exchange):
         return response
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         msgType = self.safe_string(msg, 'type')
         # console.log(msg)
         if msgType == 'subscriptions':
@@ -726,9 +725,9 @@ class gdax (Exchange):
         id = self.safe_string(msg, 'product_id')
         symbol = self.find_symbol(id)
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
-        ob = self.parse_order_book(msg)
+        ob = self.order_book(self.parse_order_book(msg))
         symbolData['ob'] = ob
-        self.emit('ob', symbol, self._cloneOrderBook(ob, symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(ob, symbolData['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
     def _websocket_handle_ob_update(self, contextId, msg):
@@ -745,7 +744,7 @@ class gdax (Exchange):
             side = 'asks' if (op == 'sell') else 'bids'
             self.updateBidAsk([price, amount], ob[side], op == 'buy')
         symbolData['ob'] = ob
-        self.emit('ob', symbol, self._cloneOrderBook(ob, symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(ob, symbolData['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
     def _websocket_handle_subscription(self, contextId, event, msg):
@@ -6,7 +6,6 @@
 from ccxt.base.exchange import Exchange
 import base64
 import hashlib
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import ArgumentsRequired
 from ccxt.base.errors import NotSupported
@@ -94,6 +93,7 @@ class gemini (Exchange):
                     'default': {
                         'type': 'ws-s',
                         'baseurl': 'wss://api.gemini.com/v1/marketdata/',
+                        'streamUpdate': 'swap',
                     },
                 },
                 'methodmap': {
@@ -472,17 +472,32 @@ class gemini (Exchange):
         self.emit('trade', symbol, trade)
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         # console.log(msg)
-        lastSeqId = self._contextGet(contextId, 'sequence_id')
         seqId = self.safe_integer(msg, 'socket_sequence')
-        if lastSeqId is not None:
-            lastSeqId = lastSeqId + 1
-            if lastSeqId != seqId:
-                self.emit('err', NetworkError('sequence id error in exchange: ' + self.id + '(' + str(lastSeqId) + '+1 !=' + str(seqId) + ')'), contextId)
-                return
-        self._contextSet(contextId, 'sequence_id', seqId)
         symbol = self._contextGet(contextId, 'symbol')
+        subscribedEvents = self._contextGetEvents(contextId)
+        if ('ob' in subscribedEvents) and (symbol in subscribedEvents['ob']):
+            sync = self._websocketOrderBookSync(symbol)
+            if seqId == 0:
+                # every connection starts with the whole book
+                sync.align(-1)
+            deltas = sync.push(seqId, seqId, msg)
+            if deltas is None:
+                self._websocket_resync(contextId)
+                return
+            # the messages the synchronizer releases, in sequence order
+            for delta in deltas:
+                self._websocket_handle_message(contextId, symbol, delta)
+        else:
+            lastSeqId = self._contextGet(contextId, 'sequence_id')
+            self._contextSet(contextId, 'sequence_id', seqId)
+            if (lastSeqId is not None) and (lastSeqId + 1 != seqId):
+                self._websocket_resync(contextId)
+                return
+            self._websocket_handle_message(contextId, symbol, msg)
+
+    def _websocket_handle_message(self, contextId, symbol, msg):
         msgType = msg['type']
         if msgType == 'heartbeat':
             return
@@ -498,12 +513,12 @@ class gemini (Exchange):
                 if eventsLength > 0:
                     event = events[0]
                     if (event['type'] == 'change') and(self.safe_string(event, 'reason') == 'initial'):
-                        symbolData['ob'] = {
+                        symbolData['ob'] = self.order_book({
                             'bids': [],
                             'asks': [],
                             'timestamp': None,
                             'datetime': None,
-                        }
+                        })
                     elif event['type'] == 'change':
                         timestamp = self.safe_float(msg, 'timestamp')
                         timestamp = timestamp * 1000
@@ -522,9 +537,19 @@ class gemini (Exchange):
                 elif eventType == 'trade' and('trade' in list(subscribedEvents.keys())):
                     self._websocket_handle_trade(msg, event, symbol)
             if obEventActive:
-                self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))  # True even with 'trade', as a trade event has the corresponding ob change event in the same events list
+                self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))  # True even with 'trade', as a trade event has the corresponding ob change event in the same events list
                 self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
+    def _websocket_resync(self, contextId):
+        # a connection serves one symbol, it is reconnected without touching the others
+        self._executeAndCallback(contextId, 'websocketRecoverConxid', [contextId], '_websocket_handle_resync', {
+            'contextId': contextId,
+        })
+
+    def _websocket_handle_resync(self, context, error, response):
+        if error:
+            self.emit('err', NetworkError(self.id + ' failed to resync ' + context['contextId'] + ': ' + str(error)), context['contextId'])
+
     def _websocket_subscribe(self, contextId, event, symbol, nonce, params={}):
         if event != 'ob' and event != 'trade':
             raise NotSupported('subscribe ' + event + '(' + symbol + ') not supported for exchange ' + self.id)
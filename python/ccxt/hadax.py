@@ -87,6 +87,7 @@ class hadax (huobipro):
                     'default': {
                         'type': 'ws',
                         'baseurl': 'wss://api.hadax.com/ws',
+                        'decompress': 'gunzip',
                     },
                 },
                 'events': {
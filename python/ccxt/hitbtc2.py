@@ -13,7 +13,6 @@ except NameError:
     basestring = str  # Python 2
 import base64
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import PermissionDenied
 from ccxt.base.errors import InsufficientFunds
@@ -1316,7 +1315,7 @@ class hitbtc2 (hitbtc):
             raise ExchangeError(feedback)
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         # TODO: if (msg.error) error handle
         method = self.safe_string(msg, 'method')
         if method is not None:
@@ -1332,70 +1331,69 @@ class hitbtc2 (hitbtc):
                 self._websocket_handle_update_orderbook(contextId, msg)
 
     def _websocket_handle_snapshot_orderbook(self, contextId, data):
-        timestamp = None
         obdata = self.safe_value(data, 'params')
         rawsymbol = self.safe_value(obdata, 'symbol')
         market = self.markets_by_id[rawsymbol]
         symbol = market['symbol']
-        # :parse orderbook
-        ob = self.parse_order_book(obdata, timestamp, 'bid', 'ask', 'price', 'size')
-        # console.log('parsed',ob)
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
+        timestamp = self.parse8601(self.safe_string(obdata, 'timestamp'))
+        ob = self.order_book(self.parse_order_book(obdata, timestamp, 'bid', 'ask', 'price', 'size'))
+        sequence = self.safe_integer(obdata, 'sequence')
+        ob['nonce'] = sequence
+        # updates received before the snapshot that it does not contain yet
+        sync = self._websocketOrderBookSync(symbol)
+        deltas = sync.align(sequence)
+        if deltas is None:
+            # updates between the snapshot and the buffered ones were lost,
+            # a new subscription starts again from a snapshot
+            if 'ob' in symbolData:
+                del symbolData['ob']
+                self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+            self._websocket_resync_ob(contextId, symbol)
+            return
+        for i in range(0, len(deltas)):
+            ob = self.mergeOrderBookDelta(ob, deltas[i], self.parse8601(self.safe_string(deltas[i], 'timestamp')), 'bid', 'ask', 'price', 'size')
+            ob['nonce'] = deltas[i]['sequence']
         symbolData['ob'] = ob
-        symbolData['rawData'] = obdata
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
-        self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
-
-    def _websocket_is_zero_size(self, size):
-        # hitbtc - their doc is really bad, how many 0 will it have?
-        return size == '0' or size == '0.0' or size == '0.00' or size == '0.000' or size == '0.0000'
-
-    def _websocket_update_order(self, items, updates):
-        newitems = []
-        for i in range(0, len(items)):
-            item = items[i]
-            removeItem = False
-            for j in range(0, len(updates)):
-                o = updates[j]
-                if o['price'] == item['price']:
-                    if self._websocket_is_zero_size(o['size']):
-                        # remove size == 0
-                        removeItem = True
-                        # print('htbtc2 remove order',item,o)
-                    else:
-                        # update price
-                        # print('htbtc2 update order',item,o)
-                        item['size'] = o['size']
-            if not removeItem:
-                newitems.append(item)
-        return newitems
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
 
     def _websocket_handle_update_orderbook(self, contextId, data):
-        timestamp = None
         obdata = self.safe_value(data, 'params')
         rawsymbol = self.safe_value(obdata, 'symbol')
         market = self.markets_by_id[rawsymbol]
         symbol = market['symbol']
-        symbolData = self._contextGetSymbolData(
-            contextId,
-            'ob',
-            symbol
-        )
-        # :get updated last raw ob
-        rawData = symbolData['rawData']
-        # console.log('>>>>>>get last raw',rawData)
-        # :update,remove size = 0,check sequence
-        rawData['ask'] = self._websocket_update_order(rawData['ask'], obdata['ask'])
-        rawData['bid'] = self._websocket_update_order(rawData['bid'], obdata['bid'])
-        # console.log('updated raw',rawData,obdata)
-        # :parse orderbook
-        ob = self.parse_order_book(rawData, timestamp, 'bid', 'ask', 'price', 'size')
-        # console.log('parsed',ob)
-        # :update last raw ob
+        symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
+        # each update carries the next sequence number of the symbol, levels
+        # are stored in place in the ordered book
+        sequence = self.safe_integer(obdata, 'sequence')
+        sync = self._websocketOrderBookSync(symbol)
+        deltas = sync.push(sequence, sequence, obdata)
+        if deltas is None:
+            # a lost update, a new subscription starts again from a snapshot
+            del symbolData['ob']
+            self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
+            self._websocket_resync_ob(contextId, symbol)
+            return
+        if len(deltas) == 0:
+            return
+        ob = symbolData['ob']
+        for i in range(0, len(deltas)):
+            ob = self.mergeOrderBookDelta(ob, deltas[i], self.parse8601(self.safe_string(deltas[i], 'timestamp')), 'bid', 'ask', 'price', 'size')
+            ob['nonce'] = deltas[i]['sequence']
         symbolData['ob'] = ob
-        symbolData['rawData'] = rawData
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
-        self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
+
+    def _websocket_resync_ob(self, contextId, symbol):
+        rawsymbol = self.market_id(symbol)
+        self.websocketSendJson({
+            'method': 'subscribeOrderbook',
+            'params': {
+                'symbol': rawsymbol,
+            },
+            'id': rawsymbol,
+        }, contextId)
 
     def _websocket_subscribe(self, contextId, event, symbol, nonce, params={}):
         if event != 'ob':
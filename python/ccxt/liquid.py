@@ -5,7 +5,6 @@
 
 from ccxt.base.exchange import Exchange
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import AuthenticationError
 from ccxt.base.errors import ArgumentsRequired
@@ -662,7 +661,7 @@ class liquid (Exchange):
             raise ExchangeError(feedback)
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         # print(data)
         evt = self.safe_string(msg, 'event')
         if evt == 'subscription_succeeded':
@@ -693,7 +692,7 @@ class liquid (Exchange):
             symbolData['ob']['bids'] = data
         else:
             symbolData['ob']['asks'] = data
-        self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
     def _websocket_handle_subscription(self, contextId, msg):
@@ -4,7 +4,6 @@
 # https://github.com/ccxt/ccxt/blob/master/CONTRIBUTING.md#how-to-contribute-code
 
 from ccxt.okcoinusd import okcoinusd
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import NotSupported
 
@@ -194,7 +193,7 @@ class okex (okcoinusd):
                 self.emit(
                     'ob',
                     symbol,
-                    self._cloneOrderBook(symbolData['ob'], symbolData['depth'])
+                    self._viewOrderBook(symbolData['ob'], symbolData['depth'])
                 )
         elif channel.find('ok_sub_future') >= 0:
             # future
@@ -218,7 +217,7 @@ class okex (okcoinusd):
                 self.emit(
                     'ob',
                     symbol,
-                    self._cloneOrderBook(symbolData['ob'], symbolData['depth'])
+                    self._viewOrderBook(symbolData['ob'], symbolData['depth'])
                 )
 
     def _websocket_dispatch(self, contextId, msg):
@@ -237,7 +236,7 @@ class okex (okcoinusd):
 
     def _websocket_on_message(self, contextId, data):
         # print('_websocketOnMsg', data)
-        msgs = json.loads(data)
+        msgs = self.websocketParseJson(data)
         if isinstance(msgs, list):
             for i in range(0, len(msgs)):
                 self._websocket_dispatch(contextId, msgs[i])
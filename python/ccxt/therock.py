@@ -5,7 +5,6 @@
 
 from ccxt.base.exchange import Exchange
 import hashlib
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import ArgumentsRequired
 from ccxt.base.errors import NotSupported
@@ -504,7 +503,7 @@ class therock (Exchange):
         return response
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         # console.log(data)
         self._websocket_check_sequence(contextId, msg)
         evt = self.safe_string(msg, 'event')
@@ -541,10 +540,10 @@ class therock (Exchange):
         data = self.safe_value(msg, 'data')
         time = self.safe_string(data, 'time')
         timestamp = self.parse8601(time)
-        ob = self.parse_order_book(data, timestamp, 'bids', 'asks', 'price', 'amount')
+        ob = self.order_book(self.parse_order_book(data, timestamp, 'bids', 'asks', 'price', 'amount'))
         symbolData = self._contextGetSymbolData(contextId, 'ob', symbol)
         symbolData['ob'] = ob
-        self.emit('ob', symbol, self._cloneOrderBook(ob, symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(ob, symbolData['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
     def _websocket_handle_orderbook_diff(self, contextId, msg):
@@ -564,7 +563,7 @@ class therock (Exchange):
         self.updateBidAsk([price, amount], symbolData['ob'][side], side == 'bids')
         symbolData['ob']['timestamp'] = timestamp
         symbolData['ob']['datetime'] = self.iso8601(timestamp)
-        self.emit('ob', symbol, self._cloneOrderBook(symbolData['ob'], symbolData['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(symbolData['ob'], symbolData['limit']))
         self._contextSetSymbolData(contextId, 'ob', symbol, symbolData)
 
     def _websocket_handle_subscription(self, contextId, msg):
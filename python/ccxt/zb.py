@@ -13,7 +13,6 @@ except NameError:
     basestring = str  # Python 2
 import hashlib
 import math
-import json
 from ccxt.base.errors import ExchangeError
 from ccxt.base.errors import AuthenticationError
 from ccxt.base.errors import ArgumentsRequired
@@ -620,7 +619,7 @@ class zb (Exchange):
         return(index == (strLen - len(s2)))
 
     def _websocket_on_message(self, contextId, data):
-        msg = json.loads(data)
+        msg = self.websocketParseJson(data)
         success = self.safe_value(msg, 'success', True)
         channel = self.safe_string(msg, 'channel')
         pairId = None
@@ -669,7 +668,7 @@ class zb (Exchange):
         data = self._contextGetSymbolData(contextId, 'ob', symbol)
         data['ob'] = ob
         self._contextSetSymbolData(contextId, 'ob', symbol, data)
-        self.emit('ob', symbol, self._cloneOrderBook(ob, data['limit']))
+        self.emit('ob', symbol, self._viewOrderBook(ob, data['limit']))
 
     def _websocket_subscribe(self, contextId, event, symbol, nonce, params={}):
         if event != 'ob':
@@ -81,6 +81,9 @@ setup(
         'qa': [
             'flake8==3.5.0'
         ],
+        'numpy': [
+            'numpy>=1.13.0'
+        ],
         'doc': [
             'Sphinx==1.7.0'
         ]
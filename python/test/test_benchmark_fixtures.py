@@ -0,0 +1,49 @@
+import asyncio
+import os
+import random
+import sys
+import tempfile
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+sys.path.append(os.path.join(root, 'benchmark'))
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+from ccxt.async_support.base.frame_recorder import FrameRecorder  # noqa: E402
+from ccxt.base.json_codec import JsonCodec  # noqa: E402
+from fixtures import FIXTURES  # noqa: E402
+
+# ----------------------------------------------------------------------------
+# every synthetic session replays without a handler error and moves its book
+
+
+async def test(name, path):
+    exchange_id, markets, fixture = FIXTURES[name]
+    recorder = FrameRecorder(path, JsonCodec())
+    fixture(recorder, 200, random.Random(1))
+    recorder.close()
+    exchange = getattr(ccxt, exchange_id)()
+    exchange.set_markets(markets)
+    received = []
+    errors = []
+    exchange.on('ob', lambda symbol, ob: received.append(('ob', ob['bids'][0], ob['asks'][0])))
+    exchange.on('trade', lambda symbol, trade: received.append(('trade', trade['price'])))
+    exchange.on('err', lambda error, conxid=None: errors.append(error))
+    stats = await exchange.websocket_replay(path)
+    await exchange.close()
+    assert(stats['errors'] == 0 and not errors), (name, errors)
+    assert(len(received) > 100), (name, len(received))
+    for event in received:
+        if event[0] == 'ob':
+            # the synthetic sides never cross
+            assert(event[1][0] < event[2][0]), (name, event)
+
+
+directory = tempfile.mkdtemp()
+for name in sorted(FIXTURES):
+    path = os.path.join(directory, name + '.log')
+    asyncio.get_event_loop().run_until_complete(test(name, path))
+    os.remove(path)
+os.rmdir(directory)
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt                                    # noqa: E402
+from ccxt.async_support.base.order_book import OrderBook             # noqa: E402
+from ccxt.async_support.base.order_book import OrderBookView         # noqa: E402
+from ccxt.base.errors import NotSupported                            # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+
+async def test():
+    exchange = ccxt.binance()
+    received = []
+    exchange.on('ob', lambda symbol, ob: received.append((symbol, ob['bids'][0][0])))
+    exchange.on('ticker', lambda symbol, ticker: received.append((symbol, ticker)))
+
+    # once per event loop turn, every delta is merged but only the latest book is published
+
+    exchange._websocketSetConflation('ob', 'BTC/USDT', {'conflate': 'tick'})
+    book = OrderBook({'bids': [[1, 1]], 'asks': []})
+    for i in range(2, 12):
+        book['bids'].store(i, 1)
+        exchange.emit('ob', 'BTC/USDT', OrderBookView(book))
+        exchange.emit('ob', 'ETH/USDT', OrderBookView(book))
+    assert(len(received) == 10)
+    assert(all(symbol == 'ETH/USDT' for symbol, price in received))
+    # the pending view was released instead of being copied on every delta
+    assert(len(book['bids']._views) == 0)
+    await asyncio.sleep(0)
+    assert(received[-1] == ('BTC/USDT', 11))
+    assert(len(received) == 11)
+    assert(exchange.websocketConflation[('ob', 'BTC/USDT')]['conflated'] == 9)
+
+    # by interval, the first update goes out at once and the latest one after the interval
+
+    del received[:]
+    exchange._websocketSetConflation('ticker', 'BTC/USDT', {'conflate': 20})
+    for i in range(5):
+        exchange.emit('ticker', 'BTC/USDT', i)
+    assert(received == [('BTC/USDT', 0)])
+    await asyncio.sleep(0.03)
+    assert(received == [('BTC/USDT', 0), ('BTC/USDT', 4)])
+
+    # nothing is published for a symbol unsubscribed meanwhile
+
+    exchange.emit('ticker', 'BTC/USDT', 5)
+    exchange.websocketConflation.pop(('ticker', 'BTC/USDT'))
+    await asyncio.sleep(0.03)
+    assert(received == [('BTC/USDT', 0), ('BTC/USDT', 4)])
+
+    try:
+        exchange._websocketSetConflation('trade', 'BTC/USDT', {'conflate': 'tick'})
+        assert(False)
+    except NotSupported:
+        pass
+
+    await exchange.close()
+
+
+asyncio.get_event_loop().run_until_complete(test())
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+from ccxt.async_support.base.correlation import CorrelationRegistry  # noqa: E402
+from ccxt.async_support.base.timer_wheel import TimerWheel  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+loop = asyncio.get_event_loop()
+
+
+async def test_registry():
+    registry = CorrelationRegistry(loop, TimerWheel(loop, tick=0.01))
+
+    # settled requests are forgotten, late acks are ignored
+
+    first = registry.register('1', 1, 'conx1', 'group', 'subscribe ob(ETH/BTC)')
+    second = registry.register('2', 1, 'conx1', 'group')
+    third = registry.register('3', 1, 'conx2')
+    assert(len(registry) == 3)
+    assert(registry.resolve('1', 'done'))
+    assert(not registry.resolve('1', 'again'))
+    assert(first.result() == 'done')
+    assert('1' not in registry)
+
+    # bulk resolution by group and bulk rejection by connection
+
+    fourth = registry.register('4', None, 'conx2', 'group')
+    assert(registry.resolve_group('group', True) == 2)
+    assert(second.result() is True and fourth.result() is True)
+    assert(registry.reject_connection('conx2', ValueError('closed')) == 1)
+    assert(isinstance(third.exception(), ValueError))
+    assert(registry.groups == {} and registry.connections == {})
+
+    # deadlines
+
+    expiring = registry.register('5', 0.02, scope='unsubscribe ob(ETH/BTC)')
+    await asyncio.sleep(0.05)
+    assert(isinstance(expiring.exception(), TimeoutError))
+    assert('unsubscribe ob(ETH/BTC)' in str(expiring.exception()))
+    assert(registry.stats()['expired'] == 1)
+
+    # requests without a deadline nobody settles show up as leaks
+
+    leaking = registry.register('6')
+    await asyncio.sleep(0.02)
+    leaks = registry.leaks(0.01)
+    assert(len(leaks) == 1 and leaks[0][0] == '6')
+    assert(registry.leaks(10) == [])
+    registry.reject_all(ValueError('closed'))
+    assert(isinstance(leaking.exception(), ValueError))
+    assert(len(registry) == 0)
+
+
+loop.run_until_complete(test_registry())
+
+# ----------------------------------------------------------------------------
+# exchanges acknowledge a request by emitting its nonce string
+
+
+async def test_acknowledge():
+    exchange = ccxt.bitfinex2()
+    future = exchange.websocketRequests.register('10', 1, 'default', ('default', 'subscribe', 'ob', 'ETH/BTC'))
+    assert(exchange.emit('10', True, None))
+    assert(future.result() is True)
+    failed = exchange.websocketRequests.register('11', 1, 'default')
+    exchange.emit('11', False, None)
+    assert(isinstance(failed.exception(), ccxt.ExchangeError))
+    grouped = exchange.websocketRequests.register('12', 1, 'default', ('default', 'subscribe', 'ob', 'ETH/BTC'))
+    assert(exchange._websocketAcknowledgeAll('default', 'subscribe', 'ob', 'ETH/BTC') == 1)
+    assert(grouped.result() is True)
+    pending = exchange.websocketRequests.register('13', None, 'default')
+    assert(exchange.websocket_pending_requests(0)['pending'] == 1)
+    await exchange.close()
+    assert(isinstance(pending.exception(), ccxt.ExchangeError))
+
+
+loop.run_until_complete(test_acknowledge())
@@ -0,0 +1,57 @@
+import asyncio
+import base64
+import gzip
+import os
+import sys
+import zlib
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+from ccxt.async_support.base.decompress import DecompressionStage  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+
+def deflate(data, wbits):
+    compressor = zlib.compressobj(wbits=wbits)
+    return compressor.compress(data) + compressor.flush()
+
+
+exchange = ccxt.huobipro()
+
+# the shared inflaters are reusable, every stream gets a fresh copy
+
+assert(exchange.gunzip(gzip.compress(b'{"ping":1}')) == b'{"ping":1}')
+assert(exchange.gunzip(gzip.compress(b'{"ping":2}')) == b'{"ping":2}')
+assert(exchange.inflateRaw(base64.b64encode(deflate(b'raw', -zlib.MAX_WBITS)), 'base64') == b'raw')
+assert(exchange.inflateRaw(deflate(b'zlib', zlib.MAX_WBITS)) == b'zlib')
+
+# small frames are inflated inline, large ones in the pool, all in order
+
+delivered = []
+stage = DecompressionStage(exchange.asyncio_loop, exchange.gunzip, delivered.append, lambda error: delivered.append(error), threshold=1000)
+large = os.urandom(4000)
+
+
+async def test():
+    stage.feed(gzip.compress(b'1'))
+    assert(delivered == [b'1'])
+    stage.feed(gzip.compress(large))
+    stage.feed(gzip.compress(b'3'))
+    stage.feed(b'not gzipped')
+    assert(stage.pending == 3)
+    assert(len(delivered) == 1)
+    while stage.pending:
+        await asyncio.sleep(0.01)
+
+
+asyncio.get_event_loop().run_until_complete(test())
+assert(delivered[:3] == [b'1', large, b'3'])
+assert(isinstance(delivered[3], Exception))
+assert(stage.offloaded == 1)
+
+asyncio.get_event_loop().run_until_complete(exchange.close())
@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+exchange = ccxt.binance()
+received = []
+
+
+def btc(symbol, ob):
+    received.append(('btc', symbol, ob))
+
+
+def anything(symbol, ob):
+    received.append(('any', symbol, ob))
+
+
+# nobody listens
+
+assert(exchange.emit('ob', 'BTC/USDT', 1) is False)
+
+# symbol listeners only get their symbol, pyee listeners get every symbol
+
+exchange.on_symbol('ob', 'BTC/USDT', btc)
+assert(exchange.emit('ob', 'BTC/USDT', 2) is True)
+assert(exchange.emit('ob', 'ETH/USDT', 3) is False)
+exchange.on('ob', anything)
+exchange.emit('ob', 'BTC/USDT', 4)
+exchange.emit('ob', 'ETH/USDT', 5)
+assert(received == [('btc', 'BTC/USDT', 2), ('btc', 'BTC/USDT', 4), ('any', 'BTC/USDT', 4), ('any', 'ETH/USDT', 5)])
+exchange.remove_listener('ob', anything)
+
+# a listener may remove itself while it is called
+
+
+@exchange.on_symbol('trade', 'BTC/USDT')
+def once(symbol, trade):
+    received.append(('once', symbol, trade))
+    exchange.remove_symbol_listener('trade', 'BTC/USDT', once)
+
+
+del received[:]
+exchange.emit('trade', 'BTC/USDT', 6)
+exchange.emit('trade', 'BTC/USDT', 7)
+assert(received == [('once', 'BTC/USDT', 6)])
+assert(not exchange.dispatcher.has('trade', 'BTC/USDT'))
+
+# other events go through pyee as before
+
+exchange.on('statusok', lambda success: received.append(('statusok', success)))
+exchange.emit('statusok', True)
+assert(received[-1] == ('statusok', True))
+
+asyncio.get_event_loop().run_until_complete(exchange.close())
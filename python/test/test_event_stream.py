@@ -0,0 +1,103 @@
+import asyncio
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+from ccxt.async_support.base.dispatcher import SymbolDispatcher  # noqa: E402
+from ccxt.async_support.base.stream import EventStream          # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+
+class Exchange(object):
+    # just what an EventStream needs from the exchange
+
+    def __init__(self):
+        self.dispatcher = SymbolDispatcher()
+        self.asyncio_loop = asyncio.get_event_loop()
+        self.websocketStreams = {}
+        self.subscriptions = []
+        self.paused = 0
+
+    def on_symbol(self, event, symbol, callback):
+        self.dispatcher.add(event, symbol, callback)
+
+    def remove_symbol_listener(self, event, symbol, callback):
+        self.dispatcher.remove(event, symbol, callback)
+
+    def emit(self, event, symbol, data):
+        self.dispatcher.dispatch(event, symbol, (symbol, data))
+
+    async def websocket_subscribe_all(self, eventSymbols):
+        if eventSymbols[0]['symbol'] not in self.subscriptions:
+            self.subscriptions.append(eventSymbols[0]['symbol'])
+        return ['default']
+
+    async def websocket_unsubscribe(self, event, symbol, params={}):
+        self.subscriptions.remove(symbol)
+
+    def _websocketPauseReading(self, stream):
+        self.paused += 1
+
+    def _websocketResumeReading(self, stream):
+        self.paused -= 1
+
+
+async def test():
+    exchange = Exchange()
+
+    # updates of other symbols are ignored
+
+    stream = EventStream(exchange, 'trade', 'BTC/USDT', {}, 3, 'drop-oldest')
+    await stream.start()
+    for i in range(5):
+        exchange.emit('trade', 'BTC/USDT', i)
+        exchange.emit('trade', 'ETH/USDT', i)
+    assert(stream.depth == 3)
+    assert(stream.dropped == 2)
+    assert([await stream.__anext__() for i in range(3)] == [2, 3, 4])
+
+    # conflate replaces the newest update
+
+    conflated = EventStream(exchange, 'trade', 'BTC/USDT', {}, 2, 'conflate')
+    await conflated.start()
+    for i in range(5):
+        exchange.emit('trade', 'BTC/USDT', i)
+    assert([await conflated.__anext__() for i in range(2)] == [0, 4])
+    assert(conflated.stats()['dropped'] == 3)
+
+    # the subscription is released with the last stream
+
+    await conflated.close()
+    assert(exchange.subscriptions == ['BTC/USDT'])
+    await stream.close()
+    assert(exchange.subscriptions == [])
+    assert(exchange.websocketStreams == {})
+
+    # block keeps every update and pauses reading until the consumer catches up
+
+    stream = EventStream(exchange, 'ticker', 'BTC/USDT', {}, 2, 'block')
+    received = []
+
+    async def consume():
+        async for ticker in stream:
+            received.append(ticker)
+
+    task = asyncio.ensure_future(consume())
+    await asyncio.sleep(0)
+    for i in range(4):
+        exchange.emit('ticker', 'BTC/USDT', i)
+    assert(exchange.paused == 1)
+    await asyncio.sleep(0)
+    assert(received == [0, 1, 2, 3])
+    assert(exchange.paused == 0)
+    await stream.close()
+    await task
+    assert(stream.dropped == 0)
+
+
+asyncio.get_event_loop().run_until_complete(test())
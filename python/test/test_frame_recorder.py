@@ -0,0 +1,80 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+from ccxt.async_support.base.frame_recorder import read_frames  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+loop = asyncio.get_event_loop()
+markets = [{'id': 'tBTCUSD', 'symbol': 'BTC/USD', 'base': 'BTC', 'quote': 'USD'}]
+directory = tempfile.mkdtemp()
+
+
+def bitfinex2(path, compress):
+    # a live session of bitfinex2 as the connection would hand it over
+    exchange = ccxt.bitfinex2()
+    exchange.set_markets(markets)
+    recorder = exchange.websocket_record(path, compress)
+    recorder.open('default', 'default', {'type': 'ws', 'url': 'wss://api.bitfinex.com/ws/2', 'id': 'default'})
+    recorder.subscription('default', True, 'default', 'ob', 'BTC/USD', {})
+    start = 1500000000.0
+    frames = [
+        b'{"event":"subscribed","channel":"book","chanId":7,"symbol":"tBTCUSD"}',
+        '[7,[[100,1,2],[101,1,-3]]]',
+        b'[7,"hb"]',
+        b'[7,[100,1,5]]',
+        b'[7,[99,1,1]]',
+    ]
+    for i in range(0, len(frames)):
+        recorder.frame('default', frames[i], start + i * 0.05)
+    exchange.websocket_stop_recording()
+    loop.run_until_complete(exchange.close())
+
+
+async def replay(path, speed=None):
+    exchange = ccxt.bitfinex2()
+    exchange.set_markets(markets)
+    books = []
+    exchange.on('ob', lambda symbol, ob: books.append((symbol, ob['bids'][:], ob['asks'][:])))
+    stats = await exchange.websocket_replay(path, speed)
+    await exchange.close()
+    return stats, books
+
+
+for compress in (True, False):
+    path = os.path.join(directory, 'bitfinex2-' + str(compress) + '.log')
+    bitfinex2(path, compress)
+    records = list(read_frames(path))
+    assert(len(records) == 7)
+    assert(json.loads(records[1][3].decode('utf-8'))['symbol'] == 'BTC/USD')
+    assert(records[3][2] == 'default' and records[3][3] == b'[7,[[100,1,2],[101,1,-3]]]')
+
+    # as fast as possible, with the same books as live
+
+    stats, books = loop.run_until_complete(replay(path))
+    assert(stats['frames'] == 5 and stats['errors'] == 0)
+    assert(books[0] == ('BTC/USD', [[100.0, 2.0]], [[101.0, 3.0]]))
+    assert(books[-1] == ('BTC/USD', [[100.0, 5.0], [99.0, 1.0]], [[101.0, 3.0]]))
+
+# at recorded speed, the 0.2 seconds recorded take about as long
+
+stats, books = loop.run_until_complete(replay(path, 1))
+assert(stats['seconds'] >= 0.19)
+assert(len(books) == 3)
+
+# a record cut short ends the log
+
+with open(path, 'rb') as file:
+    data = file.read()
+with open(path, 'wb') as file:
+    file.write(data[:-3])
+assert(len(list(read_frames(path))) == 6)
@@ -0,0 +1,43 @@
+import asyncio
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+from ccxt.base import json_codec  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+message = '{"e":"depthUpdate","b":[["0.0024","10"]],"p":0.1,"u":157,"s":"BTC/€"}'
+decoded = {'e': 'depthUpdate', 'b': [['0.0024', '10']], 'p': 0.1, 'u': 157, 's': 'BTC/€'}
+
+for codec, module in json_codec.codecs:
+    if module is not None:
+        instance = json_codec.json_codec(codec.name)
+        assert(instance.loads(message) == decoded)
+        assert(instance.loads(message.encode('utf-8')) == decoded)
+        assert(isinstance(instance.dumps(decoded), str))
+        assert(instance.loads(instance.dumps(decoded)) == decoded)
+
+assert(json_codec.json_codec('json').name == 'json')
+assert(json_codec.json_codec().name == [codec.name for codec, module in json_codec.codecs if module is not None][0])
+
+try:
+    json_codec.json_codec('yaml')
+    assert(False)
+except ImportError:
+    pass
+
+# ----------------------------------------------------------------------------
+# text frames reach the handlers as bytes
+
+exchange = ccxt.poloniex()
+errors = []
+exchange.on('err', lambda error, conxid=None: errors.append(error))
+exchange._websocket_on_message('default', b'[1010]')
+assert(not errors)
+asyncio.get_event_loop().run_until_complete(exchange.close())
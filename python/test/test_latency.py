@@ -0,0 +1,61 @@
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+from ccxt.async_support.base.latency import Histogram       # noqa: E402
+from ccxt.async_support.base.latency import LatencyTracker  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+histogram = Histogram()
+for i in range(1, 101):
+    histogram.record(i / 1000.0)
+
+summary = histogram.summary()
+assert(summary['count'] == 100)
+assert(summary['max'] == 0.1)
+assert(abs(summary['p50'] - 0.05) <= 0.05 * 0.05)
+assert(abs(summary['p99'] - 0.099) <= 0.099 * 0.05)
+assert(Histogram().percentile(0.5) is None)
+
+# ----------------------------------------------------------------------------
+# a fake clock that advances by one millisecond on every reading
+
+ticks = [0]
+
+
+def clock():
+    ticks[0] += 1
+    return ticks[0] / 1000.0
+
+
+tracker = LatencyTracker('test', ['ob'], clock)
+parse = tracker.wrap('parse', lambda data: data)
+emit = tracker.wrap_emit(lambda event, *args: parse(args))
+
+tracker.frame_received()
+tracker.begin()
+parse('{}')
+emit('ob', 'BTC/USDT')
+emit('ob', 'ETH/USDT')
+emit('err', None)
+tracker.end()
+
+stats = tracker.snapshot()
+assert(list(stats.keys()) == ['ob'])
+assert(stats['ob']['total']['count'] == 1)
+assert(abs(stats['ob']['frame']['max'] - 0.001) < 1e-9)
+assert(abs(stats['ob']['parse']['max'] - 0.001) < 1e-9)
+# the parse calls inside emit are counted as emit time
+assert(abs(stats['ob']['emit']['max'] - 0.003) < 1e-9)
+
+tracker.begin()
+tracker.end()
+assert('_' in tracker.snapshot())
+
+tracker.reset()
+assert(tracker.snapshot() == {})
@@ -0,0 +1,176 @@
+import json
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+from ccxt.async_support.base.order_book import OrderBook  # noqa: E402
+from ccxt.async_support.base.order_book import OrderBookView  # noqa: E402
+from ccxt.async_support.base.order_book import Bids       # noqa: E402
+from ccxt.async_support.base.order_book import Asks       # noqa: E402
+from ccxt.async_support.base.order_book import IndexedOrderBook  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+bids = Bids([[1.0, 1.0], [3.0, 3.0], [2.0, 2.0], [4.0, 0]])
+assert(bids == [[3.0, 3.0], [2.0, 2.0], [1.0, 1.0]])
+
+asks = Asks([[5.0, 1.0], [4.0, 2.0]])
+assert(asks == [[4.0, 2.0], [5.0, 1.0]])
+
+# ----------------------------------------------------------------------------
+# store inserts, replaces and removes levels keeping the price order
+
+bids.store(2.5, 7.0)
+assert(bids == [[3.0, 3.0], [2.5, 7.0], [2.0, 2.0], [1.0, 1.0]])
+
+bids.store(3.0, 9.0)
+assert(bids[0] == [3.0, 9.0])
+
+bids.store(2.0, 0)
+assert(bids == [[3.0, 9.0], [2.5, 7.0], [1.0, 1.0]])
+assert(bids.get(2.0) is None)
+
+bids.store(0.5, 0)
+assert(len(bids) == 3)
+
+asks.store(4.5, 1.0)
+asks.store(6.0, 1.0)
+asks.store(3.0, 1.0)
+assert([level[0] for level in asks] == [3.0, 4.0, 4.5, 5.0, 6.0])
+
+# ----------------------------------------------------------------------------
+# increment adds to the existing amount and removes emptied levels
+
+asks.increment([4.0, 1.5])
+assert(asks.get(4.0) == [4.0, 3.5])
+
+asks.increment([4.0, -3.5])
+assert(asks.get(4.0) is None)
+
+asks.increment([7.0, 2.0])
+assert(asks[-1] == [7.0, 2.0])
+
+# ----------------------------------------------------------------------------
+# previously taken slices are not affected by later updates
+
+snapshot = asks[:]
+asks.store(3.0, 5.0)
+assert(snapshot[0] == [3.0, 1.0])
+assert(asks[0] == [3.0, 5.0])
+
+# ----------------------------------------------------------------------------
+
+ob = OrderBook({
+    'bids': [[10.0, 1.0], [11.0, 1.0]],
+    'asks': [[13.0, 1.0], [12.0, 1.0]],
+    'timestamp': 1,
+    'datetime': None,
+    'nonce': 5,
+})
+
+assert(ob['bids'][0] == [11.0, 1.0])
+assert(ob['asks'][0] == [12.0, 1.0])
+assert(ob['nonce'] == 5)
+
+ob.reset()
+assert(ob['bids'] == [])
+assert(ob['nonce'] is None)
+
+# ----------------------------------------------------------------------------
+# views share the book until it changes or until they are read
+
+ob = OrderBook({
+    'bids': [[3.0, 1.0], [2.0, 1.0], [1.0, 1.0]],
+    'asks': [[4.0, 1.0], [5.0, 1.0], [6.0, 1.0]],
+    'nonce': 1,
+})
+
+view = OrderBookView(ob, 2)
+assert(view.version == ob.version)
+assert(view['nonce'] == 1)
+
+ob['bids'].store(3.5, 1.0)
+ob['asks'].store(4.0, 0)
+assert(view['bids'] == [[3.0, 1.0], [2.0, 1.0]])
+assert(view['asks'] == [[4.0, 1.0], [5.0, 1.0]])
+assert(view.version != ob.version)
+
+latest = OrderBookView(ob)
+assert(latest['bids'][0] == [3.5, 1.0])
+assert(len(latest['asks']) == 2)
+assert(len(ob['bids']._views) == 0)
+
+stable = OrderBookView(ob, 1).copy()
+ob['bids'].store(3.5, 0)
+assert(stable['bids'] == [[3.5, 1.0]])
+assert(set(stable.keys()) == set(['bids', 'asks', 'timestamp', 'datetime', 'nonce']))
+
+# a view is still the dict listeners got before, with the levels it was taken at
+view = OrderBookView(ob, 1)
+ob['asks'].store(3.9, 1.0)
+assert(isinstance(view, dict))
+assert(json.loads(json.dumps(view)) == {'bids': [[3.0, 1.0]], 'asks': [[5.0, 1.0]], 'timestamp': None, 'datetime': None, 'nonce': 1})
+assert(dict(OrderBookView(ob, 1))['asks'] == [[3.9, 1.0]])
+assert(OrderBookView(ob, 1) == {'bids': [[3.0, 1.0]], 'asks': [[3.9, 1.0]], 'timestamp': None, 'datetime': None, 'nonce': 1})
+
+# ----------------------------------------------------------------------------
+# indexed books find levels by the id the exchange gives them
+
+ob = IndexedOrderBook({
+    'bids': [[99.0, 10.0, 'b99'], [98.0, 20.0, 'b98']],
+    'asks': [[101.0, 5.0, 'a101']],
+})
+assert(ob['bids'] == [[99.0, 10.0], [98.0, 20.0]])
+
+assert(ob['bids'].store_id('b98', 25.0))
+assert(ob['bids'][1] == [98.0, 25.0])
+assert(not ob['bids'].store_id('b97', 1.0))
+assert(ob['bids'].store_id('b99.5', 1.0, 99.5))
+assert(ob['bids'][0] == [99.5, 1.0])
+
+view = OrderBookView(ob, 1)
+assert(ob['asks'].remove_id('a101'))
+assert(not ob['asks'].remove_id('a101'))
+assert(ob['asks'] == [])
+assert(ob['asks'].price_of('a101') is None)
+assert(len(ob['asks']._ids) == 0)
+assert(view['asks'] == [[101.0, 5.0]])
+
+ob['bids'].store_id('b99', 0)
+assert(ob['bids'].price_of('b99') is None)
+assert([level[0] for level in ob['bids']] == [99.5, 98.0])
+
+# ----------------------------------------------------------------------------
+# the numpy backend is optional
+
+from ccxt.async_support.base import numpy_order_book  # noqa: E402
+
+if numpy_order_book.numpy is not None:
+
+    ob = numpy_order_book.NumpyOrderBook({
+        'bids': [[10.0, 1.0], [9.0, 2.0]],
+        'asks': [[12.0, 3.0], [11.0, 1.0]],
+    })
+
+    assert(ob['bids'][:] == [[10.0, 1.0], [9.0, 2.0]])
+    assert(ob['asks'][0] == [11.0, 1.0])
+    assert(ob.mid() == 10.5)
+    assert(ob.spread() == 1.0)
+    assert(ob.vwap('buy', 2.0) == 11.5)
+    assert(ob.vwap('buy', 10.0) is None)
+    assert(ob.vwap('buy', 0) is None)
+    assert(ob.vwap('sell', -1.0) is None)
+    assert(ob['asks'].cumulative().tolist() == [1.0, 4.0])
+
+    ob.merge([[9.5, 4.0], [10.0, 0], [9.0, 3.0]], [[11.0, 2.0]])
+    assert(ob['bids'][:] == [[9.5, 4.0], [9.0, 3.0]])
+    assert(ob['asks'][:] == [[11.0, 2.0], [12.0, 3.0]])
+    assert(ob.imbalance() == (7.0 - 5.0) / 12.0)
+
+    view = OrderBookView(ob, 1)
+    ob['bids'].store(9.75, 1.0)
+    assert(view['bids'] == [[9.5, 4.0]])
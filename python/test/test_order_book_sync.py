@@ -0,0 +1,110 @@
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+from ccxt.async_support.base.order_book_sync import OrderBookSynchronizer  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+# deltas are buffered until a snapshot is aligned, the older ones are dropped
+
+sync = OrderBookSynchronizer(size=3)
+for first in range(1, 10, 2):
+    assert(sync.push(first, first + 1, first) == [])
+assert(sync.stats()['buffered'] == 3)
+assert(sync.stats()['dropped'] == 2)
+assert(not sync.synced)
+
+# the snapshot skips the deltas it already contains
+
+assert(sync.align(6) == [7, 9])
+assert(sync.sequence == 10)
+assert(sync.push(11, 11, 'a') == ['a'])
+assert(sync.push(5, 5, 'old') == [])
+assert(sync.stats()['stale'] == 1)
+
+# a gap leaves the book out of sync and keeps buffering for the next snapshot
+
+assert(sync.push(13, 13, 'b') is None)
+assert(not sync.synced)
+assert(sync.stats()['resyncs'] == 1)
+assert(sync.push(14, 14, 'c') == [])
+
+# a snapshot older than the buffered deltas is not enough
+
+assert(sync.align(11) is None)
+assert(sync.stats()['resyncs'] == 2)
+assert(sync.align(12) == ['b', 'c'])
+assert(sync.synced)
+
+# out of order deltas wait for the missing one up to reorder later deltas
+
+sync = OrderBookSynchronizer(reorder=2)
+assert(sync.align(0) == [])
+assert(sync.push(2, 2, 'b') == [])
+assert(sync.push(3, 3, 'c') == [])
+assert(sync.push(1, 1, 'a') == ['a', 'b', 'c'])
+assert(sync.push(5, 5, 'e') == [])
+assert(sync.push(6, 6, 'f') == [])
+assert(sync.push(7, 7, 'g') is None)
+assert(sync.stats()['resyncs'] == 1)
+
+# a reset waits for a snapshot without counting a resync
+
+sync.reset()
+assert(sync.stats() == {'synced': False, 'sequence': None, 'buffered': 0, 'resyncs': 1, 'dropped': 0, 'stale': 0})
+
+# also with reorder, the buffer cannot hold what a stale snapshot misses
+
+sync = OrderBookSynchronizer(reorder=10)
+sync.push(100, 100, 'a')
+sync.push(101, 101, 'b')
+assert(sync.align(50) is None)
+assert(sync.align(99) == ['a', 'b'])
+
+# ----------------------------------------------------------------------------
+# a poloniex snapshot older than the buffered deltas is fetched again, as
+# deep as the exchange serves it, and cut to the limit when emitted
+
+import asyncio  # noqa: E402
+import json     # noqa: E402
+import ccxt.async_support as ccxt  # noqa: E402
+
+fetched = []
+
+
+class SnapshotExchange(ccxt.poloniex):
+
+    async def fetch_order_book(self, symbol, limit=None, params={}):
+        fetched.append(limit)
+        return {'bids': [[0.4, 1.0], [0.3, 1.0]], 'asks': [[0.6, 1.0], [0.7, 1.0]], 'timestamp': None, 'datetime': None, 'nonce': 100}
+
+
+async def test_poloniex():
+    exchange = SnapshotExchange({'enableRateLimit': False})
+    books = []
+    exchange.on('ob', lambda symbol, ob: books.append(ob.copy()))
+    exchange._websocket_reset_context('default')
+    exchange._contextSet('default', 'symbolids', {'121': 'BTC/USDT'})
+    exchange._contextResetEvent('default', 'ob')
+    exchange._contextResetSymbol('default', 'ob', 'BTC/USDT')
+    exchange._contextSetSubscribed('default', 'ob', 'BTC/USDT', True)
+    exchange._contextSetSymbolData('default', 'ob', 'BTC/USDT', {'limit': 1, 'obDeltaCacheSizeMax': 10})
+    exchange._websocket_on_message('default', json.dumps([121, 101, [['o', 1, '0.45', '2']]]).encode('utf-8'))
+    exchange._websocket_on_message('default', json.dumps([121, 102, [['o', 0, '0.55', '3']]]).encode('utf-8'))
+    exchange._websocket_on_message('default', json.dumps([121, 50, [['i', {'currencyPair': 'USDT_BTC', 'orderBook': [{'0.6': '1'}, {'0.4': '1'}]}]]]).encode('utf-8'))
+    assert(books == [])
+    await asyncio.sleep(0.05)
+    assert(fetched == [100])
+    assert(len(books) == 1)
+    assert(books[0]['bids'] == [[0.45, 2.0]])
+    assert(books[0]['asks'] == [[0.55, 3.0]])
+    assert(exchange.websocket_order_book_sync_stats()['BTC/USDT']['sequence'] == 102)
+    await exchange.close()
+
+
+asyncio.get_event_loop().run_until_complete(test_poloniex())
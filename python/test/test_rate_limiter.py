@@ -0,0 +1,104 @@
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+from ccxt.base.rate_limiter import TokenBucket  # noqa: E402
+from ccxt.base.rate_limiter import RateLimiter  # noqa: E402
+from ccxt.base.rate_limiter import api_costs    # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+now = [0.0]
+
+
+def clock():
+    return now[0]
+
+
+# one token every 100 ms, two tokens at most
+bucket = TokenBucket({'refillRate': 0.01, 'capacity': 2}, clock)
+assert(bucket.reserve() == 0)
+assert(bucket.reserve() == 0)
+assert(abs(bucket.reserve() - 0.1) < 1e-9)
+assert(abs(bucket.reserve() - 0.2) < 1e-9)
+assert(abs(bucket.reserve(3) - 0.5) < 1e-9)
+
+now[0] = 10.0
+assert(bucket.reserve() == 0)
+assert(bucket.tokens == 1)
+
+# ----------------------------------------------------------------------------
+
+limiter = RateLimiter({'refillRate': 0.01, 'capacity': 1}, {'orders': {'refillRate': 0.001, 'capacity': 1}}, clock)
+assert(limiter.reserve({'orders': 1}) == 0)
+assert(abs(limiter.reserve({'orders': 1}) - 1.0) < 1e-9)
+assert(abs(limiter.reserve() - 0.2) < 1e-9)
+assert(limiter.queue_depth == 0)
+
+# ----------------------------------------------------------------------------
+
+costs = api_costs({
+    'public': {'get': ['time', 'depth']},
+    'private': {'post': {'order': {'orders': 1}, ' order/test ': 2}},
+})
+assert(costs == {('private', 'POST', 'order'): {'orders': 1}, ('private', 'POST', 'order/test'): 2})
+
+# ----------------------------------------------------------------------------
+# instances of the same exchange share their buckets within the same scope
+
+import ccxt  # noqa: E402
+
+first = ccxt.kraken({'rateLimitScope': 'ip', 'apiKey': 'a'})
+second = ccxt.kraken({'rateLimitScope': 'ip', 'apiKey': 'b'})
+assert(first.rateLimiter is second.rateLimiter)
+assert(ccxt.kraken().rateLimiter is not first.rateLimiter)
+assert(ccxt.kraken({'rateLimitScope': 'key', 'apiKey': 'a'}).rateLimiter is not ccxt.kraken({'rateLimitScope': 'key', 'apiKey': 'b'}).rateLimiter)
+
+# instances without the credentials of their scope share the per-ip buckets
+assert(ccxt.kraken({'rateLimitScope': 'key'}).rate_limit_key() == ['kraken', 'ip'])
+assert(ccxt.kraken({'rateLimitScope': 'key'}).rateLimiter is first.rateLimiter)
+assert(ccxt.kraken({'rateLimitScope': 'account', 'apiKey': 'a'}).rate_limit_key() == ['kraken', 'ip'])
+assert(ccxt.kraken({'rateLimitScope': 'account', 'uid': 'u'}).rate_limit_key() == ['kraken', 'account', 'u'])
+
+# ----------------------------------------------------------------------------
+# and across processes through a coordinator
+
+import asyncio    # noqa: E402
+import tempfile   # noqa: E402
+from ccxt.async_support.base.rate_limit_coordinator import RateLimitCoordinator  # noqa: E402
+from ccxt.async_support.base.rate_limit_coordinator import AsyncUnixSocketRateLimiter  # noqa: E402
+
+
+async def test_coordinator():
+    path = os.path.join(tempfile.mkdtemp(), 'ratelimit.sock')
+    coordinator = await RateLimitCoordinator(path).start()
+    config = {'refillRate': 0.01, 'capacity': 1}
+    first = AsyncUnixSocketRateLimiter(path, ['test', 'ip'], config)
+    second = AsyncUnixSocketRateLimiter(path, ['test', 'ip'], config)
+    assert(await first.reserve_async() == 0)
+    assert(await second.reserve_async() > 0.09)
+    other = AsyncUnixSocketRateLimiter(path, ['test', 'key', 'a'], config)
+    assert(await other.reserve_async() == 0)
+    for limiter in (first, second, other):
+        limiter.close()
+    await coordinator.close()
+    # without a coordinator the process keeps to the buckets on its own
+    alone = AsyncUnixSocketRateLimiter(path + '.missing', ['test', 'ip'], config)
+    assert(await alone.reserve_async() == 0)
+    assert(await alone.reserve_async() > 0.09)
+    alone.close()
+
+asyncio.get_event_loop().run_until_complete(test_coordinator())
+
+# ----------------------------------------------------------------------------
+
+from ccxt.base.rate_limiter import UnixSocketRateLimiter  # noqa: E402
+
+alone = UnixSocketRateLimiter(os.path.join(tempfile.mkdtemp(), 'missing.sock'), ['test', 'ip'], {'refillRate': 0.01, 'capacity': 1})
+assert(alone.reserve() == 0)
+assert(alone.reserve() > 0.09)
+assert(alone.socket is None)
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+from ccxt.async_support.base import session_pool  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+
+async def test():
+
+    # exchanges with the same loop, CA bundle and trust_env share one session,
+    # the connector is set up by the first of them
+
+    first = ccxt.binance({'aiohttp_pool': {'limit_per_host': 5}})
+    second = ccxt.kraken({'aiohttp_pool': True})
+    first.open()
+    second.open()
+    assert(first.session is second.session)
+    assert(first.session.connector.limit_per_host == 5)
+
+    # other settings get a session of their own, an exchange without the pool
+    # keeps its own session out of it
+
+    other = ccxt.binance({'aiohttp_pool': True, 'aiohttp_trust_env': True})
+    other.open()
+    alone = ccxt.binance()
+    alone.open()
+    assert(other.session is not first.session)
+    assert(alone.session is not first.session)
+
+    stats = sorted(session_pool.stats(), key=lambda pool: pool['trust_env'])
+    assert(len(stats) == 2)
+    assert(stats[0]['exchanges'] == 2)
+    assert(stats[0]['trust_env'] is False)
+    assert(stats[0]['limit'] == 100)
+    assert(stats[0]['limit_per_host'] == 5)
+    assert(stats[0]['acquired'] == 0)
+    assert(stats[0]['idle'] == 0)
+    assert(stats[1]['exchanges'] == 1)
+    assert(stats[1]['trust_env'] is True)
+
+    # the session is closed with the last exchange that uses it
+
+    session = first.session
+    await first.close()
+    assert(not session.closed)
+    assert([pool['exchanges'] for pool in session_pool.stats() if not pool['trust_env']] == [1])
+    await second.close()
+    assert(session.closed)
+    await other.close()
+    await alone.close()
+    assert(session_pool.stats() == [])
+
+    # a pool whose session is closed is set up again
+
+    again = ccxt.binance({'aiohttp_pool': True})
+    again.open()
+    assert(again.session is not session)
+    assert(not again.session.closed)
+    await again.close()
+
+
+asyncio.get_event_loop().run_until_complete(test())
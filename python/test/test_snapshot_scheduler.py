@@ -0,0 +1,88 @@
+import asyncio
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+fetched = []
+results = []
+
+
+class SnapshotExchange(ccxt.binance):
+
+    snapshotConcurrency = 1
+
+    async def fetch_order_book(self, symbol, limit=None, params={}):
+        fetched.append((symbol, limit))
+        await asyncio.sleep(0.01)
+        if symbol == 'XRP/USDT':
+            raise ccxt.ExchangeNotAvailable('down')
+        return {'bids': [], 'asks': [], 'nonce': len(fetched)}
+
+
+def done(symbol):
+    return lambda error, response: results.append((symbol, error is None))
+
+
+async def test():
+    # deeper than the default, which costs a single request weight
+    exchange = SnapshotExchange({'enableRateLimit': False, 'options': {'snapshotDepth': 1000}})
+    scheduler = exchange.snapshotScheduler
+
+    # the first snapshot is fetched deep right away, a symbol is queued once,
+    # a request for a running symbol is fetched again after it
+
+    assert(scheduler.request('BTC/USDT', 10, done('BTC/USDT')))
+    assert(scheduler.request('BTC/USDT', 10, done('BTC/USDT')))
+    assert(not scheduler.request('BTC/USDT', 10, done('BTC/USDT')))
+    assert(scheduler.request('ETH/USDT', 10, done('ETH/USDT')))
+    assert(scheduler.request('LTC/USDT', None, done('LTC/USDT'), resync=True))
+    assert(scheduler.request('XRP/USDT', 100, done('XRP/USDT')))
+    assert(not scheduler.request('ETH/USDT', 20, done('ETH/USDT')))
+    stats = exchange.websocket_snapshot_queue_stats()
+    assert(stats['running'] == {'BTC/USDT': 1000})
+    assert(stats['pending'] == ['ETH/USDT', 'LTC/USDT', 'XRP/USDT'])
+
+    # symbols with consumers go first, then resyncs, the backlog is fetched
+    # shallow, at the default depth of the exchange without a limit
+
+    exchange.on_symbol('ob', 'XRP/USDT', lambda symbol, ob: None)
+    while scheduler.running or scheduler.pending:
+        await asyncio.sleep(0.005)
+    assert(fetched == [('BTC/USDT', 1000), ('XRP/USDT', 100), ('LTC/USDT', None), ('ETH/USDT', 20), ('BTC/USDT', 1000)])
+    assert(results == [('BTC/USDT', True), ('XRP/USDT', False), ('LTC/USDT', True), ('ETH/USDT', True), ('BTC/USDT', True)])
+    stats = exchange.websocket_snapshot_queue_stats()
+    assert(stats['completed'] == 4)
+    assert(stats['failed'] == 1)
+
+    await exchange.close()
+
+    # the request weight is charged to its own bucket, not to the one of the requests
+
+    exchange = SnapshotExchange({'enableRateLimit': True})
+    assert(exchange.snapshotScheduler.depth(None) == 100)
+    exchange.options['snapshotDepth'] = 1000
+    default = exchange.rateLimiter.buckets['default'].tokens
+    weight = exchange.rateLimiter.buckets['weight'].tokens
+    exchange.snapshotScheduler.request('BTC/USDT', None, done('BTC/USDT'))
+    while exchange.snapshotScheduler.running:
+        await asyncio.sleep(0.005)
+    assert(exchange.rateLimiter.buckets['default'].tokens == default)
+    assert(weight - 10 <= exchange.rateLimiter.buckets['weight'].tokens < weight - 9)
+    await exchange.close()
+
+    # the concurrency can be set in the config
+
+    exchange = ccxt.binance({'snapshotConcurrency': 7})
+    assert(exchange.snapshotScheduler.concurrency == 7)
+    await exchange.close()
+
+
+asyncio.get_event_loop().run_until_complete(test())
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import os
+import sys
+
+import aiohttp
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+sys.path.append(os.path.join(root, 'benchmark'))
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+from server import StandInServer  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+loop = asyncio.get_event_loop()
+server = StandInServer(rate=100, trades=10, symbols=3)
+urls = loop.run_until_complete(server.start())
+
+# ----------------------------------------------------------------------------
+# the exchanges stream books and trades off the stand-in as off the venue
+
+
+def listen(exchange):
+    received = {'ob': {}, 'trade': 0, 'errors': [], 'closed': []}
+    exchange.on('ob', lambda symbol, ob: received['ob'].__setitem__(symbol, ob))
+    exchange.on('trade', lambda symbol, trade: received.__setitem__('trade', received['trade'] + 1))
+    exchange.on('err', lambda error, conxid=None: received['errors'].append(error))
+    exchange.on('close', lambda conxid=None: received['closed'].append(conxid))
+    return received
+
+
+def check_books(received, symbols):
+    for symbol in symbols:
+        ob = received['ob'][symbol]
+        assert(ob['bids'][0][0] < ob['asks'][0][0]), ob
+
+
+async def test_exchange(exchange_id):
+    exchange = getattr(ccxt, exchange_id)({'enableRateLimit': False})
+    server.configure(exchange)
+    assert(exchange.wsconf['conx-tpls']['default']['baseurl'] == urls[exchange_id])
+    received = listen(exchange)
+    for symbol in ('BTC/USD', 'ETH/USD'):
+        await exchange.websocket_subscribe('ob', symbol)
+        await exchange.websocket_subscribe('trade', symbol)
+    await asyncio.sleep(0.5)
+    assert(not received['errors']), (exchange_id, received['errors'])
+    check_books(received, ['BTC/USD', 'ETH/USD'])
+    assert(received['trade'] > 0), exchange_id
+    exchange.websocketCloseAll()
+    await exchange.close()
+
+
+for exchange_id in ('bitfinex2', 'bitstamp', 'binance', 'bittrex'):
+    loop.run_until_complete(test_exchange(exchange_id))
+
+# ----------------------------------------------------------------------------
+# a gap in the sequence numbers resyncs the books
+
+
+async def test_resync():
+    exchange = ccxt.binance({'enableRateLimit': False})
+    server.configure(exchange)
+    received = listen(exchange)
+    await exchange.websocket_subscribe('ob', 'BTC/USD')
+    await exchange.websocket_subscribe('ob', 'ETH/USD')
+    await asyncio.sleep(0.3)
+    snapshots = exchange.websocket_snapshot_queue_stats()['completed']
+    server.skip(5, 'ETH/USD')
+    await asyncio.sleep(0.3)
+    assert(exchange.websocket_snapshot_queue_stats()['completed'] == snapshots + 1)
+    assert(received['ob']['ETH/USD']['nonce'] > 1005)
+    assert(not received['errors']), received['errors']
+    exchange.websocketCloseAll()
+    await exchange.close()
+
+
+loop.run_until_complete(test_resync())
+
+# ----------------------------------------------------------------------------
+# a connection the server cut closes without its transport, and recovers
+
+
+async def test_reconnect(exchange_id):
+    exchange = getattr(ccxt, exchange_id)({'enableRateLimit': False})
+    server.configure(exchange)
+    received = listen(exchange)
+    await exchange.websocket_subscribe('ob', 'BTC/USD')
+    await exchange.websocket_subscribe('ob', 'ETH/USD')
+    await asyncio.sleep(0.3)
+    connection = exchange._contextGetConnection('default')
+    assert(await server.drop(exchange_id, clean=False) == 1)
+    await asyncio.sleep(0.1)
+    assert(received['closed'] == ['default'])
+    assert(connection.client.transport is None)
+    connection.close()
+    assert(connection.client is None)
+
+    received['ob'].clear()
+    await exchange.websocketRecoverConxid('default')
+    await asyncio.sleep(0.3)
+    assert(not received['errors']), received['errors']
+    check_books(received, ['BTC/USD', 'ETH/USD'])
+    exchange.websocketCloseAll()
+    await exchange.close()
+
+
+# websocket and pusher connections
+for exchange_id in ('binance', 'bitstamp'):
+    loop.run_until_complete(test_reconnect(exchange_id))
+
+# ----------------------------------------------------------------------------
+# a swap opens the connection with the new streams before dropping the old
+# one, the books it already served carry on without a gap
+
+
+async def test_swap():
+    exchange = ccxt.binance({'enableRateLimit': False})
+    server.configure(exchange)
+    exchange.wsconf['conx-tpls']['default']['streamUpdate'] = 'swap'
+    received = listen(exchange)
+    times = []
+    exchange.on('ob', lambda symbol, ob: times.append(loop.time()) if symbol == 'BTC/USD' else None)
+    await exchange.websocket_subscribe('ob', 'BTC/USD')
+    await asyncio.sleep(0.3)
+    first = exchange._contextGetConnection('default')
+    await exchange.websocket_subscribe('ob', 'ETH/USD')
+    await asyncio.sleep(0.3)
+    # 100 updates a second, none held up by the switch
+    assert(max(later - earlier for earlier, later in zip(times, times[1:])) < 0.1)
+    assert(exchange._contextGetConnection('default') is not first)
+    assert(not first.isActive())
+    assert(not received['errors']), received['errors']
+    assert(received['closed'] == [])
+    check_books(received, ['BTC/USD', 'ETH/USD'])
+    stats = exchange.websocket_order_book_sync_stats()
+    assert(stats['BTC/USD']['synced'] and (stats['BTC/USD']['resyncs'] == 0)), stats
+    assert(exchange.websocket_snapshot_queue_stats()['completed'] == 2)
+    exchange.websocketCloseAll()
+    await exchange.close()
+
+
+loop.run_until_complete(test_swap())
+
+# ----------------------------------------------------------------------------
+# the Socket.IO handshake, pings and the order book channel
+
+
+async def test_socket_io():
+    async with aiohttp.ClientSession() as session:
+        async with session.ws_connect(urls['theocean']) as ws:
+            handshake = (await ws.receive()).data
+            assert(handshake[0] == '0' and 'pingInterval' in json.loads(handshake[1:]))
+            assert((await ws.receive()).data == '40')
+            await ws.send_str('2')
+            assert((await ws.receive()).data == '3')
+            await ws.send_str('42' + json.dumps(['data', {'type': 'subscribe', 'channel': 'order_book', 'payload': {'baseTokenAddress': 'eth', 'quoteTokenAddress': 'usd', 'snapshot': 'true', 'depth': '10'}}]))
+            snapshot = json.loads((await ws.receive()).data[2:])[1]
+            assert(snapshot['type'] == 'snapshot' and snapshot['channelId'] == 'order_book_eth_usd')
+            assert(len(snapshot['payload']['bids']) == 10)
+            update = json.loads((await ws.receive()).data[2:])[1]
+            assert(update['type'] == 'update')
+
+
+loop.run_until_complete(test_socket_io())
+loop.run_until_complete(server.stop())
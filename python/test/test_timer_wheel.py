@@ -0,0 +1,75 @@
+import asyncio
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+from ccxt.async_support.base.timer_wheel import TimerWheel  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+loop = asyncio.get_event_loop()
+fired = []
+
+
+async def test_wheel():
+    wheel = TimerWheel(loop, tick=0.01, size=8)
+    start = loop.time()
+
+    # timers fire in deadline order, not before it, also beyond a full turn
+
+    wheel.call_later(0.05, lambda: fired.append(('b', loop.time() - start)))
+    wheel.call_later(0.02, lambda: fired.append(('a', loop.time() - start)))
+    wheel.call_later(0.15, lambda: fired.append(('c', loop.time() - start)))
+    cancelled = wheel.call_later(0.03, lambda: fired.append(('x', loop.time() - start)))
+    cancelled.cancel()
+    periodic = wheel.call_periodic(0.04, lambda: fired.append(('p', loop.time() - start)))
+    assert(wheel.stats()['scheduled'] == 4)
+    await asyncio.sleep(0.2)
+    periodic.cancel()
+    names = [name for name, elapsed in fired]
+    assert(names[:3] == ['a', 'p', 'b'])
+    assert('x' not in names)
+    assert(names.count('p') >= 3)
+    for name, elapsed in fired:
+        if name in ('a', 'b', 'c'):
+            assert(elapsed >= {'a': 0.02, 'b': 0.05, 'c': 0.15}[name])
+    assert(wheel.stats()['scheduled'] == 0)
+
+    # an empty wheel keeps no loop timer
+
+    await asyncio.sleep(0.02)
+    assert(wheel._handle is None)
+    wheel.call_later(0.01, lambda: fired.append(('d', None)))
+    await asyncio.sleep(0.05)
+    assert(fired[-1] == ('d', None))
+
+
+loop.run_until_complete(test_wheel())
+
+# ----------------------------------------------------------------------------
+# deadlines of futures that completed in time are cancelled
+
+
+async def test_timeout_future():
+    exchange = ccxt.binance({'timeout': 10000})
+    future = loop.create_future()
+    exchange.timeout_future(future, 'test')
+    assert(exchange.timerWheel.stats()['scheduled'] == 1)
+    future.set_result(True)
+    await asyncio.sleep(0)
+    assert(exchange.timerWheel.stats()['scheduled'] == 0)
+    await exchange.close()
+
+    # the tick can be set in the config
+
+    exchange = ccxt.binance({'timerWheelTick': 0.2})
+    assert(exchange.timerWheel.tick == 0.2)
+    await exchange.close()
+
+
+loop.run_until_complete(test_timeout_future())
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+# ----------------------------------------------------------------------------
+
+import ccxt.async_support as ccxt  # noqa: E402
+
+# ----------------------------------------------------------------------------
+
+
+def subscribe(exchange, event, symbol):
+    conxid = exchange._websocketGetConxid4Event(event, symbol)['conxid']
+    if conxid not in exchange.websocketContexts:
+        exchange._websocket_reset_context(conxid, 'default')
+    if event not in exchange._contextGetEvents(conxid):
+        exchange._contextResetEvent(conxid, event)
+    exchange._contextResetSymbol(conxid, event, symbol)
+    exchange._contextSetSubscribed(conxid, event, symbol, True)
+    return conxid
+
+
+symbols = ['S' + str(i) + '/USDT' for i in range(7)]
+first = exchange = ccxt.binance()
+exchange.set_markets([{'id': s.replace('/', ''), 'symbol': s, 'base': s.split('/')[0], 'quote': 'USDT'} for s in symbols])
+
+# without limits every symbol shares the template connection
+
+exchange.wsconf['conx-tpls']['default'].pop('maxUrlLength')
+exchange.wsconf['conx-tpls']['default'].pop('maxStreams')
+assert(subscribe(exchange, 'trade', symbols[0]) == 'default')
+assert(subscribe(exchange, 'trade', symbols[1]) == 'default')
+
+# a full shard opens the next one, new symbols go to the least loaded shard
+
+exchange.wsconf['conx-tpls']['default']['maxStreams'] = 3
+assert(subscribe(exchange, 'trade', symbols[2]) == 'default')
+assert(subscribe(exchange, 'trade', symbols[3]) == 'default-1')
+assert(subscribe(exchange, 'trade', symbols[4]) == 'default-1')
+exchange._contextSetSubscribed('default', 'trade', symbols[0], False)
+assert(subscribe(exchange, 'trade', symbols[5]) == 'default')
+assert(subscribe(exchange, 'trade', symbols[6]) == 'default-1')
+
+# a subscribed symbol stays on its shard
+
+assert(exchange._websocketGetConxid4Event('trade', symbols[3])['conxid'] == 'default-1')
+assert(exchange._websocketGetConxid4Event('trade', symbols[5])['conxid'] == 'default')
+assert(exchange._websocketGetConxid4Event('ob', symbols[0])['conxid'] == 'default-2')
+
+# the stream url of a shard is kept below maxUrlLength
+
+exchange = ccxt.binance()
+exchange.set_markets([{'id': s.replace('/', ''), 'symbol': s, 'base': s.split('/')[0], 'quote': 'USDT'} for s in symbols])
+exchange.wsconf['conx-tpls']['default'].pop('maxStreams')
+exchange.wsconf['conx-tpls']['default']['maxUrlLength'] = len(exchange.wsconf['conx-tpls']['default']['baseurl']) + 30
+assert(subscribe(exchange, 'trade', symbols[0]) == 'default')
+assert(subscribe(exchange, 'trade', symbols[1]) == 'default')
+assert(subscribe(exchange, 'trade', symbols[2]) == 'default-1')
+
+asyncio.get_event_loop().run_until_complete(asyncio.gather(first.close(), exchange.close()))